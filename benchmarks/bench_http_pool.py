@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Per-lookup latency with and without connection pooling.
+
+Runs against the local stub dictionary server:
+
+    python -m benchmarks.bench_http_pool --lookups 500
+"""
+
+import argparse
+import statistics
+import time
+import urllib.request
+
+from benchmarks.stub_dictionary import StubDictionaryServer
+from dictionary_client import DictionaryClient
+
+
+def lookup_urllib(base_url, word):
+    """One lookup the old way: a fresh connection per request"""
+    with urllib.request.urlopen(base_url + word, timeout=10) as response:
+        return response.read()
+
+
+def measure(lookup, words):
+    latencies = []
+    for word in words:
+        start = time.perf_counter()
+        lookup(word)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def report(label, latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"  {label:<10} mean {statistics.mean(latencies) * 1000:7.3f} ms   "
+          f"median {statistics.median(latencies) * 1000:7.3f} ms   "
+          f"p95 {p95 * 1000:7.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pooled vs unpooled dictionary lookups")
+    parser.add_argument('--lookups', type=int, default=500)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help="artificial server delay per request in seconds")
+    args = parser.parse_args()
+
+    words = [f"word{i}" for i in range(args.lookups)]
+
+    with StubDictionaryServer(latency=args.latency) as server:
+        print(f"Stub server at {server.base_url}, {args.lookups} lookups each\n")
+
+        unpooled = measure(lambda word: lookup_urllib(server.base_url, word), words)
+
+        client = DictionaryClient(server.base_url)
+        pooled = measure(client.get, words)
+        client.close()
+
+    report('urlopen', unpooled)
+    report('pooled', pooled)
+    speedup = statistics.mean(unpooled) / statistics.mean(pooled)
+    print(f"\n✓ Pooled lookups are {speedup:.2f}x faster on average")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Offline dictionary benchmark: import time, open time and lookup rate.
+
+    python -m benchmarks.bench_offline_dictionary --sizes 10000 1000000
+
+For each size a synthetic dump of API-shaped entries is imported, then a
+vocabulary list of the same words is populated from the index with the API
+disabled. Open time should stay flat as the dump grows.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.stub_dictionary import make_entry
+from benchmarks.synthetic import generate_records
+from offline_dictionary import OfflineDictionary, import_dump
+from populate_meanings import populate_missing_meanings
+from vocab_metrics import METRICS
+from vocab_store import VocabStore
+
+LOOKUPS = 100_000
+
+
+def write_dump(path, words):
+    """One API response per line, in a shuffled order like a real dump"""
+    order = list(words)
+    random.Random(2).shuffle(order)
+    with open(path, 'w', encoding='utf-8') as f:
+        for word in order:
+            f.write(json.dumps(make_entry(word)))
+            f.write('\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the offline dictionary index")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            records = generate_records(n, empty_fraction=1.0)
+            dump_path = os.path.join(tmp, f'dump_{n}.jsonl')
+            index_path = os.path.join(tmp, f'dictionary_{n}.idx')
+            write_dump(dump_path, [record['word'] for record in records])
+
+            stats = import_dump(dump_path, index_path)
+
+            start = time.perf_counter()
+            dictionary = OfflineDictionary(index_path)
+            open_seconds = time.perf_counter() - start
+
+            rng = random.Random(3)
+            probes = [rng.choice(records)['word'] for _ in range(LOOKUPS)]
+            start = time.perf_counter()
+            for word in probes:
+                dictionary.get(word)
+            lookup_seconds = time.perf_counter() - start
+
+            store = VocabStore.from_records(records)
+            METRICS.reset()
+            start = time.perf_counter()
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                _, needs_review = populate_missing_meanings(store, use_api=False, offline=dictionary)
+            populate_seconds = time.perf_counter() - start
+            dictionary.close()
+
+            print(f"\n{n:,} entries ({stats['words']:,} distinct words, {stats['runs']} runs)")
+            print(f"  import    {stats['seconds']:9.2f} s   index {stats['bytes'] / 1e6:8.1f} MB")
+            print(f"  open      {open_seconds * 1e6:9.1f} µs")
+            print(f"  lookup    {lookup_seconds / LOOKUPS * 1e6:9.2f} µs/word")
+            print(f"  populate  {populate_seconds:9.2f} s   "
+                  f"{METRICS.counters.get('resolved_offline', 0):,} words from the index, "
+                  f"{len(needs_review)} left for review")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark for the vocabulary pipeline.
+
+Generates synthetic vocab_data.json files and times each pipeline stage on
+them, recording wall time and peak Python memory (tracemalloc). Results are
+saved as JSON so runs can be compared across changes:
+
+    python -m benchmarks.bench_pipeline --sizes 1000 10000
+    python -m benchmarks.bench_pipeline --compare benchmarks/results/<earlier>.json
+
+Each stage runs twice: once for wall time, once under tracemalloc for
+memory, so tracing overhead does not distort the timings. Stage output is
+sent to /dev/null. populate_missing_meanings runs against the local stub
+dictionary server with no rate limit.
+"""
+
+import argparse
+import contextlib
+import datetime
+import gc
+import json
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+import fix_review_words
+import populate_meanings
+import update_html_files
+from benchmarks.stub_dictionary import StubDictionaryServer
+from benchmarks.synthetic import write_dataset
+from build_manifest import BuildManifest
+from dictionary_client import DictionaryClient
+from distractors import build_distractors
+from duplicates import find_duplicates
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_DIR, 'benchmarks', 'results')
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+
+EMPTY_FRACTION = 0.3
+REVIEW_FRACTION = 0.05
+
+
+class Context:
+    """Per-size inputs shared by the stages"""
+
+    def __init__(self, workdir, size, stub_url):
+        self.workdir = workdir
+        self.size = size
+        self.stub_url = stub_url
+        self.full_path = os.path.join(workdir, 'full.json')
+        self.empty_path = os.path.join(workdir, 'empty.json')
+        self.review_path = os.path.join(workdir, 'review.json')
+        write_dataset(self.full_path, size)
+        write_dataset(self.empty_path, size, empty_fraction=EMPTY_FRACTION)
+        write_dataset(self.review_path, size, review_fraction=REVIEW_FRACTION)
+
+
+# Each stage is (name, prepare(ctx) -> state, run(ctx, state)).
+# Only run() is measured.
+
+def _load_store(path):
+    return lambda ctx: populate_meanings.load_vocabulary(path(ctx))
+
+
+def _run_populate(ctx, store):
+    client = DictionaryClient(ctx.stub_url)
+    try:
+        populate_meanings.populate_missing_meanings(store, workers=8, rate=1e9, client=client)
+    finally:
+        client.close()
+
+
+def _prepare_split(ctx):
+    shutil.rmtree('vocab_by_letter', ignore_errors=True)
+    return populate_meanings.load_vocabulary(ctx.full_path), BuildManifest('manifest.json')
+
+
+def _prepare_html(ctx):
+    shutil.copy(os.path.join(REPO_DIR, 'student-version.html'), 'student-version.html')
+    return populate_meanings.load_vocabulary(ctx.full_path)
+
+
+def _run_write_js(ctx, store):
+    with open('vocab.js', 'w', encoding='utf-8') as f:
+        update_html_files.write_js_entries(store, f)
+
+
+def _prepare_fix(ctx):
+    shutil.copy(ctx.review_path, 'vocab_data.json')
+
+
+STAGES = [
+    ('load_vocabulary', lambda ctx: None,
+     lambda ctx, _: populate_meanings.load_vocabulary(ctx.full_path)),
+    ('populate_missing_meanings', _load_store(lambda ctx: ctx.empty_path), _run_populate),
+    ('find_duplicates', _load_store(lambda ctx: ctx.full_path),
+     lambda ctx, store: find_duplicates(store)),
+    ('split_by_letter', _prepare_split,
+     lambda ctx, state: populate_meanings.split_by_letter(*state)),
+    ('write_js_entries', _load_store(lambda ctx: ctx.full_path), _run_write_js),
+    ('build_distractors', _load_store(lambda ctx: ctx.full_path),
+     lambda ctx, store: build_distractors(store)),
+    ('update_html_file', _prepare_html,
+     lambda ctx, store: update_html_files.update_html_file('student-version.html', store)),
+    ('fix_review_words', _prepare_fix,
+     lambda ctx, _: fix_review_words.fix_review_words()),
+]
+
+
+def measure_stage(ctx, prepare, run, trace_memory):
+    """Run one stage with fresh inputs and return wall seconds or peak bytes"""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        state = prepare(ctx)
+        gc.collect()
+        if trace_memory:
+            tracemalloc.start()
+            run(ctx, state)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            return peak
+        start = time.perf_counter()
+        run(ctx, state)
+        return time.perf_counter() - start
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(previous_path, results):
+    """Print wall-time and memory ratios against an earlier results file"""
+    with open(previous_path, 'r', encoding='utf-8') as f:
+        previous = {(r['size'], r['stage']): r for r in json.load(f)['results']}
+
+    print(f"\nCompared with {previous_path} (new / old):")
+    for result in results:
+        old = previous.get((result['size'], result['stage']))
+        if old is None:
+            continue
+        time_ratio = result['wall_seconds'] / old['wall_seconds'] if old['wall_seconds'] else 0
+        line = f"  {result['size']:>9,}  {result['stage']:<26} time x{time_ratio:5.2f}"
+        if result.get('peak_memory_bytes') and old.get('peak_memory_bytes'):
+            line += f"   memory x{result['peak_memory_bytes'] / old['peak_memory_bytes']:5.2f}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the vocabulary pipeline stages")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--stages', nargs='+', choices=[name for name, _, _ in STAGES],
+                        help="only run these stages")
+    parser.add_argument('--no-memory', action='store_true',
+                        help="skip the tracemalloc pass")
+    parser.add_argument('--output', help="results file (default: benchmarks/results/pipeline-<time>.json)")
+    parser.add_argument('--compare', help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    stages = [stage for stage in STAGES if not args.stages or stage[0] in args.stages]
+    results = []
+    original_cwd = os.getcwd()
+
+    with StubDictionaryServer() as stub, tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            for size in args.sizes:
+                print(f"\n📊 {size:,} entries")
+                ctx = Context(workdir, size, stub.base_url)
+                for name, prepare, run in stages:
+                    wall = measure_stage(ctx, prepare, run, trace_memory=False)
+                    peak = None if args.no_memory else measure_stage(ctx, prepare, run, trace_memory=True)
+                    results.append({'size': size, 'stage': name, 'wall_seconds': wall,
+                                    'peak_memory_bytes': peak})
+                    memory = '' if peak is None else f"   peak {peak / 1e6:9.1f} MB"
+                    print(f"  {name:<26} {wall * 1000:11.1f} ms{memory}")
+        finally:
+            os.chdir(original_cwd)
+
+    report = {
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
+        output = os.path.join(RESULTS_DIR, f'pipeline-{stamp}.json')
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✓ Results saved to {output}")
+
+    if args.compare:
+        compare(args.compare, results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark dataset versioning: patch cost against dataset and change size.
+
+    python -m benchmarks.bench_releases --sizes 10000 100000 1000000 --changes 10 1000
+
+For every dataset size, a full HISTORY of versions is made first. Then each
+change size is timed as one more version: the patches (the new step,
+composed onto every retained patch, and written out) apart from hashing the
+saved vocab_data.json, which any save already costs in proportion to the
+dataset. Patch time should follow the change size and barely move with the
+dataset size.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.synthetic import write_dataset
+from build_manifest import file_hash
+from vocab_releases import HISTORY, load_index, load_patch, patch_size, record_version
+from vocab_store import VocabStore
+
+
+def new_version(path, directory, rng, changes):
+    """Change `changes` meanings, save and version them; returns (patch s, hash s)"""
+    store = VocabStore.load(path)
+    for i in rng.sample(range(len(store)), changes):
+        store.set_meaning(i, f"changed {rng.random():.6f}")
+    store.save_json(path)
+
+    start = time.perf_counter()
+    file_hash(path)
+    hashing = time.perf_counter() - start
+
+    start = time.perf_counter()
+    record_version(store, path, directory)
+    return time.perf_counter() - start - hashing, hashing
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dataset versions and patches")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--changes', type=int, nargs='+', default=[10, 1000])
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            path = os.path.join(tmp, f'vocab_{n}.json')
+            directory = os.path.join(tmp, f'releases_{n}')
+            write_dataset(path, n)
+            record_version(VocabStore.load(path), path, directory)
+            for _ in range(HISTORY):
+                new_version(path, directory, rng, 10)
+
+            print(f"\n{n:,} entries, {HISTORY} versions of history")
+            for changes in args.changes:
+                patch_seconds, hash_seconds = new_version(path, directory, rng, changes)
+                index = load_index(directory)
+                oldest = load_patch(min(map(int, index['patches'])), index, directory)
+                print(f"  {changes:6,} changed: patches {patch_seconds * 1000:8.1f} ms   "
+                      f"(hashing the saved file {hash_seconds * 1000:6.1f} ms)   "
+                      f"oldest patch {patch_size(oldest):6,} entries")
+
+
+if __name__ == '__main__':
+    main()
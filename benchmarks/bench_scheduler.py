@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Review scheduler benchmark: seeding and picking cards from the SM-2 heap.
+
+    python -m benchmarks.bench_scheduler --cards 1000000 --reviews 1000000
+
+A synthetic vocabulary gets random wordAttempts levels, then a simulated
+student reviews REVIEWS_PER_DAY cards a day: take the most overdue card (or
+wait until the next one is due), grade it with a random level and
+reschedule it. For comparison, a few picks are also timed as a scan over
+every card's due time, which is what choosing a card costs without the heap.
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks.synthetic import generate_records
+from scheduler import GRADES, ReviewScheduler
+from vocab_store import VocabStore
+
+LEVELS = list(GRADES)
+
+# Share of cards that start with an attempt level
+MARKED_FRACTION = 0.5
+
+REVIEWS_PER_DAY = 1000
+
+SCAN_PICKS = 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the review scheduler")
+    parser.add_argument('--cards', type=int, default=1_000_000)
+    parser.add_argument('--reviews', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    store = VocabStore.from_records(generate_records(args.cards))
+    rng = random.Random(5)
+    attempts = {word: rng.choice(LEVELS) for word in store.words if rng.random() < MARKED_FRACTION}
+
+    start = time.perf_counter()
+    scheduler = ReviewScheduler.from_attempts(store, attempts)
+    seed_seconds = time.perf_counter() - start
+
+    grades = [rng.choice(list(GRADES.values())) for _ in range(args.reviews)]
+    now = 0.0
+    waits = 0
+    start = time.perf_counter()
+    for grade in grades:
+        card = scheduler.pop(now)
+        if card is None:
+            # Nothing due: skip ahead to the next card
+            now = scheduler.peek()[0]
+            card = scheduler.pop(now)
+            waits += 1
+        scheduler.review(card, grade, now)
+        now += 1 / REVIEWS_PER_DAY
+    review_seconds = time.perf_counter() - start
+
+    due = scheduler.due
+    start = time.perf_counter()
+    for _ in range(SCAN_PICKS):
+        min(range(len(due)), key=due.__getitem__)
+    scan_seconds = (time.perf_counter() - start) / SCAN_PICKS
+
+    print(f"\n{args.cards:,} cards, {len(attempts):,} with an attempt level")
+    print(f"  seed      {seed_seconds:9.2f} s")
+    print(f"  reviews   {review_seconds:9.2f} s   {args.reviews:,} picks + reschedules, "
+          f"{review_seconds / args.reviews * 1e6:.2f} µs each ({waits:,} times nothing was due)")
+    print(f"  heap      {len(scheduler._heap):,} entries after {now:,.0f} simulated days")
+    print(f"  scan      {scan_seconds * 1e3:9.2f} ms per pick without the heap")
+
+
+if __name__ == '__main__':
+    main()
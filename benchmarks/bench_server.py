@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Load test for serve.py against localhost.
+
+    python -m benchmarks.bench_server --requests 5000 --connections 32
+
+Starts serve.py on a free port in its own process, then runs each scenario
+with `connections` keep-alive connections sharing `requests` requests, and
+reports requests per second and latency percentiles. The client is Python
+too, so the numbers are a floor for what the server can do.
+"""
+
+import argparse
+import asyncio
+import os
+import re
+import subprocess
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (name, path, extra request headers); an If-None-Match of None is filled in
+# with the ETag of a first response, to measure revalidation
+SCENARIOS = [
+    ('student page', '/student-version.html', {}),
+    ('student page, gzip', '/student-version.html', {'Accept-Encoding': 'gzip'}),
+    ('student page, 304', '/student-version.html', {'Accept-Encoding': 'gzip', 'If-None-Match': None}),
+    ('letter shard, gzip', '/vocab_by_letter/C.json', {'Accept-Encoding': 'gzip'}),
+    ('vocab_data.json, gzip', '/vocab_data.json', {'Accept-Encoding': 'gzip'}),
+    ('api letter', '/api/letter/C', {'Accept-Encoding': 'gzip'}),
+    ('api range', '/api/range?from=800&to=899', {'Accept-Encoding': 'gzip'}),
+]
+
+
+def start_server(root, script='serve.py', args=()):
+    """Run `script` on a free port; returns (process, port)"""
+    process = subprocess.Popen([sys.executable, os.path.join(REPO_DIR, script), '--port', '0',
+                                '--root', root, *args], stdout=subprocess.PIPE, text=True)
+    for line in process.stdout:
+        match = re.search(r'http://[^:]+:(\d+)/', line)
+        if match:
+            return process, int(match.group(1))
+    process.kill()
+    raise RuntimeError(f"{script} did not start")
+
+
+async def request(reader, writer, path, headers, method='GET', body=b''):
+    """Send one request on a keep-alive connection; returns (status, headers, body)"""
+    lines = [f'{method} {path} HTTP/1.1', 'Host: localhost']
+    lines += [f'{name}: {value}' for name, value in headers.items()]
+    if body:
+        lines.append(f'Content-Length: {len(body)}')
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+    status = int((await reader.readline()).split()[1])
+    response_headers = {}
+    while True:
+        line = await reader.readline()
+        if line == b'\r\n':
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        response_headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(response_headers.get('content-length', 0)))
+    return status, response_headers, body
+
+
+async def run_scenario(port, path, headers, total, connections):
+    """Latencies in seconds, wall time, body bytes and statuses for one scenario"""
+    if headers.get('If-None-Match', '') is None:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        _, first, _ = await request(reader, writer, path, {k: v for k, v in headers.items()
+                                                           if k != 'If-None-Match'})
+        writer.close()
+        headers = dict(headers, **{'If-None-Match': first['etag']})
+
+    latencies = []
+    statuses = set()
+    body_bytes = 0
+
+    async def worker(count):
+        nonlocal body_bytes
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        try:
+            for _ in range(count):
+                start = time.perf_counter()
+                status, _, body = await request(reader, writer, path, headers)
+                latencies.append(time.perf_counter() - start)
+                statuses.add(status)
+                body_bytes += len(body)
+        finally:
+            writer.close()
+
+    shares = [total // connections + (i < total % connections) for i in range(connections)]
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(count) for count in shares if count))
+    return latencies, time.perf_counter() - start, body_bytes, statuses
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test serve.py on localhost")
+    parser.add_argument('--requests', type=int, default=5000, help="requests per scenario")
+    parser.add_argument('--connections', type=int, default=32)
+    parser.add_argument('--root', default=REPO_DIR, help="directory to serve")
+    args = parser.parse_args()
+
+    process, port = start_server(args.root)
+    try:
+        print(f"serve.py on port {port}: {args.requests} requests per scenario, "
+              f"{args.connections} connections\n")
+        print(f"{'scenario':<24}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'KB/resp':>9}  status")
+        for name, path, headers in SCENARIOS:
+            latencies, seconds, body_bytes, statuses = asyncio.run(
+                run_scenario(port, path, headers, args.requests, args.connections))
+            print(f"{name:<24}{len(latencies) / seconds:9.0f}"
+                  f"{percentile(latencies, 0.50) * 1000:9.2f}{percentile(latencies, 0.99) * 1000:9.2f}"
+                  f"{body_bytes / len(latencies) / 1024:9.1f}  {','.join(map(str, sorted(statuses)))}")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Peak memory of one fix + split + save pass: VocabStore against vocab_stream.
+
+    python -m benchmarks.bench_stream --sizes 10000 100000 1000000
+
+Both passes run the same fix_review and tee_shards stages: they replace
+[NEEDS REVIEW] meanings, write vocab_by_letter/-style shards and save the
+list again. The VocabStore pass loads every entry first; the streamed one
+reads, fixes and writes them one at a time, so its peak memory should stay
+flat as the dataset grows.
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic import write_dataset
+from fix_review_words import fix_review, fix_review_meanings
+from sharding import ShardWriter, tee_shards, write_shards
+from vocab_store import VocabStore
+from vocab_stream import PassStats, read_entries, write_entries
+
+
+def store_pass(path, output, directory):
+    store = VocabStore.load_json(path)
+    fix_review_meanings(store)
+    write_shards(store, directory=directory)
+    store.save_json(output)
+
+
+def stream_pass(path, output, directory):
+    stats = PassStats()
+    entries = fix_review(read_entries(path), stats)
+    entries = tee_shards(entries, ShardWriter(directory=directory))
+    write_entries(entries, output)
+
+
+def measure(run, path, tmp, label):
+    """Return (seconds, peak bytes) for one pass, printing nothing"""
+    output = os.path.join(tmp, f'out_{label}.json')
+    directory = os.path.join(tmp, f'shards_{label}')
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        run(path, output, directory)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, output
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark streamed against in-memory passes")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    args = parser.parse_args()
+
+    passes = [('store', store_pass), ('stream', stream_pass)]
+
+    with tempfile.TemporaryDirectory() as tmp, contextlib.chdir(tmp):
+        for n in args.sizes:
+            path = os.path.join(tmp, f'vocab_{n}.json')
+            write_dataset(path, n, review_fraction=0.01)
+
+            print(f"\n{n:,} entries")
+            outputs = []
+            for label, run in passes:
+                elapsed, peak, output = measure(run, path, tmp, f'{label}_{n}')
+                outputs.append(output)
+                print(f"  {label:<7} {elapsed * 1000:9.1f} ms   peak {peak / 1e6:8.1f} MB")
+            with open(outputs[0], 'rb') as a, open(outputs[1], 'rb') as b:
+                same = a.read() == b.read()
+            print(f"  {'✓' if same else '✗'} both passes saved {'the same' if same else 'different'} data")
+
+
+if __name__ == '__main__':
+    main()
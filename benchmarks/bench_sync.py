@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Load test for sync_server.py: thousands of students syncing at once.
+
+    python -m benchmarks.bench_sync --students 2000 --syncs 5 --changes 20
+
+Starts sync_server.py with an empty database, then every student connects
+at the same moment and sends `syncs` requests one after another, each with
+one delta of `changes` word levels (plus knownWords and today's history).
+Requests per second, latency percentiles and the changes written per second
+are reported, for the default group commit and for one transaction per
+request (--max-group 1). Afterwards the class statistics are fetched, and
+the stored progress of every student is checked against what was sent.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.bench_server import REPO_DIR, percentile, request, start_server
+from sync_server import LEVELS, MAX_GROUP
+
+CLASS_SIZE = 30
+DAY = '2026-10-18'
+
+
+def make_deltas(rng, words, syncs, changes):
+    """One student's deltas, and the word levels they leave behind"""
+    attempts = {}
+    deltas = []
+    for seq in range(1, syncs + 1):
+        delta = {'seq': seq, 'attempts': {}, 'known': {}}
+        for word in rng.sample(words, changes):
+            level = rng.choice(LEVELS + (None,))
+            delta['attempts'][word] = level
+            delta['known'][word] = level is not None
+            if level is None:
+                attempts.pop(word, None)
+            else:
+                attempts[word] = level
+        delta['history'] = {DAY: len(attempts)}
+        deltas.append(delta)
+    return deltas, attempts
+
+
+def class_of(student):
+    return f'class-{int(student.rsplit("-", 1)[1]) // CLASS_SIZE:03d}'
+
+
+async def run_students(port, students, plans):
+    """Latencies, wall time and bytes sent for every student syncing at once"""
+    latencies = []
+    sent = 0
+    ready = asyncio.Event()
+
+    async def student(name, deltas):
+        nonlocal sent
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        await ready.wait()
+        try:
+            for delta in deltas:
+                body = json.dumps({'student': name, 'class': class_of(name),
+                                   'device': 'bench', 'deltas': [delta]}).encode('utf-8')
+                start = time.perf_counter()
+                status, _, response = await request(reader, writer, '/api/sync',
+                                                    {'Content-Type': 'application/json'}, 'POST', body)
+                latencies.append(time.perf_counter() - start)
+                if status != 200 or json.loads(response)['applied'] != delta['seq']:
+                    raise RuntimeError(f"sync failed for {name}: {status} {response!r}")
+                sent += len(body)
+        finally:
+            writer.close()
+
+    tasks = [asyncio.create_task(student(name, plans[name][0])) for name in students]
+    await asyncio.sleep(0.5)  # let every connection open first
+    start = time.perf_counter()
+    ready.set()
+    await asyncio.gather(*tasks)
+    return latencies, time.perf_counter() - start, sent
+
+
+async def fetch_stats(port, classes):
+    """{class: stats} and the seconds the first and a repeated fetch of each took"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    stats = {}
+    timings = ([], [])
+    for name in classes:
+        etag = None
+        for attempt in range(2):
+            headers = {'If-None-Match': etag} if etag else {}
+            start = time.perf_counter()
+            status, response_headers, body = await request(reader, writer, f'/api/class/{name}/stats', headers)
+            timings[attempt].append(time.perf_counter() - start)
+            if status == 200:
+                stats[name] = json.loads(body)
+                etag = response_headers['etag']
+    writer.close()
+    return stats, timings
+
+
+def check(stats, plans):
+    """Students whose stored counts differ from what they sent"""
+    wrong = 0
+    for class_stats in stats.values():
+        for row in class_stats['roster']:
+            attempts = plans[row['student']][1]
+            expected = {level: sum(1 for value in attempts.values() if value == level) for level in LEVELS}
+            if any(row[level] != expected[level] for level in LEVELS) or row['known'] != len(attempts):
+                wrong += 1
+    return wrong
+
+
+def run(args, max_group, words):
+    rng = random.Random(7)
+    students = [f'student-{i:05d}' for i in range(args.students)]
+    plans = {name: make_deltas(rng, words, args.syncs, args.changes) for name in students}
+    classes = sorted({class_of(name) for name in students})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        process, port = start_server(REPO_DIR, 'sync_server.py',
+                                     ['--db', os.path.join(tmp, 'progress.sqlite3'),
+                                      '--max-group', str(max_group)])
+        try:
+            latencies, seconds, sent = asyncio.run(run_students(port, students, plans))
+            stats, (first, repeat) = asyncio.run(fetch_stats(port, classes))
+        finally:
+            process.terminate()
+            process.wait()
+
+    requests = len(latencies)
+    print(f"\n--max-group {max_group}: {requests:,} syncs from {args.students:,} students at once")
+    print(f"  {requests / seconds:9.0f} req/s   p50 {percentile(latencies, 0.5) * 1000:7.1f} ms   "
+          f"p99 {percentile(latencies, 0.99) * 1000:7.1f} ms   "
+          f"{requests * args.changes / seconds:,.0f} word changes/s")
+    print(f"  {sent / requests:9.0f} bytes per delta request")
+    print(f"  class stats: {len(classes)} classes, first fetch p50 {percentile(first, 0.5) * 1000:.2f} ms, "
+          f"repeat (304) p50 {percentile(repeat, 0.5) * 1000:.2f} ms")
+    wrong = check(stats, plans)
+    rostered = sum(len(class_stats['roster']) for class_stats in stats.values())
+    print(f"  {'✓' if not wrong and rostered == args.students else '✗'} {rostered:,} students stored, "
+          f"{wrong} with counts that differ from what they sent")
+    return plans
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the progress sync service")
+    parser.add_argument('--students', type=int, default=2000)
+    parser.add_argument('--syncs', type=int, default=5, help="sync requests per student")
+    parser.add_argument('--changes', type=int, default=20, help="word changes per delta")
+    parser.add_argument('--max-group', type=int, nargs='+', default=[MAX_GROUP, 1],
+                        help=f"group commit sizes to compare (default: {MAX_GROUP} 1)")
+    args = parser.parse_args()
+
+    with open(os.path.join(REPO_DIR, 'vocab_data.json'), 'r', encoding='utf-8') as f:
+        words = [record['word'] for record in json.load(f)]
+
+    for max_group in args.max_group:
+        plans = run(args, max_group, words)
+
+    # What a full snapshot of the same progress would have sent instead
+    snapshots = [len(json.dumps({'wordAttempts': attempts, 'knownWords': list(attempts)}))
+                 for _, attempts in plans.values()]
+    print(f"\nA full progress snapshot per sync would be {sum(snapshots) / len(snapshots):,.0f} bytes "
+          f"on average by the last sync, and grows with every word learned")
+
+
+if __name__ == '__main__':
+    main()
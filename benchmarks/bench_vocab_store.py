@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Memory and load-time benchmark: list of dicts vs VocabStore.
+
+    python -m benchmarks.bench_vocab_store --sizes 1000 100000 1000000
+"""
+
+import argparse
+import gc
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic import write_dataset
+from vocab_store import VocabStore
+
+
+def load_dicts(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def measure(load, path):
+    """Return (seconds, retained bytes, peak bytes) for one load"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    data = load(path)
+    elapsed = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    if isinstance(data, VocabStore):
+        data.close()
+    del data
+    return elapsed, retained, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark VocabStore memory and load time")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000, 1000000])
+    args = parser.parse_args()
+
+    loaders = [
+        ('json dicts', load_dicts, '.json'),
+        ('store (json)', VocabStore.load_json, '.json'),
+        ('store (mmap)', VocabStore.load_binary, '.vocab'),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            json_path = os.path.join(tmp, f'vocab_{n}.json')
+            write_dataset(json_path, n)
+            VocabStore.load_json(json_path).save_binary(os.path.join(tmp, f'vocab_{n}.vocab'))
+
+            print(f"\n{n:,} entries")
+            for label, load, ext in loaders:
+                elapsed, retained, peak = measure(load, os.path.join(tmp, f'vocab_{n}{ext}'))
+                print(f"  {label:<13} load {elapsed * 1000:9.1f} ms   "
+                      f"retained {retained / 1e6:8.1f} MB   peak {peak / 1e6:8.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Local stub of the Free Dictionary API for benchmarks.
+
+Serves responses in the same JSON shape as api.dictionaryapi.dev over
+HTTP/1.1 keep-alive. Words starting with "zz" (or listed in `missing`)
+return 404.
+"""
+
+import json
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+API_PREFIX = '/api/v2/entries/en/'
+
+
+def make_entry(word):
+    """Build an API-shaped response body for a word"""
+    return [{
+        'word': word,
+        'meanings': [{
+            'partOfSpeech': 'noun',
+            'definitions': [{'definition': f"Stub definition of {word}."}],
+        }],
+    }]
+
+
+class StubDictionaryServer:
+    """Threaded stub dictionary server, usable as a context manager"""
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, missing=()):
+        self.latency = latency
+        self.missing = {word.lower() for word in missing}
+        self.requests = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body go out in separate writes; without this,
+            # Nagle + delayed ACK add ~40 ms to every keep-alive response
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                stub.requests += 1
+                if stub.latency:
+                    time.sleep(stub.latency)
+
+                if not self.path.startswith(API_PREFIX):
+                    self._reply(404, {'title': 'Not Found'})
+                    return
+                word = urllib.parse.unquote(self.path[len(API_PREFIX):])
+                if word.startswith('zz') or word in stub.missing:
+                    self._reply(404, {'title': 'No Definitions Found'})
+                else:
+                    self._reply(200, make_entry(word))
+
+            def _reply(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a local stub dictionary API")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help="artificial delay per request in seconds")
+    args = parser.parse_args()
+
+    server = StubDictionaryServer(port=args.port, latency=args.latency)
+    print(f"Serving stub dictionary at {server.base_url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
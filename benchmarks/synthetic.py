@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Synthetic vocabulary datasets for benchmarks.
+
+Entries have the same shape as vocab_data.json: mixed-case words, short
+meanings, string numbers with occasional gaps.
+"""
+
+import json
+import random
+
+SYLLABLES = ['ab', 'ac', 'al', 'an', 'ar', 'be', 'bi', 'ca', 'co', 'de', 'di', 'en', 'ex',
+             'fa', 'ga', 'ho', 'in', 'ju', 'ka', 'la', 'ma', 'ne', 'no', 'or', 'pa', 'pre',
+             'qu', 're', 'sa', 'st', 'ta', 'th', 'tion', 'un', 've', 'wa', 'xi', 'ya', 'ze']
+MEANING_WORDS = ['to', 'a', 'the', 'make', 'feeling', 'very', 'something', 'person', 'place',
+                 'quickly', 'small', 'large', 'happy', 'careful', 'change', 'move', 'strong',
+                 'old', 'new', 'give', 'take', 'kind', 'of', 'or', 'not', 'able', 'being']
+
+
+def generate_records(n, empty_fraction=0.0, seed=1, review_fraction=0.0):
+    """Return n vocab_data.json style dicts, sorted by word like the real list
+
+    empty_fraction of the meanings are left empty and review_fraction are
+    "[NEEDS REVIEW] word" placeholders.
+    """
+    rng = random.Random(seed)
+    words = []
+    for _ in range(n):
+        word = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 5)))
+        if rng.random() < 0.3:
+            word = word.capitalize()
+        words.append(word)
+    words.sort(key=str.lower)
+
+    records = []
+    number = 0
+    for word in words:
+        number += 1 + (rng.random() < 0.03)
+        roll = rng.random()
+        if roll < empty_fraction:
+            meaning = ''
+        elif roll < empty_fraction + review_fraction:
+            meaning = f"[NEEDS REVIEW] {word.lower()}"
+        else:
+            meaning = ' '.join(rng.choice(MEANING_WORDS) for _ in range(rng.randint(2, 8)))
+        records.append({'word': word, 'meaning': meaning, 'number': str(number)})
+    return records
+
+
+def write_dataset(path, n, empty_fraction=0.0, seed=1, review_fraction=0.0):
+    """Write a synthetic vocab_data.json with n entries"""
+    records = generate_records(n, empty_fraction, seed, review_fraction)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(records, f, indent=2, ensure_ascii=False)
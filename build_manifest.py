@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Build manifest for incremental regeneration of derived files.
+
+For every output (letter shards, INDEX.md, HTML pages) the manifest stores a
+hash of the content it was built from, plus the file's size and mtime when it
+was written. An output is only rebuilt when its input hash changes or the file
+was modified or removed since the last build.
+"""
+
+import hashlib
+import json
+import os
+
+from vocab_journal import write_json_atomic
+from vocab_metrics import METRICS
+
+DEFAULT_MANIFEST_PATH = '.build_manifest.json'
+
+
+def content_hash(content):
+    """SHA-256 hex digest of a str or bytes value"""
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    return hashlib.sha256(content).hexdigest()
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """content_hash of a file's bytes, read a chunk at a time"""
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+class _HashSink:
+    """Write-only file object that just hashes what it is given"""
+
+    def __init__(self):
+        self._sha = hashlib.sha256()
+
+    def write(self, text):
+        self._sha.update(text.encode('utf-8'))
+
+    def hexdigest(self):
+        return self._sha.hexdigest()
+
+
+def stream_hash(write):
+    """content_hash of everything `write(f)` writes, without keeping it in memory"""
+    sink = _HashSink()
+    write(sink)
+    return sink.hexdigest()
+
+
+def write_text_atomic(path, content):
+    """Write text (or bytes) to a temp file next to `path` and rename it into place"""
+    data = content.encode('utf-8') if isinstance(content, str) else content
+    tmp_path = f"{path}.tmp"
+    with METRICS.stage('file_write'), open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    METRICS.add_bytes(path, len(data))
+
+
+def write_stream_atomic(path, write):
+    """Like write_text_atomic, with the content streamed by `write(f)`"""
+    tmp_path = f"{path}.tmp"
+    with METRICS.stage('file_write'), open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        write(f)
+    os.replace(tmp_path, path)
+    METRICS.add_bytes(path, os.path.getsize(path))
+
+
+class BuildManifest:
+    """Persistent map of output path -> input digest and file stat"""
+
+    def __init__(self, path=DEFAULT_MANIFEST_PATH):
+        self.path = path
+        self._entries = {}
+        self._dirty = False
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self._entries = json.load(f)
+
+    def is_fresh(self, output, digest):
+        """True if `output` was built from `digest` and is untouched on disk"""
+        entry = self._entries.get(output)
+        if entry is None or entry['digest'] != digest:
+            return False
+        try:
+            st = os.stat(output)
+        except FileNotFoundError:
+            return False
+        return st.st_size == entry['size'] and st.st_mtime_ns == entry['mtime_ns']
+
+    def digest(self, output):
+        """The digest `output` was last built from, or None"""
+        entry = self._entries.get(output)
+        return entry['digest'] if entry else None
+
+    def record(self, output, digest):
+        """Remember that `output` is now built from `digest`"""
+        st = os.stat(output)
+        self._entries[output] = {'digest': digest, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+        self._dirty = True
+
+    def write_if_changed(self, output, content):
+        """Write `content` to `output` unless it is already up to date"""
+        digest = content_hash(content)
+        if self.is_fresh(output, digest):
+            return False
+        write_text_atomic(output, content)
+        self.record(output, digest)
+        return True
+
+    def write_stream_if_changed(self, output, write):
+        """write_if_changed for content streamed by `write(f)`
+
+        `write` must produce the same text every time it is called: it runs
+        once to hash the content and, if the file is stale, again to write it.
+        """
+        digest = stream_hash(write)
+        if self.is_fresh(output, digest):
+            return False
+        write_stream_atomic(output, write)
+        self.record(output, digest)
+        return True
+
+    def save(self):
+        if self._dirty:
+            write_json_atomic(self.path, self._entries)
+            self._dirty = False
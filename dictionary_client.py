@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Keep-alive HTTP client for the Free Dictionary API.
+
+Each worker thread keeps one persistent http.client connection, so repeated
+lookups reuse the same TCP/TLS session instead of reconnecting per word.
+"""
+
+import http.client
+import json
+import ssl
+import threading
+import urllib.parse
+
+DEFAULT_BASE_URL = 'https://api.dictionaryapi.dev/api/v2/entries/en/'
+
+# Longer definitions are cut to MAX_DEFINITION_LENGTH - 3 characters plus '...'
+MAX_DEFINITION_LENGTH = 100
+
+
+def first_definition(data):
+    """First definition of the first meaning in an API response, or None
+
+    `data` is the parsed response: a list of entries. Long definitions are
+    shortened to fit MAX_DEFINITION_LENGTH.
+    """
+    definition = None
+    if data and isinstance(data, list) and len(data) > 0:
+        entry = data[0]
+        meanings = entry.get('meanings', [])
+
+        if meanings:
+            # Get the first definition from the first meaning
+            first_meaning = meanings[0]
+            definitions = first_meaning.get('definitions', [])
+
+            if definitions:
+                definition = definitions[0].get('definition', '')
+                # Simplify long definitions
+                if len(definition) > MAX_DEFINITION_LENGTH:
+                    definition = definition[:MAX_DEFINITION_LENGTH - 3] + '...'
+    return definition
+
+
+class DictionaryClient:
+    """Pooled dictionary lookups with one connection per thread"""
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, timeout=10):
+        parts = urllib.parse.urlsplit(base_url)
+        if parts.scheme not in ('http', 'https'):
+            raise ValueError(f"Unsupported base URL: {base_url}")
+
+        self.base_url = base_url
+        self.timeout = timeout
+        self._https = parts.scheme == 'https'
+        self._host = parts.hostname
+        self._port = parts.port
+        self._prefix = parts.path if parts.path.endswith('/') else parts.path + '/'
+        # Same relaxed verification as the original urllib code (macOS certificate issues)
+        self._ssl_context = ssl._create_unverified_context() if self._https else None
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            if self._https:
+                conn = http.client.HTTPSConnection(self._host, self._port, timeout=self.timeout,
+                                                   context=self._ssl_context)
+            else:
+                conn = http.client.HTTPConnection(self._host, self._port, timeout=self.timeout)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _reset(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+            with self._lock:
+                self._connections.remove(conn)
+
+    def get(self, word):
+        """Look up a word, returning (status, parsed JSON or None)"""
+        path = self._prefix + urllib.parse.quote(word.lower().strip())
+
+        # A pooled connection may have been closed by the server while idle;
+        # GET is idempotent, so retry once on a fresh connection.
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request('GET', path, headers={'Accept': 'application/json'})
+                response = conn.getresponse()
+                body = response.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                self._reset()
+                if attempt == 1:
+                    raise
+                continue
+            except Exception:
+                self._reset()
+                raise
+
+            if response.will_close:
+                self._reset()
+
+            data = json.loads(body.decode()) if response.status == 200 else None
+            return response.status, data
+
+    def close(self):
+        """Close every pooled connection"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
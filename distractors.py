@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Precomputed quiz distractors embedded in student-version.html.
+
+For every entry the quiz needs wrong answers. Instead of drawing random
+meanings in the page, the build picks, for each entry, up to DISTRACTORS
+other entries whose meanings are similar but different, so a question can
+be set up in O(1) and is harder to guess.
+
+Similarity is the cosine of TF-IDF weighted, hashed bag-of-words vectors of
+the meanings (plus the first word, so "to ..." verbs pair with verbs).
+Lists up to EXACT_LIMIT entries score every pair in blocks; larger ones
+only score neighbours along random projections, since comparing every pair
+is quadratic. All of this is vectorised with NumPy.
+
+Without NumPy the table is filled with random distinct meanings instead.
+
+Candidates never share the entry's word (case-insensitively) or its
+meaning, never repeat a meaning, and never use an empty or "[NEEDS REVIEW]"
+meaning. A meaning whose words are all in the entry's meaning, or the other
+way round ("give up" for "give up; leave behind"), would also be a right
+answer, so those are skipped too. The page gets:
+
+- k: distractors per entry
+- runs: [number, row, length] runs mapping entry numbers to table rows
+- table: k entry numbers per row, -1 where there are fewer candidates
+"""
+
+import json
+import random
+import re
+import time
+import zlib
+
+from search_index import number_runs
+from vocab_index import fold
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; fall back to random distractors
+    np = None
+
+DISTRACTORS = 4
+
+# Hashed feature dimensions
+FEATURES = 256
+
+# Up to this many entries every pair is scored; above it, candidates are the
+# WINDOW neighbours on each side along PROJECTIONS random directions
+EXACT_LIMIT = 20_000
+PROJECTIONS = 32
+WINDOW = 4
+
+# Rows scored per block, to bound the size of the score matrices
+EXACT_BLOCK_SIZE = 512
+BLOCK_SIZE = 4096
+
+SEED = 11
+
+_TOKEN = re.compile(r"[a-z0-9']+")
+
+
+def _usable(meaning):
+    return bool(meaning.strip()) and '[NEEDS REVIEW]' not in meaning
+
+
+def _features(meaning):
+    """Hashed feature ids of a meaning: its words plus a marker for the first one"""
+    tokens = _TOKEN.findall(meaning.lower())
+    if not tokens:
+        return []
+    ids = {zlib.crc32(token.encode('utf-8')) % FEATURES for token in tokens}
+    ids.add(zlib.crc32(b'^' + tokens[0].encode('utf-8')) % FEATURES)
+    return sorted(ids)
+
+
+def _ids(values):
+    """Dense ids for hashable values, equal values sharing an id"""
+    seen = {}
+    return [seen.setdefault(value, len(seen)) for value in values]
+
+
+def meaning_vectors(meanings):
+    """(L2-normalised TF-IDF rows, boolean feature rows) for the meanings"""
+    rows, cols = [], []
+    for i, meaning in enumerate(meanings):
+        features = _features(meaning)
+        rows.extend([i] * len(features))
+        cols.extend(features)
+
+    n = len(meanings)
+    x = np.zeros((n, FEATURES), dtype=np.float32)
+    x[np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp)] = 1.0
+    present = x > 0
+
+    df = x.sum(axis=0)
+    x *= (np.log((n + 1) / (df + 1)) + 1).astype(np.float32)
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    x /= np.maximum(norms, 1e-12)
+    return x, present
+
+
+def _neighbour_candidates(x, keep):
+    """Best `keep` (candidate, score) pairs per row from random-projection neighbours
+
+    Rows are sorted along each random direction, and each row is scored
+    against the WINDOW rows on either side. Scoring shifted copies of the
+    sorted matrix keeps memory access sequential. A running top `keep` is
+    merged after every projection, so memory stays O(n * keep).
+    """
+    n = len(x)
+    rng = np.random.default_rng(SEED)
+    projected = x @ rng.standard_normal((FEATURES, PROJECTIONS)).astype(np.float32)
+    self_index = np.arange(n)[:, None]
+
+    # Unfilled slots point at the row itself and are filtered out later
+    cand = np.repeat(self_index, keep, axis=1)
+    scores = np.full((n, keep), -np.inf, dtype=np.float32)
+    for p in range(PROJECTIONS):
+        order = np.argsort(projected[:, p], kind='stable')
+        xs = x[order]
+        new_cand = np.repeat(self_index, 2 * WINDOW, axis=1)
+        new_scores = np.full((n, 2 * WINDOW), -np.inf, dtype=np.float32)
+        for offset in range(1, WINDOW + 1):
+            similarity = np.einsum('ij,ij->i', xs[:-offset], xs[offset:])
+            left, right = order[:-offset], order[offset:]
+            new_cand[left, 2 * offset - 2] = right
+            new_scores[left, 2 * offset - 2] = similarity
+            new_cand[right, 2 * offset - 1] = left
+            new_scores[right, 2 * offset - 1] = similarity
+
+        # Skip neighbours already found along an earlier direction
+        seen = (new_cand[:, :, None] == cand[:, None, :]).any(axis=2)
+        new_scores[seen] = -np.inf
+
+        merged_cand = np.concatenate([cand, new_cand], axis=1)
+        merged_scores = np.concatenate([scores, new_scores], axis=1)
+        best = np.argpartition(-merged_scores, keep - 1, axis=1)[:, :keep]
+        cand = np.take_along_axis(merged_cand, best, axis=1)
+        scores = np.take_along_axis(merged_scores, best, axis=1)
+    return cand, scores
+
+
+def _choose(rows, cand, scores, k, meaning_ids, word_ids, usable, present):
+    """Best k valid candidates per row, each with a different meaning"""
+    cand_meanings = meaning_ids[cand]
+
+    # Meanings contained in one another
+    row_present = present[rows][:, None, :]
+    cand_present = present[cand]
+    shared = (row_present & cand_present).sum(axis=2)
+    nested = (shared == row_present.sum(axis=2)) | (shared == cand_present.sum(axis=2))
+
+    invalid = ((cand == rows[:, None])
+               | (word_ids[cand] == word_ids[rows][:, None])
+               | (cand_meanings == meaning_ids[rows][:, None])
+               | ~usable[cand]
+               | nested)
+    scores = np.where(invalid, -np.inf, scores)
+
+    # Best first, then drop later candidates repeating a meaning
+    by_score = np.argsort(-scores, axis=1, kind='stable')
+    cand = np.take_along_axis(cand, by_score, axis=1)
+    scores = np.take_along_axis(scores, by_score, axis=1)
+    cand_meanings = np.take_along_axis(cand_meanings, by_score, axis=1)
+    by_meaning = np.argsort(cand_meanings, axis=1, kind='stable')
+    grouped = np.take_along_axis(cand_meanings, by_meaning, axis=1)
+    repeat = np.zeros_like(grouped, dtype=bool)
+    repeat[:, 1:] = grouped[:, 1:] == grouped[:, :-1]
+    repeat_in_score_order = np.zeros_like(repeat)
+    np.put_along_axis(repeat_in_score_order, by_meaning, repeat, axis=1)
+    scores[repeat_in_score_order] = -np.inf
+
+    best = np.argsort(-scores, axis=1, kind='stable')[:, :k]
+    chosen = np.take_along_axis(cand, best, axis=1)
+    chosen[np.take_along_axis(scores, best, axis=1) == -np.inf] = -1
+    # A list shorter than k + 1 has fewer than k candidates per row
+    if chosen.shape[1] < k:
+        chosen = np.pad(chosen, ((0, 0), (0, k - chosen.shape[1])), constant_values=-1)
+    return chosen
+
+
+def _rank_numpy(store, k):
+    n = len(store)
+    meanings = store.meanings
+    x, present = meaning_vectors(meanings)
+    meaning_ids = np.array(_ids(meanings), dtype=np.int64)
+    word_ids = np.array(_ids(fold(word) for word in store.words), dtype=np.int64)
+    usable = np.array([_usable(meaning) for meaning in meanings], dtype=bool)
+
+    # Keep the best few candidates per row, enough to survive the validity
+    # and repeat filters
+    keep = min(n, 8 * k)
+    exact = n <= EXACT_LIMIT
+    if not exact:
+        candidates, candidate_scores = _neighbour_candidates(x, keep)
+
+    table = np.full((n, k), -1, dtype=np.int64)
+    block_size = EXACT_BLOCK_SIZE if exact else BLOCK_SIZE
+    for start in range(0, n, block_size):
+        rows = np.arange(start, min(start + block_size, n))
+        if exact:
+            scores = x[rows] @ x.T
+            scores[np.arange(len(rows)), rows] = -np.inf
+            scores[:, ~usable] = -np.inf
+            scores[meaning_ids[None, :] == meaning_ids[rows][:, None]] = -np.inf
+            cand = np.argpartition(-scores, keep - 1, axis=1)[:, :keep]
+            scores = np.take_along_axis(scores, cand, axis=1)
+        else:
+            cand = candidates[rows]
+            scores = candidate_scores[rows]
+        table[rows] = _choose(rows, cand, scores, k, meaning_ids, word_ids, usable, present)
+    return table.tolist()
+
+
+def _rank_random(store, k):
+    """Fallback without NumPy: random distinct usable meanings"""
+    rng = random.Random(SEED)
+    pool = [i for i, meaning in enumerate(store.meanings) if _usable(meaning)]
+    table = []
+    for i, (word, meaning) in enumerate(zip(store.words, store.meanings)):
+        row = []
+        seen = {meaning}
+        for _ in range(4 * k):
+            if len(row) == k or not pool:
+                break
+            j = rng.choice(pool)
+            if store.meanings[j] not in seen and fold(store.words[j]) != fold(word):
+                seen.add(store.meanings[j])
+                row.append(j)
+        table.append(row + [-1] * (k - len(row)))
+    return table
+
+
+def build_distractor_table(store, k=DISTRACTORS):
+    """Rows of k distractor positions per entry (-1 padded), and the method used"""
+    if not len(store):
+        return [], 'empty'
+    if np is None:
+        return _rank_random(store, k), 'random'
+    return _rank_numpy(store, k), 'numpy'
+
+
+def build_distractors(store, k=DISTRACTORS):
+    """The page's quizDistractors object as a JSON-serialisable dict"""
+    rows, method = build_distractor_table(store, k)
+    numbers = store.numbers
+    table = [numbers[j] if j >= 0 else -1 for row in rows for j in row]
+    return {'k': k, 'runs': number_runs(numbers), 'table': table}, method
+
+
+def generate_distractors_js(store, k=DISTRACTORS):
+    """Return (JavaScript statement, stats dict) for the quizDistractors block"""
+    start = time.perf_counter()
+    distractors, method = build_distractors(store, k)
+    data = json.dumps(distractors, separators=(',', ':'))
+    js = f"        const quizDistractors = {data};\n"
+    table = distractors['table']
+    stats = {
+        'entries': len(store),
+        'filled': sum(1 for number in table if number != -1) / max(1, len(table)),
+        'method': method,
+        'bytes': len(js.encode('utf-8')),
+        'seconds': time.perf_counter() - start,
+    }
+    return js, stats
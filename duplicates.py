@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Duplicate and conflicting-definition detection for the vocabulary.
+
+Three kinds of problems are reported in duplicates_report.txt, next to
+words_need_review.txt:
+
+- case duplicates: entries whose words only differ in case ("Abandon" and
+  "abandon"), found with the case-folded VocabIndex
+- conflicting meanings: case duplicates whose meanings disagree, i.e. the
+  TF-IDF cosine similarity of one of their meanings to the first is below
+  CONFLICT_SIMILARITY
+- near-duplicate spellings: different words that are spelled almost alike
+  ("Podcast" and "Podcasts", "e-mail" and "email")
+
+Comparing every pair of words is quadratic, so near duplicates are found by
+blocking: words are sorted by their letters, and again by their letters
+reversed (to catch differences near the start), and each word is compared
+with its WINDOW neighbours in both orders. Candidate pairs are scored with
+the Dice coefficient of their character bigrams, kept as bit rows so NumPy
+scores blocks of pairs at once. Without NumPy the same pairs are scored with
+Python sets. Either way the pass is O(n log n).
+
+    python duplicates.py
+"""
+
+import argparse
+import re
+import sys
+import time
+
+from build_manifest import BuildManifest
+from distractors import meaning_vectors
+from vocab_index import VocabIndex, fold
+from vocab_metrics import METRICS, add_arguments, configure
+from vocab_store import VocabStore
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; candidate pairs are then scored in Python
+    np = None
+
+DEFAULT_REPORT_PATH = 'duplicates_report.txt'
+
+# Neighbours each word is compared with in each sort order
+WINDOW = 4
+
+# Dice similarity of the bigrams from which two spellings count as near duplicates
+NEAR_DUPLICATE_SIMILARITY = 0.8
+
+# Meanings of the same word less similar than this conflict
+CONFLICT_SIMILARITY = 0.5
+
+# Pairs scored per block
+PAIR_BLOCK_SIZE = 100_000
+
+_NON_LETTERS = re.compile(r'[^a-z0-9]+')
+
+# Normalised words only hold these, plus the start and end markers, so
+# every bigram gets its own feature
+_ALPHABET = '^$abcdefghijklmnopqrstuvwxyz0123456789'
+_SYMBOLS = {char: i for i, char in enumerate(_ALPHABET)}
+WORD_FEATURES = len(_ALPHABET) ** 2
+
+
+def _bigrams(key):
+    """Feature ids of the character bigrams of a normalised word, with start and end markers"""
+    symbols = [_SYMBOLS[char] for char in f'^{key}$']
+    return {a * len(_ALPHABET) + b for a, b in zip(symbols, symbols[1:])}
+
+
+def _candidate_pairs_python(keys):
+    n = len(keys)
+    pairs = set()
+    for sort_key in (keys.__getitem__, lambda i: keys[i][::-1]):
+        order = sorted(range(n), key=sort_key)
+        for offset in range(1, WINDOW + 1):
+            for a, b in zip(order, order[offset:]):
+                pairs.add((a, b) if a < b else (b, a))
+    return sorted(pairs)
+
+
+def _near_python(keys, folded, threshold):
+    features = [_bigrams(key) for key in keys]
+    near = []
+    for i, j in _candidate_pairs_python(keys):
+        if folded[i] == folded[j] or not keys[i] or not keys[j]:
+            continue
+        a, b = features[i], features[j]
+        score = 2 * len(a & b) / (len(a) + len(b))
+        if score >= threshold:
+            near.append((score, i, j))
+    return near
+
+
+def _candidate_pairs_numpy(keys):
+    """(i, j) arrays, i < j, of keys within WINDOW of each other sorted forwards or backwards"""
+    n = len(keys)
+    firsts, seconds = [], []
+    for sort_key in (keys.__getitem__, lambda i: keys[i][::-1]):
+        order = np.array(sorted(range(n), key=sort_key), dtype=np.int64)
+        for offset in range(1, WINDOW + 1):
+            a, b = order[:-offset], order[offset:]
+            firsts.append(np.minimum(a, b))
+            seconds.append(np.maximum(a, b))
+    pairs = np.unique(np.concatenate(firsts) * n + np.concatenate(seconds))
+    return pairs // n, pairs % n
+
+
+def _bigram_bits(keys):
+    """Bit-packed bigram feature rows of the normalised words"""
+    n = len(keys)
+    text = ''.join(f'^{key}$' for key in keys)
+    table = np.zeros(128, dtype=np.int64)
+    table[[ord(char) for char in _ALPHABET]] = np.arange(len(_ALPHABET))
+    symbols = table[np.frombuffer(text.encode('ascii'), dtype=np.uint8)]
+
+    lengths = np.fromiter((len(key) + 2 for key in keys), dtype=np.int64, count=n)
+    ids = symbols[:-1] * len(_ALPHABET) + symbols[1:]
+    # Drop the pairs that straddle two words
+    crossing = np.cumsum(lengths)[:-1] - 1
+    ids = np.delete(ids, crossing)
+    rows = np.repeat(np.arange(n), lengths - 1)
+
+    # Rows of whole 64-bit words, so they can be ANDed and counted a word at a time
+    bits = np.zeros((n, (WORD_FEATURES + 63) // 64 * 8), dtype=np.uint8)
+    np.bitwise_or.at(bits, (rows, ids >> 3), (128 >> (ids & 7)).astype(np.uint8))
+    return bits.view(np.uint64)
+
+
+def _popcount(bits):
+    """Set bits in each row of a uint64 array"""
+    if hasattr(np, 'bitwise_count'):  # NumPy 2.0+
+        return np.bitwise_count(bits).sum(axis=1, dtype=np.int64)
+    return np.unpackbits(bits.view(np.uint8), axis=1).sum(axis=1, dtype=np.int64)
+
+
+def _near_numpy(keys, folded, threshold):
+    i, j = _candidate_pairs_numpy(keys)
+    seen = {}
+    fold_ids = np.fromiter((seen.setdefault(key, len(seen)) for key in folded),
+                           dtype=np.int64, count=len(folded))
+    empty = np.fromiter((not key for key in keys), dtype=bool, count=len(keys))
+    keep = (fold_ids[i] != fold_ids[j]) & ~empty[i] & ~empty[j]
+    i, j = i[keep], j[keep]
+
+    bits = _bigram_bits(keys)
+    sizes = _popcount(bits)
+    scores = np.empty(len(i), dtype=np.float64)
+    for start in range(0, len(i), PAIR_BLOCK_SIZE):
+        a, b = i[start:start + PAIR_BLOCK_SIZE], j[start:start + PAIR_BLOCK_SIZE]
+        shared = _popcount(bits[a] & bits[b])
+        scores[start:start + len(a)] = 2 * shared / (sizes[a] + sizes[b])
+
+    found = scores >= threshold
+    return list(zip(scores[found].tolist(), i[found].tolist(), j[found].tolist()))
+
+
+def find_near_duplicates(store, threshold=NEAR_DUPLICATE_SIMILARITY):
+    """[(similarity, position, position)] of different words spelled almost alike
+
+    Words are compared case-folded, with everything but letters and digits
+    removed.
+    """
+    folded = [fold(word) for word in store.words]
+    keys = [_NON_LETTERS.sub('', key) for key in folded]
+    if np is not None and keys:
+        near = _near_numpy(keys, folded, threshold)
+    else:
+        near = _near_python(keys, folded, threshold)
+    near.sort(key=lambda item: (-item[0], item[1], item[2]))
+    return near
+
+
+def _usable(meaning):
+    return bool(meaning.strip()) and '[NEEDS REVIEW]' not in meaning
+
+
+def _meaning_similarity(meanings, pairs):
+    """Cosine similarity of the meanings in each (a, b) index pair"""
+    if np is None:
+        # Fall back to the overlap of the words in the meanings
+        tokens = [set(_NON_LETTERS.split(meaning.lower())) - {''} for meaning in meanings]
+        return [len(tokens[a] & tokens[b]) / max(1, len(tokens[a] | tokens[b])) for a, b in pairs]
+    x, _ = meaning_vectors(meanings)
+    pairs = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+    scores = np.empty(len(pairs), dtype=np.float64)
+    for start in range(0, len(pairs), PAIR_BLOCK_SIZE):
+        a, b = pairs[start:start + PAIR_BLOCK_SIZE].T
+        scores[start:start + len(a)] = np.einsum('ij,ij->i', x[a], x[b])
+    return scores.tolist()
+
+
+def find_conflicts(store, groups, threshold=CONFLICT_SIMILARITY):
+    """[(similarity, positions)] for case-duplicate groups whose meanings disagree
+
+    Each distinct meaning of a group is compared with the group's first one,
+    and the group is scored by the least similar. Empty and "[NEEDS REVIEW]"
+    meanings are left out.
+    """
+    meanings = []
+    pairs = []
+    owners = []
+    for key, positions in groups.items():
+        distinct = {}
+        for i in positions:
+            meaning = store.meanings[i]
+            if _usable(meaning):
+                distinct.setdefault(' '.join(_NON_LETTERS.split(meaning.lower())).strip(), meaning)
+        distinct = list(distinct.values())
+        base = len(meanings)
+        meanings.extend(distinct)
+        for other in range(1, len(distinct)):
+            pairs.append((base, base + other))
+            owners.append(key)
+    if not pairs:
+        return []
+
+    worst = {}
+    for key, similarity in zip(owners, _meaning_similarity(meanings, pairs)):
+        worst[key] = min(similarity, worst.get(key, 1.0))
+    conflicts = [(similarity, groups[key]) for key, similarity in worst.items() if similarity < threshold]
+    conflicts.sort(key=lambda item: (item[0], item[1][0]))
+    return conflicts
+
+
+def find_duplicates(store, index=None):
+    """Case duplicates, conflicting meanings and near-duplicate spellings in `store`
+
+    `index` is the store's VocabIndex, built here if not given.
+    """
+    with METRICS.stage('duplicates:case'):
+        groups = (index if index is not None else VocabIndex(store)).duplicates()
+    with METRICS.stage('duplicates:conflicts'):
+        conflicts = find_conflicts(store, groups)
+    with METRICS.stage('duplicates:near'):
+        near = find_near_duplicates(store)
+    return {
+        'case': sorted(groups.values(), key=lambda positions: positions[0]),
+        'conflicts': conflicts,
+        'near': near,
+    }
+
+
+def format_report(store, report):
+    """Text of duplicates_report.txt"""
+    numbers, words, meanings = store.numbers, store.words, store.meanings
+
+    def entry(i):
+        return f'#{numbers[i]} {words[i]}'
+
+    lines = [f"# Case duplicates: {len(report['case'])}\n"]
+    for positions in report['case']:
+        lines.append(', '.join(entry(i) for i in positions) + '\n')
+
+    lines.append(f"\n# Conflicting meanings: {len(report['conflicts'])}\n")
+    for similarity, positions in report['conflicts']:
+        lines.append(f"{words[positions[0]]} (similarity {similarity:.2f})\n")
+        for i in positions:
+            lines.append(f"  {entry(i)}: {meanings[i]}\n")
+
+    lines.append(f"\n# Near-duplicate spellings: {len(report['near'])}\n")
+    for similarity, i, j in report['near']:
+        lines.append(f"{similarity:.2f}  {entry(i)} ~ {entry(j)}\n")
+    return ''.join(lines)
+
+
+def detect_duplicates(store, manifest=None, path=DEFAULT_REPORT_PATH, index=None):
+    """Find duplicates in `store`, write the report to `path` and print a summary"""
+    start = time.perf_counter()
+    report = find_duplicates(store, index)
+    seconds = time.perf_counter() - start
+
+    own_manifest = manifest is None
+    if own_manifest:
+        manifest = BuildManifest()
+    manifest.write_if_changed(path, format_report(store, report))
+    if own_manifest:
+        manifest.save()
+
+    print(f"🔁 {len(report['case'])} case duplicates, {len(report['conflicts'])} with conflicting "
+          f"meanings, {len(report['near'])} near-duplicate spellings "
+          f"({'numpy' if np is not None else 'python'}, {seconds * 1000:.0f} ms) → {path}")
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Report duplicate words and conflicting meanings")
+    parser.add_argument('--vocab', default='vocab_data.json')
+    parser.add_argument('--output', default=DEFAULT_REPORT_PATH)
+    add_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    configure(args)
+    with METRICS.stage('load'):
+        store = VocabStore.load(args.vocab)
+    detect_duplicates(store, path=args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,9 +1,17 @@
 #!/usr/bin/env python3
 """
 Script to replace [NEEDS REVIEW] meanings with proper child-friendly definitions
+
+vocab_data.json is read and written one entry at a time (see vocab_stream).
 """
 
-import json
+import argparse
+
+from build_manifest import file_hash
+from vocab_index import VocabIndex, fold
+from vocab_journal import DEFAULT_VOCAB_PATH, ProgressJournal
+from vocab_metrics import METRICS, add_arguments, configure
+from vocab_stream import PassStats, apply_updates, drain, read_entries, save_entries
 
 # Child-friendly meanings for the 112 words that need review
 REVIEW_MEANINGS = {
@@ -121,35 +129,49 @@ REVIEW_MEANINGS = {
     "Zoom": "a video calling app; to move fast",
 }
 
+# REVIEW_MEANINGS keyed by case-folded word, so "Zoom" also fixes "zoom"
+_REVIEW_BY_KEY = {fold(word): meaning for word, meaning in REVIEW_MEANINGS.items()}
 
-def fix_review_words():
-    """Replace [NEEDS REVIEW] meanings with proper definitions"""
 
-    # Load vocabulary
-    with open('vocab_data.json', 'r', encoding='utf-8') as f:
-        vocab_data = json.load(f)
+def fix_review(entries, stats):
+    """Stage: replace [NEEDS REVIEW] meanings with the curated REVIEW_MEANINGS
 
-    fixed_count = 0
-    not_found = []
+    Each word is reported once, however many entries share it; the words
+    missing from REVIEW_MEANINGS are all kept in stats.examples['review_missing'].
+    """
+    reported = set()
+    for number, word, meaning in entries:
+        if '[NEEDS REVIEW]' in meaning:
+            key = fold(word)
+            fixed = _REVIEW_BY_KEY.get(key)
+            if fixed is None:
+                if key not in reported:
+                    stats.note('review_missing', word, keep=None)
+                    print(f"  ⚠️  Not found in mapping: {word}")
+            elif fixed != meaning:
+                meaning = fixed
+                stats.note('fixed')
+                stats.change(number, word, meaning)
+                if key not in reported:
+                    print(f"  ✓ Fixed: {word}")
+            reported.add(key)
+        yield number, word, meaning
 
-    print(f"Processing {len(vocab_data)} words...")
 
-    for entry in vocab_data:
-        word = entry['word']
-        meaning = entry.get('meaning', '')
+def count_review(entries, stats):
+    """Stage: count the entries whose meaning still needs review"""
+    for entry in entries:
+        if '[NEEDS REVIEW]' in entry[2]:
+            stats.note('needs_review')
+        yield entry
 
-        if '[NEEDS REVIEW]' in meaning:
-            if word in REVIEW_MEANINGS:
-                entry['meaning'] = REVIEW_MEANINGS[word]
-                fixed_count += 1
-                print(f"  ✓ Fixed: {word}")
-            else:
-                not_found.append(word)
-                print(f"  ⚠️  Not found in mapping: {word}")
 
-    # Save updated vocabulary
-    with open('vocab_data.json', 'w', encoding='utf-8') as f:
-        json.dump(vocab_data, f, indent=2, ensure_ascii=False)
+def report_fixes(stats):
+    """Print what fix_review did; returns (entries fixed, words missing from REVIEW_MEANINGS)"""
+    fixed_count = stats.counts['fixed']
+    not_found = stats.examples['review_missing']
+    METRICS.incr('entries_fixed', fixed_count)
+    METRICS.incr('words_not_found', len(not_found))
 
     print(f"\n✅ Fixed {fixed_count} words")
 
@@ -160,10 +182,71 @@ def fix_review_words():
     else:
         print("✓ All review words have been fixed!")
 
+    return fixed_count, not_found
+
+
+def fix_review_meanings(store, journal=None, index=None):
+    """Replace [NEEDS REVIEW] meanings in a VocabStore with curated ones
+
+    Runs the fix_review stage over the entries that need review, word by
+    word through the store's VocabIndex (built here if not given). Each fix
+    is recorded in `journal` if one is given.
+    Returns (number of entries fixed, words missing from REVIEW_MEANINGS).
+    """
+    print(f"Processing {len(store)} words...")
+
+    if index is None:
+        index = VocabIndex(store)
+    numbers, words, meanings = store.numbers, store.words, store.meanings
+    review = ((numbers[i], words[i], meanings[i])
+              for key in index.keys() for i in index.positions(key)
+              if '[NEEDS REVIEW]' in meanings[i])
+
+    stats = PassStats()
+    with METRICS.stage('fix'):
+        drain(fix_review(review, stats))
+        for number, (word, meaning) in stats.changed.items():
+            store.set_meaning(store.position(number), meaning)
+            if journal is not None:
+                journal.record(number, word, meaning)
+
+    return report_fixes(stats)
+
+
+def fix_review_words(path=DEFAULT_VOCAB_PATH):
+    """Replace [NEEDS REVIEW] meanings in `path` with proper definitions, one entry at a time"""
+    loaded = file_hash(path)
+
+    # Pick up updates left behind by an interrupted build
+    journal = ProgressJournal()
+    updates = journal.updates()
+    if updates:
+        print(f"↩️  Replaying {len(updates)} journaled updates")
+
+    print(f"Processing {path}...")
+    stats = PassStats()
+    entries = apply_updates(read_entries(path), updates, stats)
+    entries = fix_review(entries, stats)
+    entries = count_review(entries, stats)
+
+    # Save updated vocabulary
+    with METRICS.stage('fix'):
+        save_entries(entries, path, stats, loaded)
+    journal.discard()
+    report_fixes(stats)
+
     # Verify no more [NEEDS REVIEW] tags
-    needs_review = [entry['word'] for entry in vocab_data if '[NEEDS REVIEW]' in entry.get('meaning', '')]
-    print(f"\nFinal check: {len(needs_review)} words still need review")
+    print(f"\nFinal check: {stats.counts['needs_review']} words still need review")
 
 
-if __name__ == '__main__':
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replace [NEEDS REVIEW] meanings with curated definitions")
+    add_arguments(parser)
+    configure(parser.parse_args(argv))
+
     fix_review_words()
+    print(f"\n📈 Metrics written to {METRICS.write()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Streaming splice of generated blocks into the HTML pages.
+
+Generated data lives between explicit marker comments in the page:
+
+        // @begin vocabData
+        const vocabData = [
+        ...
+        ];
+        // @end vocabData
+
+The page is streamed line by line: the head and tail are copied unchanged,
+the block between the markers is replaced by the output of a writer
+function, and the result goes to a temp file that is renamed into place.
+splice_file returns the result instead, for builds that write it elsewhere.
+"""
+
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+
+from vocab_metrics import METRICS
+
+
+def begin_marker(name):
+    return f"// @begin {name}"
+
+
+def end_marker(name):
+    return f"// @end {name}"
+
+
+class _HashingWriter:
+    """File wrapper that hashes everything written through it"""
+
+    def __init__(self, f):
+        self._f = f
+        self._sha = hashlib.sha256()
+
+    def write(self, text):
+        self._sha.update(text.encode('utf-8'))
+        return self._f.write(text)
+
+    def digest(self):
+        return self._sha.digest()
+
+
+def _splice_lines(lines, out, writers, path):
+    """Copy `lines` to `out`, replacing each named block; True if a block changed"""
+    begins = {begin_marker(name): name for name in writers}
+    changed = False
+    found = set()
+
+    lines = iter(lines)
+    for line in lines:
+        out.write(line)
+        name = begins.get(line.strip())
+        if name is None:
+            continue
+
+        new_block = _HashingWriter(out)
+        writers[name](new_block)
+
+        # Skip the old block, hashing it for change detection
+        old_block = hashlib.sha256()
+        end = end_marker(name)
+        for old_line in lines:
+            if old_line.strip() == end:
+                out.write(old_line)
+                break
+            old_block.update(old_line.encode('utf-8'))
+        else:
+            raise ValueError(f"{path}: '{begin_marker(name)}' has no matching '{end}'")
+
+        found.add(name)
+        changed = changed or old_block.digest() != new_block.digest()
+
+    missing = set(writers) - found
+    if missing:
+        raise ValueError(f"{path}: no '{begin_marker(sorted(missing)[0])}' marker found")
+    return changed
+
+
+def splice_blocks(path, writers):
+    """Replace each named marker block in `path` with its writer's output
+
+    `writers` maps block name -> callable(f) that writes the new block body.
+    Returns True if the file changed; an unchanged file is left untouched.
+    Raises ValueError if a block's markers are missing or unterminated.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', dir=directory)
+
+    try:
+        with open(path, 'r', encoding='utf-8', newline='') as src, \
+                os.fdopen(fd, 'w', encoding='utf-8', newline='') as out:
+            changed = _splice_lines(src, out, writers, path)
+
+        if changed:
+            shutil.copymode(path, tmp_path)
+            os.replace(tmp_path, path)
+            METRICS.add_bytes(path, os.path.getsize(path))
+        else:
+            os.unlink(tmp_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    return changed
+
+
+def splice_file(path, writers):
+    """The text of `path` with its marker blocks replaced, leaving the file as it is"""
+    out = io.StringIO()
+    with open(path, 'r', encoding='utf-8', newline='') as src:
+        _splice_lines(src, out, writers, path)
+    return out.getvalue()
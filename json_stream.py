@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Incremental reader for a file holding one big JSON array.
+
+iter_array() yields the elements of the top-level array one at a time. The
+file is read CHUNK_SIZE characters at a time, and the elements that are
+complete in the buffer are decoded together, so memory holds about one
+chunk's worth of elements however long the array is. An element that
+straddles two chunks is decoded on its own with json.JSONDecoder.raw_decode
+once the rest of it is read. Only the standard library is used.
+
+    python json_stream.py vocab_data.json     # count the elements
+"""
+
+import json
+import re
+import sys
+
+CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_NUMBER_TAIL = re.compile(r'[0-9.eE+-]*\Z')
+
+
+class _Chunks:
+    """A text file read a chunk at a time, with a cursor into the unread part"""
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.offset = 0  # characters dropped from the front of buf so far
+
+    def more(self):
+        """Read another chunk; False at the end of the file"""
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            return False
+        self.offset += self.pos
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """The next character after any whitespace, or '' at the end of the file"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.more():
+                return ''
+
+    def expect(self, chars, what):
+        """Consume the next character, which must be one of `chars`"""
+        char = self.peek()
+        if not char or char not in chars:
+            found = repr(char) if char else 'end of file'
+            raise ValueError(f"expected {what} at offset {self.offset + self.pos}, found {found}")
+        self.pos += 1
+        return char
+
+    def value(self, decoder):
+        """Decode the JSON value at the cursor, reading more of the file as needed"""
+        self.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # Most likely cut off by the end of the chunk
+                if self.more():
+                    continue
+                raise
+            # A number that runs up to the end of the chunk may go on in the next one
+            if (isinstance(value, (int, float)) and _NUMBER_TAIL.match(self.buf, end)
+                    and self.more()):
+                continue
+            self.pos = end
+            return value
+
+
+def iter_array(f, chunk_size=CHUNK_SIZE):
+    """Yield the elements of the JSON array that makes up text file `f`"""
+    chunks = _Chunks(f, chunk_size)
+    decoder = json.JSONDecoder()
+    chunks.expect('[', "'['")
+    if chunks.peek() == ']':
+        chunks.pos += 1
+    else:
+        # File offset of a cut that did not parse; elements up to it are
+        # decoded one at a time
+        slow_until = -1
+        while True:
+            # Fast path: every element complete in the buffer, decoded by one
+            # json.loads up to the last "}," (or ","). A cut inside a string
+            # or a nested value never parses, and then the elements are
+            # decoded on their own, reading on as far as each one goes.
+            buf, pos = chunks.buf, chunks.pos
+            cut = buf.rfind('},', pos) + 1 or buf.rfind(',', pos)
+            if cut > pos and chunks.offset + pos > slow_until:
+                try:
+                    values = json.loads('[' + buf[pos:cut] + ']')
+                except ValueError:
+                    slow_until = chunks.offset + cut
+                else:
+                    chunks.pos = cut + 1
+                    yield from values
+                    continue
+            yield chunks.value(decoder)
+            if chunks.expect(',]', "',' or ']'") == ']':
+                break
+    if chunks.peek():
+        raise ValueError(f"unexpected data after the array at offset {chunks.offset + chunks.pos}")
+
+
+def iter_file(path, chunk_size=CHUNK_SIZE):
+    """iter_array for the file at `path`"""
+    with open(path, 'r', encoding='utf-8') as f:
+        yield from iter_array(f, chunk_size)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        print("usage: python json_stream.py FILE.json", file=sys.stderr)
+        return 2
+    count = sum(1 for _ in iter_file(argv[0]))
+    print(f"{argv[0]}: {count} elements")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
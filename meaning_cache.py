@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Persistent SQLite cache for dictionary API responses.
+
+Found definitions and "not found" (404) answers are both cached, each with
+its own time-to-live, so reruns of populate_meanings.py skip the network for
+words that were already looked up.
+"""
+
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_PATH = '.meaning_cache.sqlite3'
+
+DAY = 24 * 60 * 60
+DEFAULT_HIT_TTL = 180 * DAY
+DEFAULT_MISS_TTL = 14 * DAY
+
+# Returned by MeaningCache.get() when the word has no usable cache entry
+MISSING = object()
+
+
+class MeaningCache:
+    """Word -> definition cache with separate TTLs for hits and 404 misses"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, hit_ttl=DEFAULT_HIT_TTL,
+                 miss_ttl=DEFAULT_MISS_TTL, max_entries=None, refresh=False):
+        self.path = path
+        self.hit_ttl = hit_ttl
+        self.miss_ttl = miss_ttl
+        self.max_entries = max_entries
+        self.refresh = refresh
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS meanings ("
+            " word TEXT PRIMARY KEY,"
+            " definition TEXT,"
+            " fetched_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def key(word):
+        return word.lower().strip()
+
+    def get(self, word):
+        """Return the cached definition, None for a cached 404, or MISSING"""
+        with self._lock:
+            if self.refresh:
+                self.misses += 1
+                return MISSING
+
+            row = self._conn.execute(
+                "SELECT definition, fetched_at FROM meanings WHERE word = ?",
+                (self.key(word),)
+            ).fetchone()
+
+            if row is not None:
+                definition, fetched_at = row
+                ttl = self.hit_ttl if definition is not None else self.miss_ttl
+                if time.time() - fetched_at < ttl:
+                    if definition is None:
+                        self.negative_hits += 1
+                    else:
+                        self.hits += 1
+                    return definition
+
+            self.misses += 1
+            return MISSING
+
+    def put(self, word, definition):
+        """Store a definition, or None to remember that the word was not found"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meanings (word, definition, fetched_at) VALUES (?, ?, ?)",
+                (self.key(word), definition, time.time())
+            )
+            self._conn.commit()
+
+    def evict(self):
+        """Drop expired entries, then the oldest ones beyond max_entries"""
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM meanings WHERE"
+                " (definition IS NOT NULL AND fetched_at < ?)"
+                " OR (definition IS NULL AND fetched_at < ?)",
+                (now - self.hit_ttl, now - self.miss_ttl)
+            )
+            removed = cur.rowcount
+
+            if self.max_entries is not None:
+                cur = self._conn.execute(
+                    "DELETE FROM meanings WHERE word NOT IN"
+                    " (SELECT word FROM meanings ORDER BY fetched_at DESC LIMIT ?)",
+                    (self.max_entries,)
+                )
+                removed += cur.rowcount
+
+            self._conn.commit()
+            return removed
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def summary(self):
+        return (f"{self.hits} hits, {self.negative_hits} cached not-found, "
+                f"{self.misses} misses")
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Tiered lookup of meanings for vocabulary words.
+
+Sources are tried in priority order:
+
+1. curated  - the child-friendly tables (COMMON_MEANINGS, REVIEW_MEANINGS)
+2. offline  - a local dictionary, if one is available
+3. cache    - earlier API answers, including remembered "not found"s
+4. api      - the remote dictionary API
+
+Words are keyed case-insensitively, so each distinct word is resolved once
+per run. All local tiers are tried for every word first, and only the words
+none of them could answer are sent to the API on the thread pool. Each result
+records the tier that answered; words nobody could define get a
+"[NEEDS REVIEW]" placeholder and the tier "review".
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from meaning_cache import MISSING
+from vocab_index import fold
+from vocab_metrics import METRICS
+
+REVIEW_TIER = 'review'
+
+
+def needs_review(word):
+    """Placeholder meaning for a word no source could define"""
+    return f"[NEEDS REVIEW] {word.lower()}"
+
+
+class CuratedTier:
+    """Hand-written meaning tables, earlier tables taking priority"""
+
+    name = 'curated'
+
+    def __init__(self, *tables):
+        self._meanings = {}
+        for table in reversed(tables):
+            self._meanings.update((fold(word), meaning) for word, meaning in table.items())
+
+    def lookup(self, key, word):
+        return self._meanings.get(key, MISSING)
+
+
+class OfflineTier:
+    """A local dictionary: any object whose get(word) returns a definition or None"""
+
+    name = 'offline'
+
+    def __init__(self, dictionary):
+        self.dictionary = dictionary
+
+    def lookup(self, key, word):
+        definition = self.dictionary.get(key)
+        return MISSING if definition is None else definition
+
+
+class CacheTier:
+    """MeaningCache of earlier API answers; a cached 404 resolves to None"""
+
+    name = 'cache'
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def lookup(self, key, word):
+        return self.cache.get(word)
+
+
+class RemoteTier:
+    """The dictionary API, called through fetch(word) -> definition or None"""
+
+    name = 'api'
+
+    def __init__(self, fetch):
+        self.fetch = fetch
+
+    def lookup(self, key, word):
+        return self.fetch(word)
+
+
+class MeaningResolver:
+    """Resolve distinct words through local tiers, then the remote tier"""
+
+    def __init__(self, local_tiers, remote=None, workers=4):
+        self.local_tiers = list(local_tiers)
+        self.remote = remote
+        self.workers = workers
+
+    @property
+    def tier_names(self):
+        names = [tier.name for tier in self.local_tiers]
+        if self.remote is not None:
+            names.append(self.remote.name)
+        return names + [REVIEW_TIER]
+
+    def resolve_local(self, key, word):
+        """(meaning, tier) from the first local tier that knows `key`, else MISSING"""
+        for tier in self.local_tiers:
+            meaning = tier.lookup(key, word)
+            if meaning is MISSING:
+                continue
+            if not meaning:
+                # The tier knows there is no definition (e.g. a cached 404)
+                return needs_review(word), REVIEW_TIER
+            return meaning, tier.name
+        return MISSING
+
+    def resolve(self, words):
+        """Yield (key, meaning, tier) for `words` ({key: word}) in their order
+
+        Remote lookups for the words every local tier missed run on a pool of
+        `workers` threads while the local answers are yielded.
+        """
+        local = {}
+        for key, word in words.items():
+            result = self.resolve_local(key, word)
+            if result is MISSING and self.remote is None:
+                result = needs_review(word), REVIEW_TIER
+            local[key] = result
+        remote_keys = [key for key, result in local.items() if result is MISSING]
+
+        def lookup(key):
+            meaning = self.remote.lookup(key, words[key])
+            if meaning:
+                return meaning, self.remote.name
+            return needs_review(words[key]), REVIEW_TIER
+
+        with ThreadPoolExecutor(max_workers=max(1, self.workers)) as executor:
+            # map() yields results in submission order, matching `words`
+            remote_results = executor.map(lookup, remote_keys)
+            for key, result in local.items():
+                if result is MISSING:
+                    result = next(remote_results)
+                meaning, tier = result
+                METRICS.incr(f'resolved_{tier}')
+                yield key, meaning, tier
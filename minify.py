@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Conservative minification of the inline CSS and JavaScript in the pages.
+
+Nothing here parses the code properly; both minifiers only remove comments
+and whitespace that cannot matter:
+
+- CSS: comments go, whitespace runs shrink to one space, and spaces next to
+  { } ; : , > are dropped. Strings are copied unchanged.
+- JavaScript: comments go and whitespace between tokens is dropped unless
+  both sides are identifier characters (or the same +, - or / operator). Line
+  breaks are kept where automatic semicolon insertion could depend on them.
+  Strings, template literals and regular expression literals are copied
+  unchanged.
+
+minify_html applies them to every <style> and inline <script> element and
+leaves the markup itself alone.
+
+    python minify.py student-version.html > student-version.min.html
+"""
+
+import re
+import sys
+
+_WORD = re.compile(r'[A-Za-z0-9_$\\]')
+
+# A `/` after one of these words starts a regular expression, not a division
+_REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete',
+                   'void', 'throw', 'instanceof', 'yield', 'await'}
+
+# A line break right after one of these, or right before one of the next
+# set, can never end a statement, so it can go
+_JOINS_AFTER = set('{([,;')
+_JOINS_BEFORE = set(')]},;.')
+
+_CSS_TIGHT = set('{};:,>')
+
+_ELEMENT = re.compile(r'(<(style|script)\b([^>]*)>)(.*?)(</\2\s*>)', re.IGNORECASE | re.DOTALL)
+
+
+def _skip_string(src, i):
+    """Index just past the quoted string that starts at src[i]"""
+    quote = src[i]
+    i += 1
+    while i < len(src):
+        char = src[i]
+        if char == '\\':
+            i += 2
+            continue
+        i += 1
+        if char == quote:
+            return i
+        if char == '\n':
+            break
+    raise ValueError(f"unterminated string literal at offset {i}")
+
+
+def _skip_template(src, i):
+    """Index just past the template literal that starts at src[i]"""
+    i += 1
+    while i < len(src):
+        char = src[i]
+        if char == '\\':
+            i += 2
+        elif char == '`':
+            return i + 1
+        elif src.startswith('${', i):
+            i = _skip_expression(src, i + 2)
+        else:
+            i += 1
+    raise ValueError("unterminated template literal")
+
+
+def _skip_expression(src, i):
+    """Index just past the } that closes a template ${...} starting at src[i]"""
+    depth = 0
+    while i < len(src):
+        char = src[i]
+        if char in '\'"':
+            i = _skip_string(src, i)
+        elif char == '`':
+            i = _skip_template(src, i)
+        elif char == '{':
+            depth += 1
+            i += 1
+        elif char == '}':
+            if depth == 0:
+                return i + 1
+            depth -= 1
+            i += 1
+        else:
+            i += 1
+    raise ValueError("unterminated template expression")
+
+
+def _skip_regex(src, i):
+    """Index just past the regular expression literal (and flags) at src[i]"""
+    i += 1
+    in_class = False
+    while i < len(src):
+        char = src[i]
+        if char == '\\':
+            i += 2
+            continue
+        if char == '\n':
+            break
+        i += 1
+        if char == '[':
+            in_class = True
+        elif char == ']':
+            in_class = False
+        elif char == '/' and not in_class:
+            while i < len(src) and _WORD.match(src[i]):
+                i += 1
+            return i
+    raise ValueError("unterminated regular expression literal")
+
+
+def _regex_allowed(out):
+    """Whether a / after the output so far starts a regular expression"""
+    text = ''.join(out[-16:]).rstrip()
+    if not text:
+        return True
+    last = text[-1]
+    if last in ')]':
+        return False
+    if _WORD.match(last):
+        word = re.search(r'[A-Za-z0-9_$]+$', text)
+        return word is not None and word.group() in _REGEX_KEYWORDS
+    return True
+
+
+def _separator(prev, following, newline):
+    """What whitespace between `prev` and `following` must become"""
+    if newline and prev not in _JOINS_AFTER and following not in _JOINS_BEFORE:
+        return '\n'
+    if _WORD.match(prev) and _WORD.match(following):
+        return ' '
+    # Keep `a - -b` and `a / /x/` apart
+    if prev == following and prev in '+-/':
+        return ' '
+    if prev.isdigit() and following == '.':
+        return ' '
+    return ''
+
+
+def minify_js(src):
+    """JavaScript with comments and needless whitespace removed"""
+    out = []
+    i = 0
+    n = len(src)
+    pending = None  # None, or whether the skipped whitespace held a line break
+    while i < n:
+        char = src[i]
+        if char in ' \t\r\n\f\v':
+            pending = bool(pending) or char == '\n'
+            i += 1
+            continue
+        if src.startswith('//', i):
+            end = src.find('\n', i)
+            i = n if end < 0 else end
+            continue
+        if src.startswith('/*', i):
+            end = src.find('*/', i + 2)
+            if end < 0:
+                raise ValueError("unterminated comment")
+            # Like whitespace, a comment still separates the tokens around it
+            pending = bool(pending) or '\n' in src[i:end]
+            i = end + 2
+            continue
+
+        if char in '\'"':
+            end = _skip_string(src, i)
+        elif char == '`':
+            end = _skip_template(src, i)
+        elif char == '/' and _regex_allowed(out):
+            end = _skip_regex(src, i)
+        else:
+            end = i + 1
+
+        if pending is not None and out:
+            out.append(_separator(out[-1][-1], char, pending))
+        pending = None
+        out.append(src[i:end])
+        i = end
+    return ''.join(out)
+
+
+def minify_css(src):
+    """CSS with comments and needless whitespace removed"""
+    out = []
+    i = 0
+    n = len(src)
+    space = False
+    while i < n:
+        char = src[i]
+        if char in ' \t\r\n\f':
+            space = True
+            i += 1
+            continue
+        if src.startswith('/*', i):
+            end = src.find('*/', i + 2)
+            if end < 0:
+                raise ValueError("unterminated comment")
+            space = True
+            i = end + 2
+            continue
+        end = _skip_string(src, i) if char in '\'"' else i + 1
+        if space and out and out[-1][-1] not in _CSS_TIGHT and char not in _CSS_TIGHT:
+            out.append(' ')
+        space = False
+        # The last declaration of a rule needs no semicolon
+        if char == '}' and out and out[-1] == ';':
+            out.pop()
+        out.append(src[i:end])
+        i = end
+    return ''.join(out)
+
+
+def minify_html(html):
+    """`html` with the contents of its <style> and inline <script> elements minified"""
+    def replace(match):
+        opening, tag, attributes, body, closing = match.groups()
+        if tag.lower() == 'style':
+            return opening + minify_css(body) + closing
+        if 'src=' in attributes.lower() or 'json' in attributes.lower():
+            return match.group(0)
+        return opening + minify_js(body) + closing
+
+    return _ELEMENT.sub(replace, html)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        print("usage: python minify.py PAGE.html", file=sys.stderr)
+        return 2
+    with open(argv[0], 'r', encoding='utf-8') as f:
+        sys.stdout.write(minify_html(f.read()))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
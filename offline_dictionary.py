@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Offline dictionary built from a bulk dump of API responses.
+
+The import streams a dump with one API-shaped JSON value per line (an entry
+object, or a list of entries as the API returns it; .gz files are read
+transparently). It keeps the definition fetch_meaning_from_api would pick, and
+writes a sorted index that lookups memory-map:
+
+    header   magic b'VDIC', format version, entry count
+    offsets  count + 1 uint64 offsets of each record in the blob
+    blob     records "key\\0definition" in UTF-8, sorted by key bytes
+
+Keys are case-folded words. Entries without a definition are stored with an
+empty one, so the word resolves to "needs review" without asking the API.
+When a word appears more than once the first occurrence in the dump wins.
+
+Sorting is external: sorted runs of RUN_SIZE entries are spilled to temp
+files and merged, so the import never holds the whole dump in memory.
+Opening the index only reads the header, so startup cost does not depend on
+the size of the dictionary.
+
+    python offline_dictionary.py import dump.jsonl.gz
+    python offline_dictionary.py lookup serendipity
+"""
+
+import argparse
+import gzip
+import heapq
+import json
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import time
+from array import array
+
+from dictionary_client import first_definition
+from vocab_index import fold
+from vocab_metrics import METRICS
+
+DEFAULT_DICTIONARY_PATH = 'offline_dictionary.idx'
+
+INDEX_MAGIC = b'VDIC'
+INDEX_VERSION = 1
+
+# Entries sorted in memory before a run is spilled to disk
+RUN_SIZE = 200_000
+
+_HEADER = struct.Struct('<4sIQ')
+_RUN_RECORD = struct.Struct('<IQI')
+
+
+def iter_dump(path):
+    """Yield (word, definition or None) for each entry in a dump file"""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                data = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{path}:{line_number}: not valid JSON ({e})") from None
+            for entry in data if isinstance(data, list) else [data]:
+                word = entry.get('word') if isinstance(entry, dict) else None
+                if word:
+                    yield word, first_definition([entry])
+
+
+def _write_run(entries, directory):
+    """Sort (key, seq, definition) entries and spill them to a temp file"""
+    entries.sort()
+    fd, path = tempfile.mkstemp(prefix='.dictionary-run.', dir=directory)
+    with os.fdopen(fd, 'wb') as f:
+        for key, seq, definition in entries:
+            f.write(_RUN_RECORD.pack(len(key), seq, len(definition)))
+            f.write(key)
+            f.write(definition)
+    return path
+
+
+def _read_run(path):
+    with open(path, 'rb') as f:
+        while True:
+            header = f.read(_RUN_RECORD.size)
+            if not header:
+                return
+            key_length, seq, definition_length = _RUN_RECORD.unpack(header)
+            yield f.read(key_length), seq, f.read(definition_length)
+
+
+def import_dump(dump_path, output=DEFAULT_DICTIONARY_PATH, run_size=RUN_SIZE):
+    """Build the sorted index at `output` from a dump; returns import stats"""
+    start = time.perf_counter()
+    directory = os.path.dirname(os.path.abspath(output))
+    runs = []
+    entries = []
+    read = 0
+
+    try:
+        with METRICS.stage('dictionary_sort'):
+            for seq, (word, definition) in enumerate(iter_dump(dump_path)):
+                read += 1
+                key = fold(word)
+                if not key:
+                    continue
+                entries.append((key.encode('utf-8'), seq, (definition or '').encode('utf-8')))
+                if len(entries) >= run_size:
+                    runs.append(_write_run(entries, directory))
+                    entries = []
+            if entries or not runs:
+                runs.append(_write_run(entries, directory))
+            entries = []
+
+        with METRICS.stage('dictionary_merge'):
+            count = _merge_runs(runs, output, directory)
+    finally:
+        for path in runs:
+            os.unlink(path)
+
+    METRICS.add_bytes(output, os.path.getsize(output))
+    return {
+        'entries_read': read,
+        'words': count,
+        'runs': len(runs),
+        'bytes': os.path.getsize(output),
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def _merge_runs(runs, output, directory):
+    """Merge sorted runs into the index file, keeping each key's first entry"""
+    offsets = array('Q', [0])
+    fd, blob_path = tempfile.mkstemp(prefix='.dictionary-blob.', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as blob:
+            previous = None
+            for key, _, definition in heapq.merge(*(_read_run(path) for path in runs)):
+                if key == previous:
+                    continue
+                previous = key
+                blob.write(key + b'\0' + definition)
+                offsets.append(blob.tell())
+
+        fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(output) + '.', dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f, open(blob_path, 'rb') as blob:
+                f.write(_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, len(offsets) - 1))
+                f.write(offsets.tobytes())
+                shutil.copyfileobj(blob, f)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, output)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    finally:
+        os.unlink(blob_path)
+    return len(offsets) - 1
+
+
+class OfflineDictionary:
+    """Memory-mapped, read-only view of an imported dictionary index"""
+
+    def __init__(self, path=DEFAULT_DICTIONARY_PATH):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count = _HEADER.unpack_from(self._mmap, 0)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a version {INDEX_VERSION} dictionary index")
+
+        self._count = count
+        self._offsets = memoryview(self._mmap)[_HEADER.size:_HEADER.size + 8 * (count + 1)].cast('Q')
+        self._blob_start = _HEADER.size + 8 * (count + 1)
+
+    def __len__(self):
+        return self._count
+
+    def _record(self, i):
+        return self._mmap[self._blob_start + self._offsets[i]:self._blob_start + self._offsets[i + 1]]
+
+    def get(self, word):
+        """Definition for `word` ('' if the dump had none), or None if it is not in the index"""
+        key = fold(word).encode('utf-8')
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            record = self._record(mid)
+            record_key = record[:record.index(b'\0')]
+            if record_key < key:
+                lo = mid + 1
+            elif record_key > key:
+                hi = mid
+            else:
+                return str(record[len(key) + 1:], 'utf-8')
+        return None
+
+    def __contains__(self, word):
+        return self.get(word) is not None
+
+    def close(self):
+        self._offsets.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_dictionary(path):
+    """OfflineDictionary at `path`, or None if there is no index there"""
+    if path and os.path.exists(path):
+        return OfflineDictionary(path)
+    return None
+
+
+def run_import(args):
+    print(f"Importing {args.dump}...")
+    stats = import_dump(args.dump, args.output)
+    print(f"✓ Indexed {stats['words']} words from {stats['entries_read']} entries "
+          f"({stats['runs']} sorted runs, {stats['bytes'] / 1e6:.1f} MB) "
+          f"in {stats['seconds']:.1f}s → {args.output}")
+    return 0
+
+
+def run_lookup(args):
+    with OfflineDictionary(args.index) as dictionary:
+        status = 0
+        for word in args.words:
+            definition = dictionary.get(word)
+            if definition is None:
+                print(f"{word}: not in the dictionary")
+                status = 1
+            else:
+                print(f"{word}: {definition or '(no definition)'}")
+    return status
+
+
+def add_import_arguments(parser):
+    parser.add_argument('dump', help="dictionary dump, one API-shaped JSON entry per line (.gz ok)")
+    parser.add_argument('--output', default=DEFAULT_DICTIONARY_PATH,
+                        help=f"index file to write (default: {DEFAULT_DICTIONARY_PATH})")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build and query the offline dictionary index")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = commands.add_parser('import', help="build the index from a dump")
+    add_import_arguments(import_parser)
+    import_parser.set_defaults(func=run_import)
+
+    lookup_parser = commands.add_parser('lookup', help="look words up in the index")
+    lookup_parser.add_argument('words', nargs='+')
+    lookup_parser.add_argument('--index', default=DEFAULT_DICTIONARY_PATH)
+    lookup_parser.set_defaults(func=run_lookup)
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,18 +3,28 @@
 Script to:
 1. Add meanings to all vocabulary words that have empty meanings
 2. Split vocabulary data into separate files by letter for easier maintenance
+
+vocab_data.json is streamed through the stages in vocab_stream rather than
+loaded whole; `vocab.py build` runs the same stages over a VocabStore.
 """
 
-import json
-import os
+import argparse
+import threading
 import time
-import urllib.request
-import urllib.error
-import ssl
-from collections import defaultdict
-
-# Fix SSL certificate verification issues on macOS
-ssl._create_default_https_context = ssl._create_unverified_context
+from collections import Counter, defaultdict
+
+from build_manifest import BuildManifest, file_hash
+from dictionary_client import DEFAULT_BASE_URL, DictionaryClient, first_definition
+from fix_review_words import REVIEW_MEANINGS
+from meaning_cache import DEFAULT_CACHE_PATH, MISSING, MeaningCache
+from meaning_resolver import CacheTier, CuratedTier, MeaningResolver, OfflineTier, RemoteTier
+from offline_dictionary import DEFAULT_DICTIONARY_PATH, open_dictionary
+from sharding import LetterKey, ShardWriter, tee_shards, write_shards
+from vocab_index import VocabIndex, fold
+from vocab_journal import DEFAULT_VOCAB_PATH, ProgressJournal
+from vocab_metrics import METRICS, add_arguments, configure
+from vocab_store import VocabStore
+from vocab_stream import PassStats, apply_updates, drain, read_entries, save_entries
 
 # Common word meanings for 11+ vocabulary (child-friendly definitions)
 # These are curated child-friendly definitions for common words
@@ -240,44 +250,85 @@ COMMON_MEANINGS = {
 }
 
 
-def fetch_meaning_from_api(word, max_retries=3):
-    """Fetch word meaning from Free Dictionary API"""
+class TokenBucket:
+    """Thread-safe token bucket limiting requests per second"""
+
+    def __init__(self, rate, capacity=None):
+        if not rate > 0:
+            raise ValueError(f"rate must be a positive number of requests per second, not {rate!r}")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then consume it"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def fetch_meaning_from_api(word, max_retries=3, rate_limiter=None, cache=None, client=None,
+                           read_cache=True):
+    """Fetch word meaning from Free Dictionary API
+
+    Answers are stored in `cache`; with read_cache=False it is not consulted
+    first (the resolver's cache tier already did that).
+    """
     word_lower = word.lower().strip()
-    url = f"https://api.dictionaryapi.dev/api/v2/entries/en/{word_lower}"
+
+    if cache is not None and read_cache:
+        cached = cache.get(word_lower)
+        if cached is not MISSING:
+            METRICS.incr('cache_hits')
+            return cached
+        METRICS.incr('cache_misses')
+
+    if client is None:
+        client = _default_client()
 
     for attempt in range(max_retries):
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        if attempt > 0:
+            METRICS.incr('api_retries')
         try:
-            with urllib.request.urlopen(url, timeout=10) as response:
-                data = json.loads(response.read().decode())
-
-                if data and isinstance(data, list) and len(data) > 0:
-                    entry = data[0]
-                    meanings = entry.get('meanings', [])
-
-                    if meanings:
-                        # Get the first definition from the first meaning
-                        first_meaning = meanings[0]
-                        definitions = first_meaning.get('definitions', [])
-
-                        if definitions:
-                            definition = definitions[0].get('definition', '')
-                            # Simplify long definitions
-                            if len(definition) > 100:
-                                definition = definition[:97] + '...'
-                            return definition
-
-            return None
-
-        except urllib.error.HTTPError as e:
-            if e.code == 404:
-                # Word not found in dictionary
+            start = time.perf_counter()
+            try:
+                status, data = client.get(word_lower)
+            finally:
+                METRICS.observe('api_call', time.perf_counter() - start)
+                METRICS.incr('api_calls')
+
+            if status == 404:
+                # Word not found in dictionary - remember that too
+                METRICS.incr('api_404')
+                if cache is not None:
+                    cache.put(word_lower, None)
                 return None
-            elif attempt < max_retries - 1:
-                time.sleep(1)  # Wait before retrying
-            else:
+            elif status != 200:
+                METRICS.incr(f'api_status_{status}')
+                if attempt < max_retries - 1:
+                    time.sleep(1)  # Wait before retrying
+                    continue
                 return None
 
+            definition = first_definition(data)
+
+            if cache is not None:
+                cache.put(word_lower, definition)
+            return definition
+
         except Exception as e:
+            METRICS.incr('api_errors')
             if attempt < max_retries - 1:
                 time.sleep(1)
             else:
@@ -287,17 +338,36 @@ def fetch_meaning_from_api(word, max_retries=3):
     return None
 
 
-def get_meaning_for_word(word, use_api=True):
+_client = None
+_client_lock = threading.Lock()
+
+
+def _default_client():
+    """Shared keep-alive client for the public dictionary API"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = DictionaryClient()
+        return _client
+
+
+# COMMON_MEANINGS keyed by case-folded word ("April" -> "april")
+_COMMON_BY_KEY = {fold(word): meaning for word, meaning in COMMON_MEANINGS.items()}
+
+
+def get_meaning_for_word(word, use_api=True, rate_limiter=None, cache=None, client=None):
     """Get a child-friendly meaning for a word"""
     word_lower = word.lower()
 
     # Check if we have a predefined meaning
-    if word_lower in COMMON_MEANINGS:
-        return COMMON_MEANINGS[word_lower]
+    key = fold(word)
+    if key in _COMMON_BY_KEY:
+        return _COMMON_BY_KEY[key]
 
     # Try to fetch from API if enabled
     if use_api:
-        api_meaning = fetch_meaning_from_api(word)
+        api_meaning = fetch_meaning_from_api(word, rate_limiter=rate_limiter, cache=cache,
+                                             client=client)
         if api_meaning:
             return api_meaning
 
@@ -305,86 +375,286 @@ def get_meaning_for_word(word, use_api=True):
     return f"[NEEDS REVIEW] {word_lower}"
 
 
-def load_vocabulary():
-    """Load vocabulary from vocab_data.json"""
-    with open('vocab_data.json', 'r', encoding='utf-8') as f:
-        return json.load(f)
-
-
-def save_vocabulary(vocab_data):
-    """Save vocabulary back to vocab_data.json"""
-    with open('vocab_data.json', 'w', encoding='utf-8') as f:
-        json.dump(vocab_data, f, indent=2, ensure_ascii=False)
-
-
-def populate_missing_meanings(vocab_data, use_api=True):
-    """Add meanings to entries with empty meanings"""
-    updated_count = 0
-    needs_review = []
-    total_empty = sum(1 for entry in vocab_data if entry.get('meaning', '').strip() == '')
-
-    print(f"Found {total_empty} words with empty meanings")
+def build_resolver(use_api=True, workers=4, rate=10.0, cache=None, client=None, offline=None):
+    """MeaningResolver over the curated tables, `offline`, `cache` and the API"""
+    tiers = [CuratedTier(COMMON_MEANINGS, REVIEW_MEANINGS)]
+    if offline is not None:
+        tiers.append(OfflineTier(offline))
+    remote = None
     if use_api:
-        est_time = (total_empty * 0.5 + (total_empty // 10) * 1) / 60
-        print(f"Estimated time with API: {est_time:.1f} minutes\n")
-
-    empty_word_count = 0
-    for i, entry in enumerate(vocab_data):
-        if entry.get('meaning', '').strip() == '':
-            empty_word_count += 1
-            word = entry['word']
-            print(f"  [{empty_word_count}/{total_empty}] '{word}'...", end=' ', flush=True)
-
-            meaning = get_meaning_for_word(word, use_api=use_api)
-            entry['meaning'] = meaning
-            updated_count += 1
-
-            if '[NEEDS REVIEW]' in meaning:
-                needs_review.append(word)
-                print("⚠️  needs review")
-            else:
-                print("✓")
-
-            # Save progress every 50 words
-            if use_api and updated_count % 50 == 0:
-                print(f"\n  💾 Saving progress... ({updated_count}/{total_empty} completed)")
-                save_vocabulary(vocab_data)
-                print(f"  ✓ Progress saved!\n")
+        if cache is not None:
+            tiers.append(CacheTier(cache))
+        rate_limiter = TokenBucket(rate)
+        remote = RemoteTier(lambda word: fetch_meaning_from_api(
+            word, rate_limiter=rate_limiter, cache=cache, client=client, read_cache=False))
+    return MeaningResolver(tiers, remote, workers=workers)
 
-            # Rate limiting - be nice to the API
-            if use_api and updated_count % 5 == 0:
-                time.sleep(0.5)  # Wait 0.5 seconds every 5 requests
 
-    return updated_count, needs_review
-
-
-def split_by_letter(vocab_data):
-    """Split vocabulary into separate files by first letter"""
-    by_letter = defaultdict(list)
-
-    for entry in vocab_data:
-        first_letter = entry['word'][0].upper()
-        by_letter[first_letter].append(entry)
-
-    # Create directory if it doesn't exist
-    os.makedirs('vocab_by_letter', exist_ok=True)
-
-    # Save each letter to its own file
-    for letter, words in sorted(by_letter.items()):
-        filename = f'vocab_by_letter/{letter}.json'
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(words, f, indent=2, ensure_ascii=False)
-        print(f"Created {filename} with {len(words)} words")
+def load_vocabulary(path='vocab_data.json'):
+    """Load vocabulary from vocab_data.json into a VocabStore"""
+    return VocabStore.load(path)
 
 
-def main():
-    print("Loading vocabulary data...")
-    vocab_data = load_vocabulary()
-    print(f"Loaded {len(vocab_data)} words")
+def save_vocabulary(store, path='vocab_data.json'):
+    """Save vocabulary back to vocab_data.json"""
+    store.save_json(path)
+
+
+def find_missing_meanings(entries, index=None):
+    """One pass over (number, word, meaning) entries for what populate has to fill
+
+    Returns (pending, known, empty): `pending` maps each case-folded word
+    with an empty meaning to [word, [(number, word) of each such entry]], in
+    order of first appearance;
+    `known` maps those of its keys another entry already gives a meaning
+    (other than [NEEDS REVIEW]) to the first such meaning; `empty` is the
+    number of entries without a meaning. Like the VocabStore build, a meaning
+    is reused from anywhere in the list. With the VocabIndex of a store, the
+    other entries for a word are looked up in it; a plain stream has no
+    index, so the pass keeps the first meaning of every word it has seen.
+    """
+    pending = {}
+    known = {}
+    empty = 0
+    for number, word, meaning in entries:
+        key = fold(word)
+        if not meaning.strip():
+            empty += 1
+            if key in pending:
+                pending[key][1].append((number, word))
+            else:
+                pending[key] = [word, [(number, word)]]
+        elif index is None and key not in known and '[NEEDS REVIEW]' not in meaning:
+            known[key] = meaning
+    if index is None:
+        return pending, {key: known[key] for key in pending if key in known}, empty
+
+    meanings = index.store.meanings
+    for key in pending:
+        for i in index.positions(key):
+            if meanings[i].strip() and '[NEEDS REVIEW]' not in meanings[i]:
+                known[key] = meanings[i]
+                break
+    return pending, known, empty
+
+
+def resolve_missing_meanings(pending, known, resolver, use_api=True, workers=4, rate=10.0,
+                             journal=None):
+    """A meaning for every key find_missing_meanings left pending
+
+    Keys in `known` reuse that meaning; the rest go through the resolver's
+    tiers. As each meaning arrives it is recorded in `journal` for every
+    entry it fills, so an interrupted run resumes from there.
+    Returns ({key: meaning}, words whose meaning needs review).
+    """
+    to_resolve = [key for key in pending if key not in known]
+    empty = sum(len(found) for _, found in pending.values())
+
+    print(f"Found {empty} words with empty meanings "
+          f"({len(to_resolve)} distinct words to look up)")
+    if use_api:
+        est_time = len(to_resolve) / rate / 60
+        print(f"Estimated time with API: at most {est_time:.1f} minutes "
+              f"({workers} workers, {rate:g} requests/s)\n")
+
+    # The resolver yields in to_resolve order, so progress follows the
+    # original list order
+    resolved = resolver.resolve({key: pending[key][0] for key in to_resolve})
+    meanings = {}
+    needs_review = []
+    tiers = Counter()
+    for n, (key, (word, found)) in enumerate(pending.items(), 1):
+        print(f"  [{n}/{len(pending)}] '{word}'...", end=' ', flush=True)
+
+        if key in known:
+            meaning, tier = known[key], 'existing'
+            METRICS.incr('resolved_existing')
+        else:
+            _, meaning, tier = next(resolved)
+        tiers[tier] += 1
+        meanings[key] = meaning
+        if journal is not None:
+            for number, entry_word in found:
+                journal.record(number, entry_word, meaning)
+
+        shared = f" ({len(found)} entries)" if len(found) > 1 else ""
+        if '[NEEDS REVIEW]' in meaning:
+            needs_review.append(word)
+            print(f"⚠️  needs review{shared}")
+        else:
+            print(f"✓ {tier}{shared}")
+
+    if tiers:
+        print("\nResolved by source: " + ", ".join(
+            f"{name} {tiers[name]}" for name in ['existing'] + resolver.tier_names if tiers[name]))
+
+    return meanings, needs_review
+
+
+def fill_meanings(entries, meanings, stats):
+    """Stage: give entries without a meaning theirs from `meanings` ({key: meaning})"""
+    for number, word, meaning in entries:
+        if not meaning.strip():
+            meaning = meanings[fold(word)]
+            stats.note('filled')
+            stats.change(number, word, meaning)
+        yield number, word, meaning
+
+
+def apply_meanings(store, meanings):
+    """Run fill_meanings over a VocabStore; returns the number of entries updated"""
+    stats = PassStats()
+    drain(fill_meanings(store, meanings, stats))
+    for number, (word, meaning) in stats.changed.items():
+        store.set_meaning(store.position(number), meaning)
+    return stats.counts['filled']
+
+
+def populate_missing_meanings(store, use_api=True, workers=4, rate=10.0, cache=None,
+                              journal=None, client=None, offline=None, resolver=None, index=None):
+    """Add meanings to entries with empty meanings
+
+    Entries sharing a word (case-insensitively) are resolved once, reusing a
+    meaning another entry for that word already has. The rest go through the
+    resolver's tiers (see build_resolver); only words no local tier knows are
+    looked up on a pool of `workers` threads, with API calls throttled to
+    `rate` requests per second. Each result is appended to `journal` as it
+    arrives, so an interrupted run can resume, and all are applied in the
+    original order once every word is resolved. `index` is the store's VocabIndex, built here if not given.
+    """
+    if resolver is None:
+        resolver = build_resolver(use_api, workers, rate, cache, client, offline)
+    if index is None:
+        index = VocabIndex(store)
+    pending, known, _ = find_missing_meanings(store, index)
+    meanings, needs_review = resolve_missing_meanings(pending, known, resolver, use_api, workers, rate,
+                                                      journal)
+    return apply_meanings(store, meanings), needs_review
+
+
+def split_by_letter(store, manifest=None, workers=4, compact=False):
+    """Split vocabulary into separate files by first letter
+
+    Only letter files whose content changed since the last build are rewritten,
+    on a pool of `workers` threads. Entries are streamed to the files, indented
+    like vocab_data.json or, with `compact`, without any whitespace.
+    Returns the shard manifest written to vocab_by_letter/manifest.json.
+    """
+    return write_shards(store, LetterKey(), manifest, workers=workers, compact=compact)
+
+
+def write_index(store, manifest=None):
+    """Write vocab_by_letter/INDEX.md with word counts per letter"""
+    by_letter = defaultdict(int)
+    for word in store.words:
+        by_letter[word[0].upper()] += 1
+    return write_letter_index(by_letter, manifest)
+
+
+def write_letter_index(by_letter, manifest=None):
+    """write_index from {letter: word count}, e.g. the counts in the letter shard manifest"""
+    own_manifest = manifest is None
+    if own_manifest:
+        manifest = BuildManifest()
+
+    lines = ["# Vocabulary Index\n\n",
+             f"Total words: {sum(by_letter.values())}\n\n",
+             "## Words by Letter\n\n"]
+    for letter in sorted(by_letter.keys()):
+        count = by_letter[letter]
+        lines.append(f"- **{letter}**: {count} words ([{letter}.json]({letter}.json))\n")
+
+    changed = manifest.write_if_changed('vocab_by_letter/INDEX.md', ''.join(lines))
+
+    if own_manifest:
+        manifest.save()
+    return changed
+
+
+def positive_rate(text):
+    """argparse type for --rate: requests per second, above zero"""
+    try:
+        rate = float(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid rate: {text!r}")
+    if not rate > 0:
+        raise argparse.ArgumentTypeError(f"rate must be above zero, not {text}")
+    return rate
+
+
+def add_populate_arguments(parser):
+    """Add the dictionary lookup options shared with `vocab.py build`"""
+    parser.add_argument('--workers', type=int, default=4,
+                        help="number of concurrent dictionary lookups (default: 4)")
+    parser.add_argument('--rate', type=positive_rate, default=10.0,
+                        help="maximum API requests per second (default: 10)")
+    parser.add_argument('--no-api', action='store_true',
+                        help="only use the built-in meanings, never call the API")
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL,
+                        help="dictionary API base URL, e.g. a local stub server")
+    parser.add_argument('--cache', default=DEFAULT_CACHE_PATH,
+                        help=f"API response cache file (default: {DEFAULT_CACHE_PATH})")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="do not read or write the API response cache")
+    parser.add_argument('--refresh', action='store_true',
+                        help="ignore cached responses and fetch every word again")
+    parser.add_argument('--offline', default=DEFAULT_DICTIONARY_PATH,
+                        help="offline dictionary index to try before the API, if it exists "
+                             f"(default: {DEFAULT_DICTIONARY_PATH})")
+    parser.add_argument('--no-offline', action='store_true',
+                        help="do not use the offline dictionary")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Add missing meanings and split vocabulary by letter")
+    add_populate_arguments(parser)
+    parser.add_argument('--compact', action='store_true',
+                        help="write the letter files without whitespace")
+    add_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def open_lookup_sources(args):
+    """(cache, offline dictionary, API client) for the lookup options in `args`
+
+    The cache and offline dictionary are None when they are not used.
+    """
+    cache = None
+    if not args.no_api and not args.no_cache:
+        cache = MeaningCache(args.cache, refresh=args.refresh)
+        expired = cache.evict()
+        if expired:
+            print(f"Evicted {expired} expired cache entries")
+
+    offline = None if args.no_offline else open_dictionary(args.offline)
+    if offline is not None:
+        print(f"📚 Offline dictionary: {len(offline)} words in {offline.path}")
+
+    return cache, offline, DictionaryClient(args.base_url)
+
+
+def resolve_from_args(pending, known, args, journal=None):
+    """resolve_missing_meanings with the lookup options in `args`
+
+    Each meaning is recorded in `journal` as it arrives. Sets up the cache
+    and API client, reports the words that still need
+    review and writes them to words_need_review.txt.
+    Returns ({key: meaning}, words that need review).
+    """
+    cache, offline, client = open_lookup_sources(args)
+    use_api = not args.no_api
+    resolver = build_resolver(use_api, args.workers, args.rate, cache, client, offline)
 
     print("\nPopulating missing meanings...")
-    updated_count, needs_review = populate_missing_meanings(vocab_data)
-    print(f"Updated {updated_count} entries with meanings")
+    try:
+        with METRICS.stage('populate'):
+            meanings, needs_review = resolve_missing_meanings(
+                pending, known, resolver, use_api, args.workers, args.rate, journal)
+    finally:
+        client.close()
+        if offline is not None:
+            offline.close()
+    METRICS.incr('entries_need_review', len(needs_review))
 
     if needs_review:
         print(f"\n⚠️  {len(needs_review)} words need manual review:")
@@ -398,30 +668,86 @@ def main():
             f.write('\n'.join(needs_review))
         print("\n📝 Full list saved to words_need_review.txt")
 
-    print("\nSaving updated vocabulary data...")
-    save_vocabulary(vocab_data)
-    print("✓ Saved to vocab_data.json")
+    if cache is not None:
+        print(f"\n🗄️  Cache: {cache.summary()}")
+        cache.close()
+
+    return meanings, needs_review
 
-    print("\nSplitting vocabulary by letter...")
-    split_by_letter(vocab_data)
-    print("✓ Created individual letter files in vocab_by_letter/")
+
+def populate_from_args(store, journal, args, index=None):
+    """Fill empty meanings in `store` with the lookup options in `args`
+
+    See resolve_from_args. The journal is closed but not compacted, so the
+    caller decides when vocab_data.json is written. `index` is the store's
+    VocabIndex, built here if not given.
+    """
+    if index is None:
+        index = VocabIndex(store)
+    pending, known, _ = find_missing_meanings(store, index)
+    try:
+        meanings, needs_review = resolve_from_args(pending, known, args, journal)
+        updated_count = apply_meanings(store, meanings)
+    finally:
+        journal.close()
+    print(f"Updated {updated_count} entries with meanings")
+    METRICS.incr('entries_updated', updated_count)
+    return updated_count, needs_review
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    configure(args)
+    path = DEFAULT_VOCAB_PATH
+    loaded = file_hash(path)
+
+    # Updates left behind by an interrupted run of this or `vocab.py build`
+    journal = ProgressJournal()
+    updates = journal.updates()
+    if updates:
+        print(f"↩️  Resuming {len(updates)} updates from {journal.path}")
+
+    # vocab_data.json is read twice, one entry at a time: once to find what
+    # is missing, and once to fill it in while it is saved and split
+    print("Scanning vocabulary data...")
+    with METRICS.stage('scan'):
+        pending, known, _ = find_missing_meanings(apply_updates(read_entries(path), updates, PassStats()))
+
+    try:
+        meanings, _ = resolve_from_args(pending, known, args, journal)
+    finally:
+        journal.close()
+
+    manifest = BuildManifest()
+    stats = PassStats()
+    writer = ShardWriter(LetterKey(), manifest, compact=args.compact)
+    entries = apply_updates(read_entries(path), updates, stats)
+    entries = fill_meanings(entries, meanings, stats)
+    entries = tee_shards(entries, writer)
+
+    print("\nSaving updated vocabulary data and splitting it by letter...")
+    with METRICS.stage('save'):
+        save_entries(entries, path, stats, loaded)
+    journal.discard()
+    print(f"Updated {stats.counts['filled']} entries with meanings")
+    METRICS.incr('entries_updated', stats.counts['filled'])
+    print("✓ Saved to vocab_data.json")
+    print("✓ Letter files in vocab_by_letter/ are up to date")
 
     # Create an index file
     print("\nCreating index file...")
-    by_letter = defaultdict(int)
-    for entry in vocab_data:
-        first_letter = entry['word'][0].upper()
-        by_letter[first_letter] += 1
-
-    with open('vocab_by_letter/INDEX.md', 'w') as f:
-        f.write("# Vocabulary Index\n\n")
-        f.write(f"Total words: {len(vocab_data)}\n\n")
-        f.write("## Words by Letter\n\n")
-        for letter in sorted(by_letter.keys()):
-            count = by_letter[letter]
-            f.write(f"- **{letter}**: {count} words ([{letter}.json]({letter}.json))\n")
-
-    print("✓ Created vocab_by_letter/INDEX.md")
+    with METRICS.stage('index'):
+        index_changed = write_letter_index(
+            {shard['key']: shard['count'] for shard in writer.index['shards']}, manifest)
+    if index_changed:
+        print("✓ Created vocab_by_letter/INDEX.md")
+    else:
+        print("✓ vocab_by_letter/INDEX.md unchanged")
+
+    manifest.save()
+    print("\nDuplicates need the whole list at once; `python duplicates.py` "
+          "or `python vocab.py build` reports them")
+    print(f"\n📈 Metrics written to {METRICS.write()}")
     print("\n✅ Done!")
 
 
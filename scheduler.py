@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Spaced-repetition scheduling for the flashcards (SM-2).
+
+Each card has an ease factor, an interval in days and a count of successful
+reviews in a row. A review grades the recall from 0 to 5; the attempt
+levels the student page records in wordAttempts map onto grades:
+
+    first 5, second 4, third 3, not-known 1
+
+A passing grade (3 and up) makes the card due 1 day later, then 6 days,
+then interval * ease days, and nudges the ease up or down by how easy the
+recall was. A failing grade restarts the card, due again straight away.
+
+Cards sit in a binary heap keyed by (due time, position), so picking the
+next card is O(log n) instead of a scan over every card. Rescheduling a
+card pushes a new heap entry; the old one is dropped when it reaches the
+top. Times are in days.
+
+The parameters are embedded in student-version.html as reviewSchedule, so
+the page schedules with the same rules. To see what a student should review
+next, save their wordAttempts from the page's localStorage as JSON and run:
+
+    python scheduler.py attempts.json --count 20
+"""
+
+import argparse
+import heapq
+import json
+import math
+import sys
+import time
+from array import array
+
+from vocab_store import VocabStore
+
+# Grade of each wordAttempts level
+GRADES = {'first': 5, 'second': 4, 'third': 3, 'not-known': 1}
+
+PASS_GRADE = 3
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+
+# Days until the first and second review after a pass
+FIRST_INTERVAL = 1
+SECOND_INTERVAL = 6
+
+DAY_SECONDS = 86400
+
+
+def next_state(ease, interval, reps, grade):
+    """(ease, interval in days, reps) of a card after a review with `grade`"""
+    if grade < PASS_GRADE:
+        # Start over; SM-2 leaves the ease alone on a failed recall
+        return ease, 0.0, 0
+    if reps == 0:
+        interval = FIRST_INTERVAL
+    elif reps == 1:
+        interval = SECOND_INTERVAL
+    else:
+        # Halves round up, like Math.round in the page
+        interval = math.floor(interval * ease + 0.5)
+    miss = 5 - grade
+    ease = max(MIN_EASE, ease + 0.1 - miss * (0.08 + miss * 0.02))
+    return ease, float(interval), reps + 1
+
+
+def today():
+    """The current time in days, as the scheduler counts it"""
+    return time.time() / DAY_SECONDS
+
+
+class ReviewScheduler:
+    """SM-2 state for `size` cards plus a heap of when each is due
+
+    Cards are positions in the vocabulary. They all start new and due at
+    `now`, so new cards come up in list order.
+    """
+
+    def __init__(self, size, now=0.0):
+        self.ease = array('d', [INITIAL_EASE]) * size
+        self.interval = array('d', [0.0]) * size
+        self.reps = array('l', [0]) * size
+        self.due = array('d', [now]) * size
+        # Whether the card has a live heap entry; popped cards are out until reviewed
+        self._queued = bytearray(b'\1') * size
+        # Sorted, so already a heap
+        self._heap = [(now, card) for card in range(size)]
+
+    @classmethod
+    def from_attempts(cls, store, attempts, now=0.0):
+        """Scheduler seeded from a page's wordAttempts ({word: level})
+
+        A word with a level counts as reviewed once at `now` with that
+        level's grade; every other word is new.
+        """
+        scheduler = cls(len(store), now)
+        for card, word in enumerate(store.words):
+            grade = GRADES.get(attempts.get(word, 'not-known'), GRADES['not-known'])
+            if grade >= PASS_GRADE:
+                scheduler._update(card, grade, now)
+        scheduler._heap = [(scheduler.due[card], card) for card in range(len(store))]
+        heapq.heapify(scheduler._heap)
+        return scheduler
+
+    def __len__(self):
+        return len(self.due)
+
+    def _update(self, card, grade, now):
+        ease, interval, reps = next_state(self.ease[card], self.interval[card], self.reps[card], grade)
+        self.ease[card] = ease
+        self.interval[card] = interval
+        self.reps[card] = reps
+        self.due[card] = now + interval
+
+    def review(self, card, grade, now):
+        """Record a review of `card` at `now` and reschedule it"""
+        self._update(card, grade, now)
+        self._queued[card] = 1
+        heapq.heappush(self._heap, (self.due[card], card))
+
+    def review_level(self, card, level, now):
+        """review() with a wordAttempts level instead of a grade"""
+        self.review(card, GRADES[level], now)
+
+    def _drop_stale(self):
+        heap = self._heap
+        while heap:
+            due, card = heap[0]
+            if self._queued[card] and due == self.due[card]:
+                return heap[0]
+            heapq.heappop(heap)
+        return None
+
+    def peek(self):
+        """(due, card) of the next card, or None if no card is queued"""
+        return self._drop_stale()
+
+    def pop(self, now=None):
+        """Take the next card off the queue, or None
+
+        With `now`, only a card due by then is returned. The card stays off
+        the queue until it is reviewed.
+        """
+        top = self._drop_stale()
+        if top is None or (now is not None and top[0] > now):
+            return None
+        heapq.heappop(self._heap)
+        self._queued[top[1]] = 0
+        return top[1]
+
+    def upcoming(self, count):
+        """The next `count` (due, card) pairs, without changing the queue"""
+        live = (entry for entry in self._heap
+                if self._queued[entry[1]] and entry[0] == self.due[entry[1]])
+        return heapq.nsmallest(count, live)
+
+
+def generate_schedule_js():
+    """JavaScript statement for the page's reviewSchedule block"""
+    params = {
+        'grades': GRADES,
+        'passGrade': PASS_GRADE,
+        'initialEase': INITIAL_EASE,
+        'minEase': MIN_EASE,
+        'intervals': [FIRST_INTERVAL, SECOND_INTERVAL],
+    }
+    return f"        const reviewSchedule = {json.dumps(params, separators=(',', ':'))};\n"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Show what to review next for a student's wordAttempts")
+    parser.add_argument('attempts', help="JSON file with the page's wordAttempts ({word: level})")
+    parser.add_argument('--vocab', default='vocab_data.json')
+    parser.add_argument('--count', type=int, default=20, help="cards to list (default: 20)")
+    parser.add_argument('--output', help="also write the schedule as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    store = VocabStore.load(args.vocab)
+    with open(args.attempts, 'r', encoding='utf-8') as f:
+        attempts = json.load(f)
+
+    now = today()
+    scheduler = ReviewScheduler.from_attempts(store, attempts, now)
+    schedule = [{'number': store.numbers[card], 'word': store.words[card], 'in_days': round(due - now, 2)}
+                for due, card in scheduler.upcoming(args.count)]
+
+    print(f"Next {len(schedule)} of {len(store)} cards ({len(attempts)} with an attempt level):")
+    for item in schedule:
+        when = 'now' if item['in_days'] <= 0 else f"in {item['in_days']:g} days"
+        print(f"  {item['number']:>5}  {item['word']:<24} {when}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(schedule, f, indent=2, ensure_ascii=False)
+        print(f"✓ Schedule written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Precomputed search index embedded in teacher-version.html.
+
+The page searches words and meanings by case-insensitive substring. The
+index lets it answer that without scanning every entry:
+
+- grams: trigram -> positions of entries whose word or meaning contains it.
+  Each text is padded with a space on both sides, so every 1-3 character
+  substring lies inside some indexed trigram. Posting lists are
+  delta-encoded in base 36 ("0,3,1a") and decoded on demand by the page.
+- stop: trigrams left out because they occur in too many entries to narrow
+  a search down; queries made only of stop trigrams fall back to a scan.
+- runs: [number, position, length] runs mapping entry numbers to array
+  positions, used by "jump to word".
+
+Candidates from the index are still checked with includes(), so the results
+match a full scan exactly.
+"""
+
+import json
+import time
+
+GRAM_SIZE = 3
+STOP_FRACTION = 0.05
+
+_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+
+def _base36(n):
+    digits = ''
+    while True:
+        n, r = divmod(n, 36)
+        digits = _DIGITS[r] + digits
+        if n == 0:
+            return digits
+
+
+def _encode_postings(positions):
+    previous = 0
+    deltas = []
+    for position in positions:
+        deltas.append(_base36(position - previous))
+        previous = position
+    return ','.join(deltas)
+
+
+def number_runs(numbers):
+    """[number, position, length] runs of consecutive numbers at consecutive positions"""
+    runs = []
+    for position, number in enumerate(numbers):
+        if runs:
+            start_number, start_position, length = runs[-1]
+            if number == start_number + length and position == start_position + length:
+                runs[-1][2] += 1
+                continue
+        runs.append([number, position, 1])
+    return runs
+
+
+def build_search_index(store, stop_fraction=STOP_FRACTION):
+    """Build the index for a VocabStore as a JSON-serialisable dict"""
+    grams = {}
+    for position, (word, meaning) in enumerate(zip(store.words, store.meanings)):
+        for text in (word, meaning):
+            padded = f" {text.lower()} "
+            for i in range(len(padded) - GRAM_SIZE + 1):
+                postings = grams.setdefault(padded[i:i + GRAM_SIZE], [])
+                if not postings or postings[-1] != position:
+                    postings.append(position)
+
+    limit = max(1, int(len(store) * stop_fraction))
+    encoded = {}
+    stop = []
+    for gram in sorted(grams):
+        postings = grams[gram]
+        if len(postings) > limit:
+            stop.append(gram)
+        else:
+            encoded[gram] = _encode_postings(postings)
+
+    return {
+        'n': GRAM_SIZE,
+        'grams': encoded,
+        'stop': stop,
+        'runs': number_runs(store.numbers),
+    }
+
+
+def generate_search_index_js(store):
+    """Return (JavaScript statement, stats dict) for the searchIndex block"""
+    start = time.perf_counter()
+    index = build_search_index(store)
+    data = json.dumps(index, ensure_ascii=False, separators=(',', ':'))
+    # Keep "</script>" inside a meaning from closing the page's script tag
+    js = "        const searchIndex = {};\n".format(data.replace('</', '<\\/'))
+    stats = {
+        'grams': len(index['grams']),
+        'stop': len(index['stop']),
+        'bytes': len(js.encode('utf-8')),
+        'seconds': time.perf_counter() - start,
+    }
+    return js, stats
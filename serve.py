@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Small asyncio web server for the flashcard pages and their data.
+
+    python serve.py --port 8000
+
+Serves the pages (index.html, student-version.html, teacher-version.html),
+vocab_data.json and the vocab_by_letter/, vocab_shards/ and vocab_releases/
+files. Every response carries a strong ETag (a SHA-256 of the body) and
+"Cache-Control: no-cache", so browsers keep their copy and revalidate it
+with If-None-Match; unchanged files cost a 304 and no body. Clients that
+accept gzip get a gzipped body, compressed once and kept in memory until
+the file changes.
+
+JSON endpoints query the data without downloading all of it:
+
+    /api/letter/B             entries whose word starts with B
+    /api/range?from=800&to=850 entries numbered 800 to 850 (MAX_RANGE at most)
+
+Entries come back in the vocab_data.json layout. The data is reloaded when
+vocab_data.json changes on disk.
+
+Pointed at a release build (update_html_files.py --release), the server
+sends the prebuilt .gz files instead of compressing, and files with a
+content hash in their name are sent as immutable.
+"""
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import io
+import json
+import os
+import re
+import sys
+import urllib.parse
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+from sharding import LetterKey, group_positions
+from vocab_emit import write_json_records
+from vocab_store import VocabStore
+
+DEFAULT_PORT = 8000
+
+STATIC_FILES = {'index.html', 'student-version.html', 'teacher-version.html', 'vocab_data.json'}
+STATIC_DIRECTORIES = {'vocab_by_letter', 'vocab_shards', 'vocab_releases'}
+
+CONTENT_TYPES = {
+    '.html': 'text/html; charset=utf-8',
+    '.json': 'application/json',
+    '.md': 'text/markdown; charset=utf-8',
+}
+
+# Cache-Control of files with a content hash in their name (C.3f9a1c2b7d.json),
+# and of everything else
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+_HASHED_NAME = re.compile(r'\.[0-9a-f]{10}\.[a-z]+$')
+
+# Smaller bodies are not worth compressing
+MIN_GZIP_SIZE = 512
+
+# Most entries one /api/range request returns
+MAX_RANGE = 1000
+
+# API responses kept in memory
+API_CACHE_SIZE = 256
+
+# Largest request body accepted
+MAX_BODY_SIZE = 1024 * 1024
+
+REASONS = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+           405: 'Method Not Allowed', 413: 'Payload Too Large', 500: 'Internal Server Error',
+           503: 'Service Unavailable'}
+
+
+class Resource:
+    """A response body with its ETag and, if it helps, a gzipped copy"""
+
+    __slots__ = ('body', 'content_type', 'etag', 'gzip_body', 'gzip_etag', 'cache_control')
+
+    def __init__(self, body, content_type, gzip_body=None, cache_control=REVALIDATE):
+        self.body = body
+        self.content_type = content_type
+        self.cache_control = cache_control
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.etag = f'"{digest}"'
+        self.gzip_body = gzip_body
+        self.gzip_etag = f'"{digest}-gzip"'
+        if gzip_body is None and len(body) >= MIN_GZIP_SIZE:
+            compressed = gzip.compress(body, compresslevel=6, mtime=0)
+            if len(compressed) < len(body):
+                self.gzip_body = compressed
+
+
+def accepts_gzip(accept_encoding):
+    """Whether an Accept-Encoding header allows a gzip response"""
+    wildcard = False
+    for coding in accept_encoding.split(','):
+        name, _, params = coding.partition(';')
+        name = name.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name in ('gzip', 'x-gzip'):
+            return q > 0
+        if name == '*':
+            wildcard = q > 0
+    return wildcard
+
+
+def etag_matches(if_none_match, etag):
+    """Weak comparison of an If-None-Match header against `etag`"""
+    if if_none_match.strip() == '*':
+        return True
+    return any(tag.strip().removeprefix('W/') == etag for tag in if_none_match.split(','))
+
+
+def json_resource(payload):
+    return Resource(json.dumps(payload).encode('utf-8'), CONTENT_TYPES['.json'])
+
+
+class VocabData:
+    """The vocabulary loaded for the API, with lookups by letter and number"""
+
+    def __init__(self, store):
+        self.store = store
+        self.by_letter = group_positions(store, LetterKey())
+        order = sorted(range(len(store)), key=store.numbers.__getitem__)
+        self.sorted_numbers = [store.numbers[i] for i in order]
+        self.sorted_positions = order
+
+    def letter(self, letter):
+        return self.by_letter.get(letter.upper(), [])
+
+    def number_range(self, first, last):
+        lo = bisect_left(self.sorted_numbers, first)
+        hi = bisect_right(self.sorted_numbers, last)
+        return self.sorted_positions[lo:hi]
+
+    def records(self, positions):
+        out = io.StringIO()
+        write_json_records(self.store, positions, out, compact=True)
+        return Resource(out.getvalue().encode('utf-8'), CONTENT_TYPES['.json'])
+
+
+class VocabServer:
+    """Serve the pages, data files and JSON API from `root`"""
+
+    def __init__(self, root='.', vocab_path='vocab_data.json'):
+        self.root = os.path.abspath(root)
+        self.vocab_path = os.path.join(self.root, vocab_path)
+        self._files = {}
+        self._data = None
+        self._data_stamp = None
+        self._api_cache = OrderedDict()
+        self.requests = 0
+
+    def _static_path(self, path):
+        """File under root that `path` may serve, or None"""
+        parts = path.strip('/').split('/') if path != '/' else ['index.html']
+        if len(parts) == 1 and parts[0] in STATIC_FILES:
+            return os.path.join(self.root, parts[0])
+        if (len(parts) == 2 and parts[0] in STATIC_DIRECTORIES and parts[1]
+                and not parts[1].startswith('.') and '\\' not in parts[1]
+                and os.path.splitext(parts[1])[1] in CONTENT_TYPES):
+            return os.path.join(self.root, parts[0], parts[1])
+        return None
+
+    async def _file(self, path):
+        """Cached Resource for a file, reloaded when it changes on disk"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        stamp = (st.st_mtime_ns, st.st_size)
+        cached = self._files.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        def load():
+            with open(path, 'rb') as f:
+                body = f.read()
+            # A release build ships a precompressed copy next to the file;
+            # one that no longer matches the file is ignored
+            try:
+                with open(f'{path}.gz', 'rb') as f:
+                    gzip_body = f.read()
+                if gzip.decompress(gzip_body) != body:
+                    gzip_body = None
+            except (OSError, EOFError):
+                gzip_body = None
+            cache_control = IMMUTABLE if _HASHED_NAME.search(path) else REVALIDATE
+            return Resource(body, CONTENT_TYPES[os.path.splitext(path)[1]], gzip_body, cache_control)
+
+        resource = await asyncio.get_running_loop().run_in_executor(None, load)
+        self._files[path] = (stamp, resource)
+        return resource
+
+    async def _vocab(self):
+        """VocabData for vocab_data.json, reloaded when the file changes"""
+        st = os.stat(self.vocab_path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        if stamp != self._data_stamp:
+            loop = asyncio.get_running_loop()
+            self._data = await loop.run_in_executor(
+                None, lambda: VocabData(VocabStore.load(self.vocab_path)))
+            self._data_stamp = stamp
+            self._api_cache.clear()
+        return self._data
+
+    async def _api(self, path, query):
+        """(status, Resource) for an /api/ request"""
+        try:
+            data = await self._vocab()
+        except FileNotFoundError:
+            return 404, json_resource({'error': 'no vocabulary data'})
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            # Corrupt or half-written; the next request tries again
+            print(f"⚠️  Could not load {self.vocab_path}: {e!r}", file=sys.stderr, flush=True)
+            return 503, json_resource({'error': 'vocabulary data is unavailable, try again'})
+        key = (path, query)
+        cached = self._api_cache.get(key)
+        if cached is not None:
+            self._api_cache.move_to_end(key)
+            return 200, cached
+
+        if path.startswith('/api/letter/'):
+            letter = path[len('/api/letter/'):]
+            if len(letter) != 1:
+                return 400, json_resource({'error': 'expected a single letter'})
+            resource = data.records(data.letter(letter))
+        elif path == '/api/range':
+            params = urllib.parse.parse_qs(query)
+            try:
+                first = int(params['from'][0])
+                last = int(params.get('to', params['from'])[0])
+            except (KeyError, ValueError):
+                return 400, json_resource({'error': 'expected integer from= and to= parameters'})
+            if last < first or last - first >= MAX_RANGE:
+                return 400, json_resource({'error': f'ranges cover 1 to {MAX_RANGE} numbers'})
+            resource = data.records(data.number_range(first, last))
+        else:
+            return 404, json_resource({'error': 'not found'})
+
+        self._api_cache[key] = resource
+        if len(self._api_cache) > API_CACHE_SIZE:
+            self._api_cache.popitem(last=False)
+        return 200, resource
+
+    async def resolve(self, method, target, headers, body=b''):
+        """Response bytes for one request"""
+        if method not in ('GET', 'HEAD'):
+            return self._response(405, json_resource({'error': 'method not allowed'}), headers,
+                                  extra=[('Allow', 'GET, HEAD')])
+        url = urllib.parse.urlsplit(target)
+        path = urllib.parse.unquote(url.path)
+
+        if path.startswith('/api/'):
+            status, resource = await self._api(path, url.query)
+        else:
+            file_path = self._static_path(path)
+            resource = await self._file(file_path) if file_path else None
+            status = 200
+            if resource is None:
+                status, resource = 404, json_resource({'error': 'not found'})
+        return self._response(status, resource, headers, head=method == 'HEAD')
+
+    def _response(self, status, resource, headers, head=False, extra=()):
+        body, etag = resource.body, resource.etag
+        response_headers = [('Content-Type', resource.content_type)]
+        if resource.gzip_body is not None:
+            response_headers.append(('Vary', 'Accept-Encoding'))
+            if accepts_gzip(headers.get('accept-encoding', '')):
+                body, etag = resource.gzip_body, resource.gzip_etag
+                response_headers.append(('Content-Encoding', 'gzip'))
+
+        if status == 200:
+            response_headers += [('ETag', etag), ('Cache-Control', resource.cache_control)]
+            if etag_matches(headers.get('if-none-match', ''), etag):
+                status, body = 304, b''
+        if status != 304:
+            response_headers.append(('Content-Length', str(len(body))))
+        response_headers.extend(extra)
+
+        lines = [f'HTTP/1.1 {status} {REASONS[status]}']
+        lines += [f'{name}: {value}' for name, value in response_headers]
+        head_bytes = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+        return head_bytes if head or status == 304 else head_bytes + body
+
+    async def handle(self, reader, writer):
+        """Serve HTTP/1.1 requests on one keep-alive connection"""
+        try:
+            while True:
+                headers = {}
+                try:
+                    request_line = await reader.readline()
+                    if not request_line:
+                        break
+                    while True:
+                        line = await reader.readline()
+                        if line in (b'\r\n', b'\n', b''):
+                            break
+                        name, _, value = line.decode('latin-1').partition(':')
+                        headers[name.strip().lower()] = value.strip()
+                except ValueError:
+                    # readline() raises ValueError for a line over the stream limit
+                    writer.write(self._response(400, json_resource({'error': 'line too long'}), {}))
+                    break
+
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    writer.write(self._response(400, json_resource({'error': 'bad request'}), {}))
+                    break
+                length = headers.get('content-length', '0')
+                if not (length.isascii() and length.isdigit()) or int(length) > MAX_BODY_SIZE:
+                    writer.write(self._response(413, json_resource({'error': 'body too large'}), {}))
+                    break
+                body = await reader.readexactly(int(length)) if int(length) else b''
+
+                self.requests += 1
+                writer.write(await self.resolve(method, target, headers, body))
+                await writer.drain()
+
+                connection = headers.get('connection', '').lower()
+                if connection == 'close' or (version == 'HTTP/1.0' and connection != 'keep-alive'):
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host='127.0.0.1', port=DEFAULT_PORT):
+        """Start listening; returns the asyncio server"""
+        return await asyncio.start_server(self.handle, host, port)
+
+
+async def serve(vocab_server, host, port):
+    """Run `vocab_server` until interrupted"""
+    server = await vocab_server.start(host, port)
+    port = server.sockets[0].getsockname()[1]
+    print(f"🌐 Serving {vocab_server.root} at http://{host}:{port}/ (Ctrl+C to stop)", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def add_server_arguments(parser):
+    """Add the options shared with sync_server.py"""
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help=f"port to listen on, 0 for any free port (default: {DEFAULT_PORT})")
+    parser.add_argument('--root', default='.', help="directory with the pages and data")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the flashcard pages and vocabulary data")
+    add_server_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        asyncio.run(serve(VocabServer(args.root), args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
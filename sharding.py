@@ -0,0 +1,494 @@
+#!/usr/bin/env python3
+"""
+Sharded storage of the vocabulary, with a pluggable shard key.
+
+Entries are grouped into JSON shards (laid out like vocab_data.json) by one
+of these keys:
+
+- letter      first letter of the word, in vocab_by_letter/
+- range:SIZE  blocks of SIZE entry numbers (0-99, 100-199, ...), in vocab_shards/
+- hash:COUNT  COUNT buckets by a hash of the case-folded word, in vocab_shards/
+
+Letter shards are as uneven as the alphabet; ranges and hashes give shards
+of about the same size. A VocabStore's shards are written side by side on
+a pool of threads (write_shards); a stream of entries is split in one pass
+as they go by (tee_shards, a vocab_stream stage). Either way only shards
+whose content changed replace the files on disk. The shard directory gets a
+manifest.json with each shard's file, entry count, number range, SHA-256
+checksum and the positions its entries occupy in vocab_data.json (as
+[start, length] runs). The student page loads its shards with the same manifest.
+
+Release builds write the entries as [number, word, meaning] rows and put a
+hash of each shard's content in its file name (C.3f9a1c2b7d.json), so the
+files can be cached forever; the manifest then has "rows": true.
+
+ShardReader reads entries by number and opens only the shards whose number
+range overlaps the request, which with range shards is one or two:
+
+    python sharding.py write --by range:100
+    python sharding.py read 850 --to 860 --dir vocab_shards
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import zlib
+from array import array
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from build_manifest import BuildManifest
+from vocab_emit import json_record, json_row
+from vocab_index import fold
+from vocab_metrics import METRICS
+from vocab_store import VocabStore
+
+DEFAULT_SHARD_KEY = 'letter'
+LETTER_DIRECTORY = 'vocab_by_letter'
+SHARD_DIRECTORY = 'vocab_shards'
+MANIFEST_NAME = 'manifest.json'
+
+# Hex digits of the content hash in release file names
+HASH_LENGTH = 10
+
+# Shard files a ShardWriter keeps open at once; others are reopened to append
+MAX_OPEN_SHARDS = 64
+
+# Entries ShardWriter.add_shard joins into one write
+BATCH_SIZE = 1000
+
+DEFAULT_RANGE_SIZE = 100
+DEFAULT_HASH_COUNT = 16
+
+
+class LetterKey:
+    """Shard by the first letter of the word"""
+
+    spec = 'letter'
+
+    def key(self, number, word):
+        return word[0].upper()
+
+    def filename(self, key):
+        return f'{key}.json'
+
+
+class RangeKey:
+    """Shard by blocks of `size` entry numbers"""
+
+    def __init__(self, size=DEFAULT_RANGE_SIZE):
+        self.size = size
+        self.spec = f'range:{size}'
+
+    def key(self, number, word):
+        return number // self.size
+
+    def filename(self, key):
+        first = key * self.size
+        return f'{first:05d}-{first + self.size - 1:05d}.json'
+
+
+class HashKey:
+    """Shard into `count` buckets by a stable hash of the case-folded word"""
+
+    def __init__(self, count=DEFAULT_HASH_COUNT):
+        self.count = count
+        self.spec = f'hash:{count}'
+
+    def key(self, number, word):
+        return zlib.crc32(fold(word).encode('utf-8')) % self.count
+
+    def filename(self, key):
+        return f'hash-{key:03d}.json'
+
+
+SHARD_KEYS = {'letter': LetterKey, 'range': RangeKey, 'hash': HashKey}
+
+
+def parse_shard_key(spec):
+    """Shard key for a spec like 'letter', 'range:100' or 'hash:16'"""
+    name, _, size = spec.partition(':')
+    if name not in SHARD_KEYS:
+        raise ValueError(f"unknown shard key {spec!r} (choose from {', '.join(SHARD_KEYS)})")
+    if not size:
+        return SHARD_KEYS[name]()
+    if name == 'letter' or not size.isdigit() or int(size) < 1:
+        raise ValueError(f"invalid shard key {spec!r}")
+    return SHARD_KEYS[name](int(size))
+
+
+def shard_directory(shard_key):
+    """Where shards for `shard_key` are written"""
+    return LETTER_DIRECTORY if shard_key.spec == 'letter' else SHARD_DIRECTORY
+
+
+def hashed_filename(filename, digest):
+    """`filename` with the start of `digest`, a hash of its content, before its extension"""
+    stem, extension = os.path.splitext(filename)
+    return f'{stem}.{digest[:HASH_LENGTH]}{extension}'
+
+
+def group_positions(store, shard_key):
+    """{shard key: array of its entries' positions}, sorted by key"""
+    groups = defaultdict(lambda: array('q'))
+    for i, (number, word) in enumerate(zip(store.numbers, store.words)):
+        groups[shard_key.key(number, word)].append(i)
+    return dict(sorted(groups.items()))
+
+
+def _remove_stale_shards(directory, files):
+    """Delete shards the previous manifest listed that are no longer written"""
+    path = os.path.join(directory, MANIFEST_NAME)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return 0
+    removed = 0
+    for shard in previous.get('shards', []):
+        if shard['file'] not in files:
+            try:
+                os.remove(os.path.join(directory, shard['file']))
+                removed += 1
+            except FileNotFoundError:
+                pass
+    return removed
+
+
+class _ShardFile:
+    """One shard being written to a temp file, hashed on the way"""
+
+    def __init__(self, path):
+        self.path = path
+        self.tmp_path = f'{path}.tmp'
+        self.sha = hashlib.sha256()
+        self.file = None
+        self.count = 0
+        self.first = self.last = None
+        self.runs = []
+
+    def write(self, text):
+        self.file.write(text)
+        self.sha.update(text.encode('utf-8'))
+
+    def note(self, i, number):
+        """Count the entry at list position `i`, once its text is written"""
+        self.count += 1
+        self.first = number if self.first is None else min(self.first, number)
+        self.last = number if self.last is None else max(self.last, number)
+        if self.runs and self.runs[-1][0] + self.runs[-1][1] == i:
+            self.runs[-1][1] += 1
+        else:
+            self.runs.append([i, 1])
+
+
+class ShardWriter:
+    """Writes entries into shards as they are added, one pass in list order
+
+    add_shard() writes a whole shard instead, so write_shards can write
+    several at once. Each shard goes to a temp file, hashed as it is
+    written; finish() moves the changed ones into place, drops those whose
+    content is unchanged and writes the manifest. add() keeps at most
+    MAX_OPEN_SHARDS files open at once, the rest are reopened to append. Entries are indented like vocab_data.json
+    or, with `compact`, written without whitespace; with `rows` they are
+    written as [number, word, meaning] arrays. With `hashed`, file names
+    carry a hash of their content. `base` is where the manifest says the
+    files are (default: the directory).
+    """
+
+    def __init__(self, shard_key=None, manifest=None, compact=False, directory=None, rows=False,
+                 hashed=False, base=None):
+        self.shard_key = shard_key or parse_shard_key(DEFAULT_SHARD_KEY)
+        self.directory = directory or shard_directory(self.shard_key)
+        self.manifest = manifest
+        self.compact = compact
+        self.rows = rows
+        self.hashed = hashed
+        self.base = base
+        self.total = 0
+        # The manifest dict, once finish() has written it
+        self.index = None
+        self._shards = {}
+        self._open = OrderedDict()
+        if rows or compact:
+            self._opening, self._separator, self._closing = '[', ',', ']'
+        else:
+            self._opening, self._separator, self._closing = '[\n', ',\n', '\n]'
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _text(self, number, word, meaning):
+        if self.rows:
+            return json_row(number, word, meaning)
+        return json_record(number, word, meaning, self.compact)
+
+    def add(self, number, word, meaning):
+        key = self.shard_key.key(number, word)
+        shard = self._shards.get(key)
+        if shard is None:
+            shard = self._shards[key] = _ShardFile(f'{self.directory}/{self.shard_key.filename(key)}')
+        if shard.file is None:
+            if len(self._open) >= MAX_OPEN_SHARDS:
+                _, oldest = self._open.popitem(last=False)
+                oldest.file.close()
+                oldest.file = None
+            shard.file = open(shard.tmp_path, 'a' if shard.count else 'w', encoding='utf-8', newline='')
+            self._open[key] = shard
+        else:
+            self._open.move_to_end(key)
+        shard.write((self._separator if shard.count else self._opening)
+                    + self._text(number, word, meaning))
+        shard.note(self.total, number)
+        self.total += 1
+
+    def add_shard(self, key, entries):
+        """Write a whole shard at once from (position, number, word, meaning) tuples
+
+        Shards with different keys can be written this way on several
+        threads at once. Don't mix it with add(), which numbers positions
+        itself; set `total` before calling finish().
+        """
+        shard = _ShardFile(f'{self.directory}/{self.shard_key.filename(key)}')
+        self._shards[key] = shard
+        batch = []
+        with open(shard.tmp_path, 'w', encoding='utf-8', newline='') as shard.file:
+            for i, number, word, meaning in entries:
+                batch.append(self._text(number, word, meaning))
+                shard.note(i, number)
+                if len(batch) >= BATCH_SIZE:
+                    self._write_batch(shard, batch)
+                    batch = []
+            if batch:
+                self._write_batch(shard, batch)
+        shard.file = None
+
+    def _write_batch(self, shard, batch):
+        # The batch is already counted, so it is the first when it is all there is
+        leading = self._opening if shard.count == len(batch) else self._separator
+        shard.write(leading + self._separator.join(batch))
+
+    def finish(self):
+        """Close the shards, keep the changed ones and write manifest.json; returns its dict"""
+        own_manifest = self.manifest is None
+        manifest = BuildManifest() if own_manifest else self.manifest
+        shards = []
+        unchanged = 0
+        for key, shard in sorted(self._shards.items()):
+            if shard.file is None:
+                shard.file = open(shard.tmp_path, 'a', encoding='utf-8', newline='')
+            shard.write(self._closing)
+            shard.file.close()
+            shard.file = None
+            self._open.pop(key, None)
+            # The manifest digest is the SHA-256 of the file's content
+            digest = shard.sha.hexdigest()
+            path = shard.path
+            if self.hashed:
+                path = f'{self.directory}/{hashed_filename(os.path.basename(path), digest)}'
+            if manifest.is_fresh(path, digest):
+                os.remove(shard.tmp_path)
+                unchanged += 1
+            else:
+                os.replace(shard.tmp_path, path)
+                manifest.record(path, digest)
+                METRICS.add_bytes(path, os.path.getsize(path))
+                print(f"Created {path} with {shard.count} words")
+            shards.append({
+                'key': key,
+                'file': os.path.basename(path),
+                'count': shard.count,
+                'first': shard.first,
+                'last': shard.last,
+                'sha256': digest,
+                'runs': shard.runs,
+            })
+
+        if unchanged:
+            print(f"{unchanged} shard files unchanged")
+        self.index = write_shard_manifest(shards, self.shard_key, self.total, manifest,
+                                          self.directory, compact=self.compact, rows=self.rows,
+                                          base=self.base)
+        if own_manifest:
+            manifest.save()
+        return self.index
+
+    def abort(self):
+        """Close and delete the temp files, leaving the shards as they were"""
+        for shard in self._shards.values():
+            if shard.file is not None:
+                shard.file.close()
+                shard.file = None
+            if os.path.exists(shard.tmp_path):
+                os.remove(shard.tmp_path)
+        self._open.clear()
+
+
+def tee_shards(entries, writer):
+    """Stage: add (number, word, meaning) entries to a ShardWriter as they pass
+
+    The shards are finished once the last entry has gone through, and the
+    manifest dict is then in writer.index.
+    """
+    try:
+        for entry in entries:
+            writer.add(*entry)
+            yield entry
+        writer.finish()
+    except BaseException:
+        writer.abort()
+        raise
+
+
+def write_shards(store, shard_key=None, manifest=None, workers=4, compact=False, directory=None,
+                 rows=False, hashed=False, base=None):
+    """Write the shards for `shard_key` plus their manifest; returns the manifest dict
+
+    The entries of a VocabStore are grouped by shard first, then each shard
+    is written whole on a pool of `workers` threads. See ShardWriter for the
+    other options. Only shards whose content changed since the last build
+    replace the files on disk.
+    """
+    writer = ShardWriter(shard_key, manifest, compact, directory, rows, hashed, base)
+    numbers, words, meanings = store.numbers, store.words, store.meanings
+
+    def write_shard(item):
+        key, positions = item
+        writer.add_shard(key, ((i, numbers[i], words[i], meanings[i]) for i in positions))
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            for _ in executor.map(write_shard, group_positions(store, writer.shard_key).items()):
+                pass
+        writer.total = len(store)
+        writer.finish()
+    except BaseException:
+        writer.abort()
+        raise
+    return writer.index
+
+
+def write_shard_manifest(shards, shard_key, total, manifest, directory, compact=False, rows=False,
+                         base=None):
+    """Write manifest.json for `shards` and delete the shards it no longer lists
+
+    Returns the manifest dict.
+    """
+    removed = _remove_stale_shards(directory, {shard['file'] for shard in shards})
+    if removed:
+        print(f"Removed {removed} shard files no longer in use")
+
+    index = {'by': shard_key.spec, 'base': base if base is not None else f'{directory}/',
+             'total': total, 'shards': shards}
+    if rows:
+        index['rows'] = True
+    content = (json.dumps(index, separators=(',', ':')) if compact
+               else json.dumps(index, indent=2))
+    manifest.write_if_changed(f'{directory}/{MANIFEST_NAME}', content)
+    return index
+
+
+class ShardReader:
+    """Read entries by number from a shard directory written by write_shards
+
+    Only shards whose number range overlaps a request are opened, and with
+    `verify` each is checked against its manifest checksum first.
+    """
+
+    def __init__(self, directory=LETTER_DIRECTORY, verify=True):
+        self.directory = directory
+        self.verify = verify
+        with open(os.path.join(directory, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        self.shards = sorted(self.manifest['shards'], key=lambda shard: shard['first'])
+        self.shards_read = 0
+
+    def shards_for(self, first, last):
+        """The shards that can hold entries numbered first..last"""
+        return [shard for shard in self.shards if shard['first'] <= last and shard['last'] >= first]
+
+    def _load(self, shard):
+        with open(os.path.join(self.directory, shard['file']), 'rb') as f:
+            data = f.read()
+        if self.verify and hashlib.sha256(data).hexdigest() != shard['sha256']:
+            raise ValueError(f"{shard['file']} does not match its checksum in {MANIFEST_NAME}")
+        self.shards_read += 1
+        METRICS.add_bytes(shard['file'], len(data))
+        records = json.loads(data)
+        if self.manifest.get('rows'):
+            records = [{'word': word, 'meaning': meaning, 'number': str(number)}
+                       for number, word, meaning in records]
+        return records
+
+    def read_range(self, first, last):
+        """Records numbered first..last (inclusive), in number order"""
+        records = []
+        for shard in self.shards_for(first, last):
+            records.extend(record for record in self._load(shard)
+                           if first <= int(record['number']) <= last)
+        records.sort(key=lambda record: int(record['number']))
+        return records
+
+    def get(self, number):
+        """The record numbered `number`, or None"""
+        records = self.read_range(number, number)
+        return records[0] if records else None
+
+
+def shard_key_argument(spec):
+    """argparse type for --by / --shard-key"""
+    try:
+        return parse_shard_key(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def run_write(args):
+    store = VocabStore.load(args.vocab)
+    with METRICS.stage('shards'):
+        index = write_shards(store, args.by, workers=args.workers, compact=args.compact)
+    counts = [shard['count'] for shard in index['shards']]
+    print(f"✓ {len(counts)} shards by {index['by']} in {index['base']} "
+          f"({min(counts, default=0)}-{max(counts, default=0)} words each)")
+    return 0
+
+
+def run_read(args):
+    reader = ShardReader(args.dir)
+    last = args.to if args.to is not None else args.number
+    records = reader.read_range(args.number, last)
+    print(json.dumps(records, indent=2, ensure_ascii=False))
+    print(f"{len(records)} entries from {reader.shards_read} of {len(reader.shards)} shards",
+          file=sys.stderr)
+    return 0 if records else 1
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Write and read sharded vocabulary files")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    write_parser = commands.add_parser('write', help="shard vocab_data.json")
+    write_parser.add_argument('--by', type=shard_key_argument, default=parse_shard_key(DEFAULT_SHARD_KEY),
+                              help="shard key: letter, range:SIZE or hash:COUNT (default: letter)")
+    write_parser.add_argument('--vocab', default='vocab_data.json')
+    write_parser.add_argument('--workers', type=int, default=4)
+    write_parser.add_argument('--compact', action='store_true',
+                              help="write the shards without whitespace")
+    write_parser.set_defaults(func=run_write)
+
+    read_parser = commands.add_parser('read', help="print entries by number")
+    read_parser.add_argument('number', type=int)
+    read_parser.add_argument('--to', type=int, help="last number of a range (default: just NUMBER)")
+    read_parser.add_argument('--dir', default=LETTER_DIRECTORY, help="shard directory")
+    read_parser.set_defaults(func=run_read)
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+Progress sync service: student progress deltas in, class statistics out.
+
+    python sync_server.py --port 8000 --db progress.sqlite3
+
+Runs the serve.py server (pages, data files, /api/letter and /api/range)
+plus two endpoints:
+
+    POST /api/sync                  a batch of progress deltas from one device
+    GET  /api/class/NAME/stats      progress of every student in a class
+
+Opened once as student-version.html?student=ID&class=NAME, the student page
+collects changes to wordAttempts, knownWords, learningIndex and
+progressHistory into a delta, and every few seconds sends the deltas the
+server has not acknowledged yet:
+
+    {"student": "amira", "class": "6B", "device": "k3x9q",
+     "deltas": [{"seq": 7, "attempts": {"abandon": "first", "Abashed": null},
+                 "known": {"abandon": true, "Abashed": false},
+                 "learningIndex": 40, "history": {"2026-10-18": 41}}]}
+
+`seq` counts up per device. Deltas at or below the last seq applied for the
+device are skipped, so a retried request is harmless, and the response says
+how far the device has been applied: {"applied": 7}. A null level removes an
+attempt; "clearKnown": true empties knownWords before the delta's "known".
+teacher-version.html?class=NAME shows the class averages in its stats view.
+
+Progress is kept in SQLite in WAL mode, so the statistics queries read while
+writes go on. Every write goes through one writer thread: the requests
+waiting at the time are folded into one net change per student and applied
+in one transaction with executemany(), so a burst of students costs one
+commit instead of one each.
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import sqlite3
+import sys
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+from serve import (API_CACHE_SIZE, DEFAULT_PORT, VocabServer, add_server_arguments, json_resource,
+                   serve)
+
+DEFAULT_DB_PATH = 'progress.sqlite3'
+
+LEVELS = ('first', 'second', 'third')
+
+# Limits on one request
+MAX_DELTAS = 500
+MAX_CHANGES = 5000
+MAX_NAME_LENGTH = 64
+
+# Most requests applied in one transaction
+MAX_GROUP = 256
+
+_DAY = re.compile(r'\d{4}-\d{2}-\d{2}$')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS students (
+    student TEXT PRIMARY KEY,
+    class TEXT NOT NULL,
+    learning_index INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS students_by_class ON students (class);
+CREATE TABLE IF NOT EXISTS devices (
+    student TEXT NOT NULL,
+    device TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    PRIMARY KEY (student, device)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS attempts (
+    student TEXT NOT NULL,
+    word TEXT NOT NULL,
+    level TEXT NOT NULL,
+    PRIMARY KEY (student, word)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS known (
+    student TEXT NOT NULL,
+    word TEXT NOT NULL,
+    PRIMARY KEY (student, word)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS history (
+    student TEXT NOT NULL,
+    day TEXT NOT NULL,
+    known INTEGER NOT NULL,
+    PRIMARY KEY (student, day)
+) WITHOUT ROWID;
+"""
+
+_STUDENT_STATS = """
+SELECT s.student, s.learning_index, s.updated_at,
+       COALESCE(SUM(a.level = 'first'), 0),
+       COALESCE(SUM(a.level = 'second'), 0),
+       COALESCE(SUM(a.level = 'third'), 0),
+       (SELECT COUNT(*) FROM known k WHERE k.student = s.student)
+FROM students s LEFT JOIN attempts a ON a.student = s.student
+WHERE s.class = ?
+GROUP BY s.student
+ORDER BY s.student
+"""
+
+_HISTORY_STATS = """
+SELECT h.day, SUM(h.known), COUNT(*)
+FROM history h JOIN students s ON s.student = h.student
+WHERE s.class = ?
+GROUP BY h.day
+ORDER BY h.day
+"""
+
+
+def _name(payload, key, required=True):
+    value = payload.get(key)
+    if value is None and not required:
+        return ''
+    if not isinstance(value, str) or not value or len(value) > MAX_NAME_LENGTH:
+        raise ValueError(f"{key} must be a string of 1 to {MAX_NAME_LENGTH} characters")
+    return value
+
+
+def _changes(delta, key, check):
+    """The {name: value} section `key` of a delta, with every value passed through `check`"""
+    section = delta.get(key) or {}
+    if not isinstance(section, dict) or len(section) > MAX_CHANGES:
+        raise ValueError(f"{key} must be an object of at most {MAX_CHANGES} changes")
+    for name, value in section.items():
+        if not name or not check(name, value):
+            raise ValueError(f"invalid {key} change {name!r}: {value!r}")
+    return section
+
+
+def parse_sync_request(payload):
+    """(student, class, device, deltas) of a /api/sync request body
+
+    Raises ValueError if anything is missing or malformed.
+    """
+    if not isinstance(payload, dict):
+        raise ValueError("expected a JSON object")
+    student = _name(payload, 'student')
+    class_name = _name(payload, 'class', required=False)
+    device = _name(payload, 'device')
+    deltas = payload.get('deltas')
+    if not isinstance(deltas, list) or len(deltas) > MAX_DELTAS:
+        raise ValueError(f"deltas must be a list of at most {MAX_DELTAS} deltas")
+
+    parsed = []
+    for delta in deltas:
+        if not isinstance(delta, dict):
+            raise ValueError("each delta must be an object")
+        seq = delta.get('seq')
+        learning_index = delta.get('learningIndex')
+        if type(seq) is not int or seq < 1:
+            raise ValueError("each delta needs a positive integer seq")
+        if learning_index is not None and (type(learning_index) is not int or learning_index < 0):
+            raise ValueError("learningIndex must be a non-negative integer")
+        parsed.append({
+            'seq': seq,
+            'attempts': _changes(delta, 'attempts', lambda word, level: level is None or level in LEVELS),
+            'known': _changes(delta, 'known', lambda word, known: isinstance(known, bool)),
+            'history': _changes(delta, 'history',
+                                lambda day, count: bool(_DAY.match(day)) and type(count) is int and count >= 0),
+            'clear_known': delta.get('clearKnown') is True,
+            'learning_index': learning_index,
+        })
+    parsed.sort(key=lambda delta: delta['seq'])
+    return student, class_name, device, parsed
+
+
+class _NetChange:
+    """The combined effect of one student's deltas; later deltas win"""
+
+    __slots__ = ('class_name', 'attempts', 'known', 'clear_known', 'learning_index', 'history')
+
+    def __init__(self, class_name):
+        self.class_name = class_name
+        self.attempts = {}
+        self.known = {}
+        self.clear_known = False
+        self.learning_index = None
+        self.history = {}
+
+    def add(self, delta):
+        if delta['clear_known']:
+            self.known.clear()
+            self.clear_known = True
+        self.attempts.update(delta['attempts'])
+        self.known.update(delta['known'])
+        self.history.update(delta['history'])
+        if delta['learning_index'] is not None:
+            self.learning_index = delta['learning_index']
+
+
+class ProgressStore:
+    """Student progress in an SQLite database in WAL mode
+
+    Each thread gets its own connection. apply() must only ever be called
+    from one thread at a time; class_stats() can run anywhere alongside it.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._connection().executescript(SCHEMA)
+        # Bumped by every write, so cached statistics can tell they are stale
+        self.generation = 0
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # In WAL mode a crash can lose the last commits but never corrupts the database
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+        return conn
+
+    def apply(self, requests):
+        """Apply parsed sync requests in one transaction; returns each one's applied seq"""
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            last_seq = {}
+            for student, _, device, _ in requests:
+                key = (student, device)
+                if key not in last_seq:
+                    row = conn.execute("SELECT seq FROM devices WHERE student = ? AND device = ?",
+                                       key).fetchone()
+                    last_seq[key] = row[0] if row else 0
+            seen = dict(last_seq)
+
+            changes = {}
+            applied = []
+            for student, class_name, device, deltas in requests:
+                change = changes.get(student)
+                if change is None:
+                    change = changes[student] = _NetChange(class_name)
+                elif class_name:
+                    change.class_name = class_name
+                key = (student, device)
+                for delta in deltas:
+                    if delta['seq'] > last_seq[key]:
+                        change.add(delta)
+                        last_seq[key] = delta['seq']
+                applied.append(last_seq[key])
+
+            self._write(conn, changes, now)
+            conn.executemany(
+                "INSERT INTO devices (student, device, seq) VALUES (?, ?, ?)"
+                " ON CONFLICT (student, device) DO UPDATE SET seq = excluded.seq",
+                [(student, device, seq) for (student, device), seq in last_seq.items()
+                 if seq != seen[(student, device)]])
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self.generation += 1
+        return applied
+
+    def _write(self, conn, changes, now):
+        conn.executemany(
+            "INSERT INTO students (student, class, learning_index, updated_at)"
+            " VALUES (?, ?, COALESCE(?, 0), ?)"
+            " ON CONFLICT (student) DO UPDATE SET"
+            "  class = CASE WHEN excluded.class != '' THEN excluded.class ELSE students.class END,"
+            "  learning_index = COALESCE(?, students.learning_index),"
+            "  updated_at = excluded.updated_at",
+            [(student, change.class_name, change.learning_index, now, change.learning_index)
+             for student, change in changes.items()])
+
+        conn.executemany("DELETE FROM known WHERE student = ?",
+                         [(student,) for student, change in changes.items() if change.clear_known])
+
+        attempts = [(student, word, level) for student, change in changes.items()
+                    for word, level in change.attempts.items()]
+        conn.executemany(
+            "INSERT INTO attempts (student, word, level) VALUES (?, ?, ?)"
+            " ON CONFLICT (student, word) DO UPDATE SET level = excluded.level",
+            [row for row in attempts if row[2] is not None])
+        conn.executemany("DELETE FROM attempts WHERE student = ? AND word = ?",
+                         [row[:2] for row in attempts if row[2] is None])
+
+        known = [(student, word, flag) for student, change in changes.items()
+                 for word, flag in change.known.items()]
+        conn.executemany("INSERT OR IGNORE INTO known (student, word) VALUES (?, ?)",
+                         [row[:2] for row in known if row[2]])
+        conn.executemany("DELETE FROM known WHERE student = ? AND word = ?",
+                         [row[:2] for row in known if not row[2]])
+
+        conn.executemany(
+            "INSERT INTO history (student, day, known) VALUES (?, ?, ?)"
+            " ON CONFLICT (student, day) DO UPDATE SET known = excluded.known",
+            [(student, day, count) for student, change in changes.items()
+             for day, count in change.history.items()])
+
+    def class_stats(self, class_name):
+        """Per-student counts, class totals and the average known words per day"""
+        conn = self._connection()
+        totals = dict.fromkeys(LEVELS, 0)
+        totals['known'] = 0
+        roster = []
+        for student, learning_index, updated_at, *counts, known in conn.execute(_STUDENT_STATS,
+                                                                                (class_name,)):
+            row = dict(zip(LEVELS, counts), student=student, known=known,
+                       learningIndex=learning_index, updatedAt=round(updated_at))
+            for key in totals:
+                totals[key] += row[key]
+            roster.append(row)
+        history = {day: round(known / students, 1)
+                   for day, known, students in conn.execute(_HISTORY_STATS, (class_name,))}
+        return {'class': class_name, 'students': len(roster), 'totals': totals,
+                'roster': roster, 'history': history}
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class SyncServer(VocabServer):
+    """VocabServer plus the /api/sync and /api/class/NAME/stats endpoints"""
+
+    def __init__(self, root='.', db_path=DEFAULT_DB_PATH, max_group=MAX_GROUP):
+        super().__init__(root)
+        self.store = ProgressStore(db_path)
+        self.max_group = max(1, max_group)
+        self._queue = None
+        self._writer = ThreadPoolExecutor(max_workers=1)
+        self._write_task = None
+        self._stats = {}
+        self.transactions = 0
+        self.synced = 0
+
+    async def _write_loop(self):
+        """Apply queued sync requests, everything waiting at once in one transaction"""
+        loop = asyncio.get_running_loop()
+        while True:
+            group = [await self._queue.get()]
+            while len(group) < self.max_group and not self._queue.empty():
+                group.append(self._queue.get_nowait())
+            try:
+                applied = await loop.run_in_executor(
+                    self._writer, self.store.apply, [request for request, _ in group])
+            except Exception as e:
+                # Fail this group, not the loop: later requests still get written
+                if not isinstance(e, sqlite3.Error):
+                    print(f"⚠️  Sync write failed: {e!r}", file=sys.stderr, flush=True)
+                for _, future in group:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.transactions += 1
+            self.synced += len(group)
+            for (_, future), seq in zip(group, applied):
+                if not future.done():
+                    future.set_result(seq)
+
+    async def _sync(self, body):
+        try:
+            request = parse_sync_request(json.loads(body))
+        except (ValueError, UnicodeDecodeError) as e:
+            return 400, json_resource({'error': str(e)})
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((request, future))
+        try:
+            applied = await future
+        except sqlite3.Error:
+            return 503, json_resource({'error': 'could not save progress, try again'})
+        except Exception:
+            return 500, json_resource({'error': 'internal error while saving progress'})
+        return 200, json_resource({'applied': applied})
+
+    async def _class_stats(self, class_name):
+        """Statistics for a class, recomputed only after a write"""
+        generation = self.store.generation
+        cached = self._stats.get(class_name)
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+        stats = await asyncio.get_running_loop().run_in_executor(
+            None, self.store.class_stats, class_name)
+        resource = json_resource(stats)
+        if len(self._stats) >= API_CACHE_SIZE:
+            self._stats.clear()
+        self._stats[class_name] = (generation, resource)
+        return resource
+
+    async def resolve(self, method, target, headers, body=b''):
+        path = urllib.parse.unquote(urllib.parse.urlsplit(target).path)
+        if path == '/api/sync':
+            if method != 'POST':
+                return self._response(405, json_resource({'error': 'method not allowed'}), headers,
+                                      extra=[('Allow', 'POST')])
+            status, resource = await self._sync(body)
+            return self._response(status, resource, headers)
+        if path.startswith('/api/class/') and path.endswith('/stats') and method in ('GET', 'HEAD'):
+            class_name = path[len('/api/class/'):-len('/stats')]
+            resource = await self._class_stats(class_name)
+            return self._response(200, resource, headers, head=method == 'HEAD')
+        return await super().resolve(method, target, headers, body)
+
+    async def start(self, host='127.0.0.1', port=DEFAULT_PORT):
+        self._queue = asyncio.Queue()
+        self._write_task = asyncio.get_running_loop().create_task(self._write_loop())
+        return await super().start(host, port)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the pages plus student progress sync")
+    add_server_arguments(parser)
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help="SQLite database for the progress")
+    parser.add_argument('--max-group', type=int, default=MAX_GROUP,
+                        help=f"most sync requests applied in one transaction (default: {MAX_GROUP})")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    server = SyncServer(args.root, args.db, args.max_group)
+    print(f"🔄 Syncing progress to {args.db}")
+    try:
+        asyncio.run(serve(server, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,32 @@
+"""Regression tests for distractor tables on lists too small to fill k columns"""
+
+import pytest
+
+import distractors
+from vocab_store import VocabStore
+
+
+def small_store(n):
+    store = VocabStore()
+    for i in range(n):
+        store.append(i + 1, f'word{i}', f'meaning number {i} of things')
+    return store
+
+
+@pytest.mark.parametrize('n', [2, 3])
+@pytest.mark.parametrize('numpy', [True, False])
+def test_tiny_lists_are_padded(monkeypatch, n, numpy):
+    if not numpy:
+        monkeypatch.setattr(distractors, 'np', None)
+    elif distractors.np is None:
+        pytest.skip("NumPy is not installed")
+
+    table, _ = distractors.build_distractor_table(small_store(n), k=4)
+
+    assert len(table) == n
+    for i, row in enumerate(table):
+        assert len(row) == 4
+        chosen = [j for j in row if j != -1]
+        assert row == chosen + [-1] * (4 - len(chosen))
+        assert i not in chosen
+        assert len(chosen) <= n - 1
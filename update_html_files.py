@@ -1,98 +1,443 @@
 #!/usr/bin/env python3
 """
 Script to update student-version.html and teacher-version.html with new vocabulary data
+
+With --release, the pages are left alone and a release build goes to dist/
+instead: vocabData and the shards hold [number, word, meaning] rows, the
+inline CSS and JavaScript are minified, shard file names carry a hash of
+their content (so they can be cached forever), and every file gets a .gz
+sibling compressed at level 9. The build prints each artifact's raw and
+gzipped size next to what the ordinary build writes.
 """
 
+import argparse
+import gzip
+import io
 import json
-import re
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from build_manifest import BuildManifest, stream_hash
+from distractors import generate_distractors_js
+from html_splice import splice_blocks, splice_file
+from minify import minify_html
+from scheduler import generate_schedule_js
+from search_index import generate_search_index_js
+from sharding import (DEFAULT_SHARD_KEY, group_positions, parse_shard_key, shard_directory,
+                      shard_key_argument, write_shards)
+from vocab_emit import write_js_entries, write_js_rows, write_json_records
+from vocab_metrics import METRICS, add_arguments, configure
+from vocab_releases import DEFAULT_RELEASES_DIRECTORY, current_version
+from vocab_store import VocabStore
+
+
+HTML_FILES = ['student-version.html', 'teacher-version.html']
+
+# Pages that embed a precomputed search index next to vocabData
+SEARCH_INDEX_PAGES = {'teacher-version.html'}
+
+# Pages whose quiz uses precomputed distractors
+DISTRACTOR_PAGES = {'student-version.html'}
+
+# Pages that schedule reviews with the scheduler.py parameters
+SCHEDULE_PAGES = {'student-version.html'}
+
+# Pages that can load shards on demand instead of inlining the data
+LAZY_PAGES = {'student-version.html'}
+
+# Pages that know their dataset version, so an inlined copy can patch itself
+# up to the latest one from vocab_releases/
+VERSIONED_PAGES = {'student-version.html'}
+
+# Pages copied into a release build
+RELEASE_PAGES = HTML_FILES + ['index.html']
+DEFAULT_RELEASE_DIRECTORY = 'dist'
+
+# gzip level of the release .gz files, and of on-the-fly compression by a
+# server, which the size table compares against
+RELEASE_GZIP_LEVEL = 9
+SERVER_GZIP_LEVEL = 6
+
+# Turns the [number, word, meaning] rows of a release build back into entries
+ROWS_TO_ENTRIES = ".map(([number, word, meaning]) => ({number: String(number), word, meaning}))"
+
+# What to do when some entries still have no meaning
+ON_EMPTY_CHOICES = ('abort', 'continue')
+
+_print_lock = threading.Lock()
+
+
+def _log(message):
+    """print() that stays readable when pages are updated in parallel"""
+    with _print_lock:
+        print(message)
+
+
+def load_vocabulary(path='vocab_data.json'):
+    """Load vocabulary from vocab_data.json into a VocabStore"""
+    return VocabStore.load(path)
 
 
-def load_vocabulary():
-    """Load vocabulary from vocab_data.json"""
-    with open('vocab_data.json', 'r', encoding='utf-8') as f:
-        return json.load(f)
+def generate_vocab_js_array(store, compact=False):
+    """Generate JavaScript array format for vocabulary
 
+    The pages stream the entries with write_js_entries instead; this returns
+    the same text as one string.
+    """
+    out = io.StringIO()
+    write_js_entries(store, out, compact=compact)
+    return out.getvalue()
 
-def generate_vocab_js_array(vocab_data):
-    """Generate JavaScript array format for vocabulary"""
-    lines = []
-    for entry in vocab_data:
-        # Escape quotes and special characters in the meaning
-        meaning = entry['meaning'].replace('"', '\\"').replace("'", "\\'")
-        word = entry['word'].replace('"', '\\"')
-        number = entry['number']
 
-        line = f'{{"number": "{number}", "word": "{word}", "meaning": "{meaning}"}}'
-        lines.append(line)
+def write_page_shards(store, manifest, compact=False, shard_key=None):
+    """Write the shards the student page loads on demand, plus their manifest
 
-    return ",\n".join(lines)
+    The manifest lists each shard's file, entry count, number range and the
+    array positions its entries occupy, so a page can fetch only the shards
+    it needs and slot them into place.
+    """
+    return write_shards(store, shard_key, manifest, compact=compact)
 
 
-def update_html_file(filename, vocab_data):
-    """Update an HTML file with new vocabulary data"""
+def _data_blocks(filename, store, shard_manifest=None, compact=False, review_schedule=False,
+                 rows=False):
+    """Writers for the page blocks that come straight from the data
+
+    Returns (blocks, write_digest_input): the vocabData, vocabShards,
+    datasetVersion and reviewSchedule block writers, and a writer of
+    everything they depend on.
+    """
+    if shard_manifest is not None:
+        write_entries = None
+        shards_js = "        const vocabShards = {};\n".format(
+            json.dumps(shard_manifest, separators=(',', ':')))
+    elif rows:
+        def write_entries(f):
+            return write_js_rows(store, f)
+        shards_js = "        const vocabShards = null;\n"
+    else:
+        # Stream the vocabulary JavaScript array straight into the page
+        def write_entries(f):
+            return write_js_entries(store, f, compact=compact)
+        shards_js = "        const vocabShards = null;\n"
+
+    def write_vocab(f):
+        f.write("        const vocabData = [\n")
+        if write_entries is not None and write_entries(f):
+            f.write("\n")
+        f.write(f"        ]{ROWS_TO_ENTRIES if rows else ''};\n")
+
+    blocks = {'vocabData': write_vocab}
+    if filename in LAZY_PAGES:
+        blocks['vocabShards'] = lambda f: f.write(shards_js)
+    else:
+        shards_js = ''
+
+    version_js = ''
+    if filename in VERSIONED_PAGES:
+        version_js = f"        const datasetVersion = {current_version()};\n"
+        blocks['datasetVersion'] = lambda f: f.write(version_js)
+
+    schedule_js = generate_schedule_js() if review_schedule else ''
+    if review_schedule:
+        blocks['reviewSchedule'] = lambda f: f.write(schedule_js)
+
+    def write_digest_input(f):
+        if write_entries is not None:
+            write_entries(f)
+        f.write(shards_js + version_js + schedule_js)
+
+    return blocks, write_digest_input
 
-    print(f"\nUpdating {filename}...")
 
-    # Read the HTML file
-    with open(filename, 'r', encoding='utf-8') as f:
-        content = f.read()
+def _derived_blocks(filename, store, blocks, search_index=False, distractors=False):
+    """Add the searchIndex and quizDistractors writers to `blocks`"""
+    if search_index:
+        with METRICS.stage('search_index'):
+            index_js, stats = generate_search_index_js(store)
+        blocks['searchIndex'] = lambda f: f.write(index_js)
+        _log(f"  🔎 Search index for {filename}: {stats['grams']} trigrams "
+             f"({stats['stop']} too common to index), {stats['bytes'] / 1024:.1f} KB, "
+             f"built in {stats['seconds'] * 1000:.1f} ms")
 
-    # Generate new vocabulary JavaScript array
-    new_vocab_js = generate_vocab_js_array(vocab_data)
+    if distractors:
+        with METRICS.stage('distractors'):
+            distractors_js, stats = generate_distractors_js(store)
+        blocks['quizDistractors'] = lambda f: f.write(distractors_js)
+        _log(f"  🎯 Quiz distractors for {filename}: {stats['filled']:.0%} of slots filled "
+             f"({stats['method']}), {stats['bytes'] / 1024:.1f} KB, "
+             f"built in {stats['seconds'] * 1000:.1f} ms")
 
-    # Find and replace the vocabData array
-    # Pattern: const vocabData = [...];
-    pattern = r'(const vocabData = \[)(.*?)(\s*\];)'
 
-    def replace_vocab(match):
-        return f"{match.group(1)}\n{new_vocab_js}\n        {match.group(3)}"
+def update_html_file(filename, store, manifest=None, search_index=False, shard_manifest=None,
+                     compact=False, distractors=False, review_schedule=False):
+    """Update an HTML file with new vocabulary data
 
-    new_content = re.sub(pattern, replace_vocab, content, flags=re.DOTALL)
+    With search_index, the page's searchIndex block is regenerated too.
+    With shard_manifest, the page gets an empty vocabData array plus the
+    manifest, and loads the shards on demand.
+    With compact, the vocabData entries are written without whitespace.
+    With distractors, the page's quizDistractors block is regenerated too.
+    With review_schedule, the page gets the scheduler parameters.
+    With a manifest, pages whose embedded data is unchanged are skipped.
+    """
 
-    if new_content == content:
-        print(f"  ⚠️  Warning: No changes made to {filename}")
+    _log(f"\nUpdating {filename}...")
+
+    blocks, write_data = _data_blocks(filename, store, shard_manifest, compact, review_schedule)
+
+    # The search index and distractors are derived from the same data, so
+    # the vocab array (plus the scheduler parameters) alone decides whether
+    # the page is up to date
+    def write_digest_input(f):
+        write_data(f)
+        f.write(('\nsearchIndex' if search_index else '')
+                + ('\nquizDistractors' if distractors else ''))
+
+    digest = stream_hash(write_digest_input)
+
+    if manifest is not None and manifest.is_fresh(filename, digest):
+        _log(f"  ✓ {filename} is already up to date")
         return False
 
-    # Write the updated content back
-    with open(filename, 'w', encoding='utf-8') as f:
-        f.write(new_content)
+    _derived_blocks(filename, store, blocks, search_index, distractors)
+
+    # Stream the page, replacing the blocks between their markers
+    with METRICS.stage(f'splice:{filename}'):
+        changed = splice_blocks(filename, blocks)
 
-    print(f"  ✓ Updated {filename}")
+    if manifest is not None:
+        manifest.record(filename, digest)
+
+    if not changed:
+        _log(f"  ⚠️  Warning: No changes made to {filename}")
+        return False
+
+    _log(f"  ✓ Updated {filename}")
     return True
 
 
-def main():
+def check_empty_meanings(store, on_empty='abort'):
+    """Report entries without a meaning; False if the build should stop"""
+    empty_meanings = [word for _, word, meaning in store if not meaning.strip()]
+    if not empty_meanings:
+        print("✓ All words have meanings")
+        return True
+
+    print(f"\n⚠️  Warning: {len(empty_meanings)} words still have empty meanings!")
+    print("First 10:", empty_meanings[:10])
+    if on_empty == 'continue':
+        print("Continuing anyway (--on-empty continue)")
+        return True
+    print("Aborted. Pass --on-empty continue to build the pages anyway.")
+    return False
+
+
+def update_pages(store, manifest, shard_manifest=None, compact=False):
+    """Update every page in HTML_FILES in parallel, returning those that changed"""
+    def update(name):
+        return update_html_file(name, store, manifest,
+                                search_index=name in SEARCH_INDEX_PAGES,
+                                shard_manifest=shard_manifest if name in LAZY_PAGES else None,
+                                compact=compact,
+                                distractors=name in DISTRACTOR_PAGES,
+                                review_schedule=name in SCHEDULE_PAGES)
+
+    with METRICS.stage('html'), ThreadPoolExecutor(max_workers=len(HTML_FILES)) as executor:
+        results = list(executor.map(update, HTML_FILES))
+    return [name for name, updated in zip(HTML_FILES, results) if updated]
+
+
+def _gzip(data, level=RELEASE_GZIP_LEVEL):
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _remove_orphaned_gzip(directory):
+    """Delete .gz files whose uncompressed file is gone"""
+    for name in os.listdir(directory):
+        if name.endswith('.gz') and not os.path.exists(os.path.join(directory, name[:-3])):
+            os.remove(os.path.join(directory, name))
+
+
+def _baseline_shard_sizes(store, compact, shard_key):
+    """(raw, gzipped) total size of the shards the ordinary build writes"""
+    raw = gzipped = 0
+    for positions in group_positions(store, shard_key).values():
+        out = io.StringIO()
+        write_json_records(store, positions, out, compact=compact)
+        data = out.getvalue().encode('utf-8')
+        raw += len(data)
+        gzipped += len(_gzip(data, SERVER_GZIP_LEVEL))
+    return raw, gzipped
+
+
+def _baseline_shard_manifest(shard_manifest, shard_key):
+    """The release shard manifest as the ordinary build writes it: plain names, no rows"""
+    baseline = dict(shard_manifest, base=f'{shard_directory(shard_key)}/', shards=[
+        dict(shard, file=shard_key.filename(shard['key'])) for shard in shard_manifest['shards']])
+    del baseline['rows']
+    return baseline
+
+
+def print_size_table(baseline, release):
+    """Print raw and gzipped sizes of each artifact, today's build against the release"""
+    def kb(size):
+        return f"{size / 1024:9.1f}"
+
+    print(f"\n  {'artifact':<28}{'today KB':>9}{'gzip -6':>9}{'release':>9}{'.gz -9':>9}{'saved':>8}")
+    totals = [0, 0, 0, 0]
+    for name, (raw, gzipped) in release.items():
+        row = baseline[name] + (raw, gzipped)
+        totals = [total + size for total, size in zip(totals, row)]
+        print(f"  {name:<28}{''.join(kb(size) for size in row)}{1 - gzipped / row[1]:8.0%}")
+    print(f"  {'total':<28}{''.join(kb(size) for size in totals)}{1 - totals[3] / totals[1]:8.0%}")
+    print("  (saved: release .gz against today's files gzipped on the fly)")
+
+
+def build_release(store, manifest, directory=DEFAULT_RELEASE_DIRECTORY, inline=False,
+                  shard_key=None, compact=False):
+    """Write the release build to `directory`; returns {artifact: (raw, gzipped)} sizes"""
+    shard_key = shard_key or parse_shard_key(DEFAULT_SHARD_KEY)
+    os.makedirs(directory, exist_ok=True)
+    sizes = {}
+
+    shard_manifest = None
+    if not inline:
+        shards = f'{directory}/{shard_directory(shard_key)}'
+        with METRICS.stage('shards'):
+            shard_manifest = write_shards(store, shard_key, manifest, directory=shards, rows=True,
+                                          hashed=True, base=f'{shard_directory(shard_key)}/')
+            raw = gzipped = 0
+            for shard in shard_manifest['shards']:
+                path = f"{shards}/{shard['file']}"
+                with open(path, 'rb') as f:
+                    data = f.read()
+                compressed = _gzip(data)
+                manifest.write_if_changed(f'{path}.gz', compressed)
+                raw += len(data)
+                gzipped += len(compressed)
+            _remove_orphaned_gzip(shards)
+        sizes['shards'] = (raw, gzipped)
+
+    baseline = {}
+    if shard_manifest is not None:
+        baseline['shards'] = _baseline_shard_sizes(store, compact, shard_key)
+        baseline_manifest = _baseline_shard_manifest(shard_manifest, shard_key)
+
+    for name in RELEASE_PAGES:
+        blocks = baseline_blocks = {}
+        if name in HTML_FILES:
+            lazy = name in LAZY_PAGES and shard_manifest is not None
+            blocks, _ = _data_blocks(name, store, shard_manifest if lazy else None,
+                                     review_schedule=name in SCHEDULE_PAGES, rows=True)
+            baseline_blocks, _ = _data_blocks(name, store, baseline_manifest if lazy else None,
+                                              compact, review_schedule=name in SCHEDULE_PAGES)
+            # The search index and distractors are the same in both builds
+            _derived_blocks(name, store, blocks, search_index=name in SEARCH_INDEX_PAGES,
+                            distractors=name in DISTRACTOR_PAGES)
+            for block in ('searchIndex', 'quizDistractors'):
+                if block in blocks:
+                    baseline_blocks[block] = blocks[block]
+
+        with METRICS.stage(f'release:{name}'):
+            data = minify_html(splice_file(name, blocks)).encode('utf-8')
+            compressed = _gzip(data)
+            path = f'{directory}/{name}'
+            manifest.write_if_changed(path, data)
+            manifest.write_if_changed(f'{path}.gz', compressed)
+        sizes[name] = (len(data), len(compressed))
+
+        today = splice_file(name, baseline_blocks).encode('utf-8')
+        baseline[name] = (len(today), len(_gzip(today, SERVER_GZIP_LEVEL)))
+
+    # The patches let inlined copies of the release catch up without a reload
+    if os.path.isdir(DEFAULT_RELEASES_DIRECTORY):
+        releases = f'{directory}/{DEFAULT_RELEASES_DIRECTORY}'
+        os.makedirs(releases, exist_ok=True)
+        names = set(os.listdir(DEFAULT_RELEASES_DIRECTORY))
+        for name in names:
+            with open(os.path.join(DEFAULT_RELEASES_DIRECTORY, name), 'rb') as f:
+                manifest.write_if_changed(f'{releases}/{name}', f.read())
+        for name in set(os.listdir(releases)) - names:
+            os.remove(f'{releases}/{name}')
+
+    if 'shards' in sizes:
+        label = f"{shard_directory(shard_key)}/ ({len(shard_manifest['shards'])} files)"
+        sizes = {(label if name == 'shards' else name): size for name, size in sizes.items()}
+        baseline[label] = baseline.pop('shards')
+    print(f"\n📦 Release build written to {directory}/")
+    print_size_table(baseline, sizes)
+    return sizes
+
+
+def add_html_arguments(parser):
+    """Add the page options shared with `vocab.py build`"""
+    parser.add_argument('--inline', action='store_true',
+                        help="inline all entries into the student page for offline use, "
+                             "instead of loading shards on demand")
+    parser.add_argument('--shard-key', type=shard_key_argument, default=parse_shard_key(DEFAULT_SHARD_KEY),
+                        help="how to shard the data for on-demand loading: letter (vocab_by_letter/), "
+                             "range:SIZE or hash:COUNT (vocab_shards/) (default: letter)")
+    parser.add_argument('--on-empty', choices=ON_EMPTY_CHOICES, default='abort',
+                        help="what to do if some words still have no meaning (default: abort)")
+    parser.add_argument('--compact', action='store_true',
+                        help="write the shards and inlined entries without whitespace")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Update the HTML pages with the vocabulary data")
+    add_html_arguments(parser)
+    parser.add_argument('--release', nargs='?', const=DEFAULT_RELEASE_DIRECTORY, metavar='DIR',
+                        help="leave the pages alone and write a minified, precompressed release "
+                             f"build to DIR (default: {DEFAULT_RELEASE_DIRECTORY})")
+    add_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    configure(args)
+
     print("Loading vocabulary data...")
-    vocab_data = load_vocabulary()
-    print(f"Loaded {len(vocab_data)} words")
+    with METRICS.stage('load'):
+        store = load_vocabulary()
+    print(f"Loaded {len(store)} words")
 
     # Verify all words have meanings
-    empty_meanings = [entry['word'] for entry in vocab_data if not entry.get('meaning', '').strip()]
-    if empty_meanings:
-        print(f"\n⚠️  Warning: {len(empty_meanings)} words still have empty meanings!")
-        print("First 10:", empty_meanings[:10])
-        response = input("Continue anyway? (y/n): ")
-        if response.lower() != 'y':
-            print("Aborted.")
-            return
-    else:
-        print("✓ All words have meanings")
+    if not check_empty_meanings(store, args.on_empty):
+        return 1
+
+    manifest = BuildManifest()
+
+    if args.release:
+        build_release(store, manifest, args.release, inline=args.inline, shard_key=args.shard_key,
+                      compact=args.compact)
+        manifest.save()
+        print(f"\n📈 Metrics written to {METRICS.write()}")
+        return 0
 
-    # Update both HTML files
-    files_updated = []
+    shard_manifest = None
+    if not args.inline:
+        print(f"\nWriting shards by {args.shard_key.spec} for on-demand loading...")
+        with METRICS.stage('shards'):
+            shard_manifest = write_page_shards(store, manifest, compact=args.compact,
+                                               shard_key=args.shard_key)
 
-    if update_html_file('student-version.html', vocab_data):
-        files_updated.append('student-version.html')
+    # Update both HTML files in parallel
+    files_updated = update_pages(store, manifest, shard_manifest, compact=args.compact)
 
-    if update_html_file('teacher-version.html', vocab_data):
-        files_updated.append('teacher-version.html')
+    manifest.save()
 
     print(f"\n✅ Successfully updated {len(files_updated)} HTML file(s):")
     for filename in files_updated:
         print(f"  - {filename}")
 
+    print(f"\n📈 Metrics written to {METRICS.write()}")
     print("\n🎉 All vocabulary now has meanings and HTML files are updated!")
+    return 0
 
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
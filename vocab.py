@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the vocabulary build.
+
+    python vocab.py build                          # every stage
+    python vocab.py build --stages fix html        # only these stages
+    python vocab.py build --no-api --on-empty continue
+    python vocab.py import-dictionary dump.jsonl.gz   # offline dictionary index
+
+vocab_data.json is loaded once and the in-memory VocabStore is handed from
+stage to stage. The stages form a small dependency graph:
+
+    populate -> fix -> duplicates -> split -> html
+                    -> index
+                    -> save -> version -> html
+
+A stage starts as soon as the selected stages it depends on are done, so the
+shards, INDEX.md, vocab_data.json and the HTML pages are written side
+by side. Each output is written at most once: populate and fix only journal
+their updates, and the save stage compacts them into vocab_data.json. The
+version stage then numbers the new dataset and writes the patches older
+clients update with (see vocab_releases.py).
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from build_manifest import BuildManifest
+from duplicates import detect_duplicates
+from fix_review_words import fix_review_meanings
+from offline_dictionary import add_import_arguments, run_import
+from populate_meanings import add_populate_arguments, populate_from_args, write_index
+from update_html_files import (add_html_arguments, check_empty_meanings, update_pages,
+                               write_page_shards)
+from vocab_index import VocabIndex
+from vocab_journal import DEFAULT_VOCAB_PATH, ProgressJournal
+from vocab_metrics import METRICS, add_arguments, configure
+from vocab_releases import record_version
+from vocab_store import VocabStore
+
+# Stages that can be picked with --stages, in dependency order
+STAGE_NAMES = ['populate', 'fix', 'duplicates', 'split', 'index', 'html']
+
+# Stages that change the data; everything else reads the finished store
+DATA_STAGES = ('populate', 'fix')
+
+
+class Build:
+    """State shared by the stages of one `vocab build` run"""
+
+    def __init__(self, args):
+        self.args = args
+        self.store = None
+        # Case-folded word index, shared by populate, fix and duplicates
+        self.index = None
+        self.journal = ProgressJournal()
+        self.manifest = BuildManifest()
+        self.shard_manifest = None
+        self.results = {}
+
+    def dependencies(self, name):
+        if name == 'fix':
+            return ('populate',)
+        if name == 'html' and not self.args.inline:
+            return DATA_STAGES + ('split', 'version')
+        if name == 'html':
+            return DATA_STAGES + ('version',)
+        if name == 'version':
+            return ('save',)
+        # Duplicates are reported before the data is sharded
+        if name == 'split':
+            return DATA_STAGES + ('duplicates',)
+        if name in ('duplicates', 'index', 'html', 'save'):
+            return DATA_STAGES
+        return ()
+
+    def load(self):
+        with METRICS.stage('load'):
+            self.store = VocabStore.load(DEFAULT_VOCAB_PATH)
+            self.index = VocabIndex(self.store)
+        print(f"Loaded {len(self.store)} words")
+
+        with METRICS.stage('replay'):
+            replayed = self.journal.replay(self.store)
+        if replayed:
+            print(f"↩️  Resumed {replayed} updates from {self.journal.path}")
+        return replayed
+
+    def run_stage(self, name):
+        with METRICS.stage(f'stage:{name}'):
+            return getattr(self, f'stage_{name}')()
+
+    def stage_populate(self):
+        print("\n▶ populate")
+        return populate_from_args(self.store, self.journal, self.args, self.index)
+
+    def stage_fix(self):
+        print("\n▶ fix")
+        try:
+            return fix_review_meanings(self.store, self.journal, self.index)
+        finally:
+            self.journal.close()
+
+    def stage_save(self):
+        with METRICS.stage('save'):
+            self.journal.compact(self.store)
+        print(f"✓ Saved {DEFAULT_VOCAB_PATH}")
+
+    def stage_version(self):
+        with METRICS.stage('version'):
+            return record_version(self.store)
+
+    def stage_duplicates(self):
+        with METRICS.stage('duplicates'):
+            return detect_duplicates(self.store, self.manifest, index=self.index)
+
+    def stage_split(self):
+        with METRICS.stage('shards'):
+            self.shard_manifest = write_page_shards(self.store, self.manifest,
+                                                    compact=self.args.compact,
+                                                    shard_key=self.args.shard_key)
+        print(f"✓ Shards in {self.shard_manifest['base']} are up to date")
+
+    def stage_index(self):
+        with METRICS.stage('index'):
+            changed = write_index(self.store, self.manifest)
+        print(f"✓ vocab_by_letter/INDEX.md {'written' if changed else 'unchanged'}")
+
+    def stage_html(self):
+        if not check_empty_meanings(self.store, self.args.on_empty):
+            return False
+        return update_pages(self.store, self.manifest,
+                            None if self.args.inline else self.shard_manifest,
+                            compact=self.args.compact)
+
+
+def select_stages(args, replayed):
+    """The stages to run, in dependency order"""
+    selected = set(args.stages or STAGE_NAMES)
+    # The lazy student page needs shards that match the data it was built from
+    if 'html' in selected and not args.inline:
+        selected.add('split')
+    # Journaled updates are only written back by the save stage, and every
+    # save is given a dataset version
+    if replayed or selected & set(DATA_STAGES):
+        selected.update(('save', 'version'))
+    order = STAGE_NAMES[:2] + ['save', 'version'] + STAGE_NAMES[2:]
+    return [name for name in order if name in selected]
+
+
+def run_stages(state, names):
+    """Run `names` concurrently as far as their dependencies allow"""
+    pending = list(names)
+    running = {}
+    done = set()
+
+    with ThreadPoolExecutor(max_workers=len(names) or 1) as executor:
+        while pending or running:
+            for name in list(pending):
+                if all(dep in done for dep in state.dependencies(name) if dep in names):
+                    pending.remove(name)
+                    running[executor.submit(state.run_stage, name)] = name
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                # Re-raises a failed stage; the executor lets running ones finish
+                state.results[name] = future.result()
+                done.add(name)
+
+
+def run_build(args):
+    """`vocab.py build`: load once, run the selected stages, save the manifest"""
+    configure(args)
+    start = time.perf_counter()
+
+    state = Build(args)
+    print("Loading vocabulary data...")
+    replayed = state.load()
+
+    names = select_stages(args, replayed)
+    print(f"Stages: {', '.join(names)}")
+    run_stages(state, names)
+    state.manifest.save()
+
+    status = 0
+    if state.results.get('html') is False:
+        status = 1
+    elif 'html' in state.results:
+        pages = state.results['html']
+        print(f"\n✅ Updated {len(pages)} HTML file(s): {', '.join(pages) or 'none changed'}")
+
+    print(f"\n📈 Metrics written to {METRICS.write()}")
+    print(f"\n{'❌ Build stopped' if status else '🎉 Build finished'} "
+          f"in {time.perf_counter() - start:.1f}s")
+    return status
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Vocabulary build tools")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = commands.add_parser('build', help="run the build pipeline in one process")
+    build_parser.add_argument('--stages', nargs='+', choices=STAGE_NAMES, metavar='STAGE',
+                              help=f"only run these stages ({', '.join(STAGE_NAMES)}); "
+                                   "html also runs split unless --inline is given")
+    add_populate_arguments(build_parser)
+    add_html_arguments(build_parser)
+    add_arguments(build_parser)
+    build_parser.set_defaults(func=run_build)
+
+    import_parser = commands.add_parser('import-dictionary',
+                                        help="build the offline dictionary index from a dump")
+    add_import_arguments(import_parser)
+    import_parser.set_defaults(func=run_import)
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
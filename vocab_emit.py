@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Streaming writers for the generated vocabulary files.
+
+Entries are escaped with a single str.translate() pass and written straight
+to the output in batches, so memory use does not grow with the size of the
+vocabulary. Two layouts are supported:
+
+- pretty: the indent=2 layout of vocab_data.json and the letter files, byte
+  for byte what json.dumps(records, indent=2, ensure_ascii=False) produces
+- compact: no indentation or spaces, for files only machines read
+
+Release builds use a positional layout instead, one [number, word, meaning]
+array per entry, which leaves out the repeated key names.
+
+The writers take a VocabStore or any other iterable of (number, word,
+meaning) tuples, such as the generator stages in vocab_stream.py.
+"""
+
+import re
+from itertools import chain
+
+# Same escapes as json.dumps(..., ensure_ascii=False)
+JSON_ESCAPES = {i: f'\\u{i:04x}' for i in range(0x20)}
+JSON_ESCAPES.update({
+    ord('"'): '\\"',
+    ord('\\'): '\\\\',
+    ord('\n'): '\\n',
+    ord('\r'): '\\r',
+    ord('\t'): '\\t',
+    ord('\b'): '\\b',
+    ord('\f'): '\\f',
+})
+
+# Inside a <script> tag, also keep "</script>" and the JS line separators
+# (invalid in string literals before ES2019) out of the output
+JS_ESCAPES = dict(JSON_ESCAPES)
+JS_ESCAPES.update({
+    ord('<'): '\\u003c',
+    0x2028: '\\u2028',
+    0x2029: '\\u2029',
+})
+
+_JSON_TABLE = str.maketrans(JSON_ESCAPES)
+_JS_TABLE = str.maketrans(JS_ESCAPES)
+
+# Most text needs no escaping; checking for that is much cheaper than a translate()
+_JSON_SPECIAL = re.compile('[{}]'.format(re.escape(''.join(map(chr, JSON_ESCAPES)))))
+_JS_SPECIAL = re.compile('[{}]'.format(re.escape(''.join(map(chr, JS_ESCAPES)))))
+
+# Entries per write() call
+BATCH_SIZE = 1000
+
+
+def json_string(text):
+    """`text` as a JSON string literal"""
+    if _JSON_SPECIAL.search(text):
+        text = text.translate(_JSON_TABLE)
+    return f'"{text}"'
+
+
+def js_string(text):
+    """`text` as a JS string literal that is safe inside a <script> tag"""
+    if _JS_SPECIAL.search(text):
+        text = text.translate(_JS_TABLE)
+    return f'"{text}"'
+
+
+def _write_batched(f, items, separator):
+    """Write `items` joined by `separator`, BATCH_SIZE at a time"""
+    batch = []
+    first = True
+    for item in items:
+        batch.append(item)
+        if len(batch) >= BATCH_SIZE:
+            f.write(('' if first else separator) + separator.join(batch))
+            batch.clear()
+            first = False
+    if batch:
+        f.write(('' if first else separator) + separator.join(batch))
+    return not first or bool(batch)
+
+
+def json_record(number, word, meaning, compact=False):
+    """One entry in the vocab_data.json layout, as it appears inside the array"""
+    if compact:
+        return f'{{"word":{json_string(word)},"meaning":{json_string(meaning)},"number":"{number}"}}'
+    return (f'  {{\n    "word": {json_string(word)},\n'
+            f'    "meaning": {json_string(meaning)},\n'
+            f'    "number": "{number}"\n  }}')
+
+
+def js_record(number, word, meaning, compact=False):
+    """One entry of the page's vocabData array"""
+    if compact:
+        return f'{{"number":"{number}","word":{js_string(word)},"meaning":{js_string(meaning)}}}'
+    return f'{{"number": "{number}", "word": {js_string(word)}, "meaning": {js_string(meaning)}}}'
+
+
+def json_row(number, word, meaning):
+    """One entry as a positional [number, word, meaning] array"""
+    return f'[{number},{json_string(word)},{json_string(meaning)}]'
+
+
+def write_js_entries(store, f, compact=False):
+    """Write the entries of the page's vocabData array (without brackets)"""
+    entries = (js_record(number, word, meaning, compact) for number, word, meaning in store)
+    return _write_batched(f, entries, ',' if compact else ',\n')
+
+
+def write_json_records(store, positions, f, compact=False):
+    """Write the entries at `positions` (a sequence) as a vocab_data.json style array"""
+    numbers, words, meanings = store.numbers, store.words, store.meanings
+    write_json_entries(((numbers[i], words[i], meanings[i]) for i in positions), f, compact)
+
+
+def write_json_entries(entries, f, compact=False):
+    """Write (number, word, meaning) tuples as a vocab_data.json style array"""
+    records = (json_record(number, word, meaning, compact) for number, word, meaning in entries)
+    if compact:
+        f.write('[')
+        _write_batched(f, records, ',')
+        f.write(']')
+        return
+    # json.dumps([], indent=2) is "[]", so the brackets wait for the first entry
+    first = next(records, None)
+    if first is None:
+        f.write('[]')
+        return
+    f.write('[\n')
+    _write_batched(f, chain((first,), records), ',\n')
+    f.write('\n]')
+
+
+def write_js_rows(store, f):
+    """Write the entries as [number, word, meaning] arrays for a JS array (without brackets)"""
+    rows = (f'[{number},{js_string(word)},{js_string(meaning)}]' for number, word, meaning in store)
+    return _write_batched(f, rows, ',')
+
+
+def write_json_rows(store, positions, f):
+    """Write the entries at `positions` as a JSON array of [number, word, meaning] arrays"""
+    numbers, words, meanings = store.numbers, store.words, store.meanings
+    rows = (json_row(numbers[i], words[i], meanings[i]) for i in positions)
+    f.write('[')
+    _write_batched(f, rows, ',')
+    f.write(']')
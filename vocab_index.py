@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Case-insensitive word index over a VocabStore.
+
+The vocabulary mixes cases ("abandon", "Abashed"), so words are keyed by their
+case-folded form. The index gives O(1) lookup by key, sorted prefix and range
+queries, and the list of keys shared by more than one entry.
+"""
+
+from bisect import bisect_left
+
+
+def fold(word):
+    """Normalised lookup key for a word"""
+    return word.strip().casefold()
+
+
+class VocabIndex:
+    """Case-folded word -> entry positions, with a sorted key list"""
+
+    __slots__ = ('store', '_positions', '_keys')
+
+    def __init__(self, store):
+        self.store = store
+        positions = {}
+        for i, word in enumerate(store.words):
+            positions.setdefault(fold(word), []).append(i)
+        self._positions = positions
+        self._keys = sorted(positions)
+
+    def __len__(self):
+        """Number of distinct keys"""
+        return len(self._keys)
+
+    def __contains__(self, word):
+        return fold(word) in self._positions
+
+    def keys(self):
+        """Distinct keys in sorted order"""
+        return list(self._keys)
+
+    def positions(self, word):
+        """Positions of every entry whose word folds to the same key"""
+        return self._positions.get(fold(word), [])
+
+    def lookup(self, word):
+        """Position of the first entry for a word, or None"""
+        found = self._positions.get(fold(word))
+        return found[0] if found else None
+
+    def prefix(self, prefix):
+        """Sorted keys starting with `prefix`"""
+        prefix = fold(prefix)
+        keys = self._keys
+        result = []
+        for i in range(bisect_left(keys, prefix), len(keys)):
+            if not keys[i].startswith(prefix):
+                break
+            result.append(keys[i])
+        return result
+
+    def range(self, low, high):
+        """Sorted keys k with low <= k < high"""
+        keys = self._keys
+        return keys[bisect_left(keys, fold(low)):bisect_left(keys, fold(high))]
+
+    def duplicates(self):
+        """Keys shared by more than one entry, mapped to their positions"""
+        return {key: found for key, found in self._positions.items() if len(found) > 1}
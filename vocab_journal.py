@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Append-only progress journal for meaning updates.
+
+Instead of rewriting vocab_data.json while a run is in progress, each updated
+entry is appended to a JSONL journal. An interrupted run replays the journal
+on startup, and a finished run compacts it into vocab_data.json with a single
+atomic write-and-rename.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+
+from vocab_metrics import METRICS
+
+DEFAULT_VOCAB_PATH = 'vocab_data.json'
+DEFAULT_JOURNAL_PATH = 'vocab_data.journal.jsonl'
+
+
+def write_json_atomic(path, data, indent=2):
+    """Write JSON to a temp file next to `path`, fsync it and rename it into place"""
+    directory = os.path.dirname(os.path.abspath(path))
+    with METRICS.stage('json_encode'):
+        content = json.dumps(data, indent=indent, ensure_ascii=False).encode('utf-8')
+
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', dir=directory)
+    try:
+        with METRICS.stage('file_write'), os.fdopen(fd, 'wb') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file as 0600; keep the original permissions
+        if os.path.exists(path):
+            shutil.copymode(path, tmp_path)
+        else:
+            os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    METRICS.add_bytes(path, len(content))
+
+
+class ProgressJournal:
+    """JSONL journal of per-word meaning updates with batched fsync"""
+
+    def __init__(self, path=DEFAULT_JOURNAL_PATH, fsync_every=50):
+        self.path = path
+        self.fsync_every = fsync_every
+        self._file = None
+        self._pending = 0
+
+    def updates(self):
+        """{(number, word): meaning} of the journaled updates, the latest for each entry"""
+        updates = {}
+        if not os.path.exists(self.path):
+            return updates
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn final line from a crash mid-append
+                    break
+                updates[record['number'], record['word']] = record['meaning']
+        return updates
+
+    def replay(self, store):
+        """Apply journaled updates to a VocabStore, returning how many were applied"""
+        applied = 0
+        for (number, word), meaning in self.updates().items():
+            i = store.position(number)
+            if i is not None and store.words[i] == word:
+                store.set_meaning(i, meaning)
+                applied += 1
+        return applied
+
+    def discard(self):
+        """Delete the journal once its updates are saved some other way"""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def record(self, number, word, meaning):
+        """Append one entry's new meaning to the journal"""
+        if self._file is None:
+            self._truncate_torn_tail()
+            self._file = open(self.path, 'ab')
+        record = {'number': str(number), 'word': word, 'meaning': meaning}
+        line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+        self._file.write(line)
+        METRICS.add_bytes(self.path, len(line))
+        self._pending += 1
+        if self._pending >= self.fsync_every:
+            self.sync()
+
+    def _truncate_torn_tail(self):
+        """Drop a partial last line so new records start on a fresh line"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb+') as f:
+            data = f.read()
+            if data and not data.endswith(b'\n'):
+                f.truncate(data.rfind(b'\n') + 1)
+
+    def sync(self):
+        """Flush and fsync any buffered records"""
+        if self._file is not None and self._pending:
+            with METRICS.stage('journal_fsync'):
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            self._pending = 0
+
+    def close(self):
+        self.sync()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def compact(self, store, path=DEFAULT_VOCAB_PATH):
+        """Write the VocabStore atomically to `path` and discard the journal"""
+        self.close()
+        store.save_json(path)
+        self.discard()
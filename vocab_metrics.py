@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Run metrics and opt-in profiling shared by the build scripts.
+
+Scripts time their stages with `METRICS.stage(name)`, count events with
+`METRICS.incr`, record API latencies with `METRICS.observe` and file sizes
+with `METRICS.add_bytes`. At the end of a run everything is written to a JSON
+metrics file. Stages named with --profile are also run under cProfile, and
+their stats are dumped next to the metrics file as <metrics>.<stage>.prof.
+"""
+
+import cProfile
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_METRICS_PATH = 'build_metrics.json'
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is open
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram"""
+
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                break
+        else:
+            i = len(LATENCY_BUCKETS)
+        self.counts[i] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def to_dict(self):
+        buckets = {f"le_{bound:g}s": n for bound, n in zip(LATENCY_BUCKETS, self.counts)}
+        buckets[f"gt_{LATENCY_BUCKETS[-1]:g}s"] = self.counts[-1]
+        return {
+            'count': self.count,
+            'mean_seconds': self.total / self.count if self.count else 0.0,
+            'max_seconds': self.max,
+            'buckets': buckets,
+        }
+
+
+class Metrics:
+    """Thread-safe collector of stage timers, counters, histograms and bytes written"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.stages = {}
+            self.counters = {}
+            self.histograms = {}
+            self.bytes_written = {}
+            self.profile = set()
+            self.metrics_path = DEFAULT_METRICS_PATH
+            self._started = time.time()
+
+    @contextmanager
+    def stage(self, name):
+        """Time a block; profile it too if the stage was named with --profile"""
+        profiler = None
+        # Nested stages are already covered by the enclosing stage's profile
+        if (name in self.profile or 'all' in self.profile) and not getattr(self._local, 'profiling', False):
+            profiler = cProfile.Profile()
+            profiler.enable()
+            self._local.profiling = True
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if profiler is not None:
+                profiler.disable()
+                self._local.profiling = False
+                profiler.dump_stats(self.profile_path(name))
+            with self._lock:
+                stage = self.stages.setdefault(name, {'seconds': 0.0, 'calls': 0})
+                stage['seconds'] += elapsed
+                stage['calls'] += 1
+
+    def profile_path(self, name):
+        base, _ = os.path.splitext(self.metrics_path)
+        safe_name = ''.join(c if c.isalnum() or c in '-_' else '_' for c in name)
+        return f"{base}.{safe_name}.prof"
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, name, seconds):
+        with self._lock:
+            self.histograms.setdefault(name, Histogram()).observe(seconds)
+
+    def add_bytes(self, path, count):
+        with self._lock:
+            self.bytes_written[path] = self.bytes_written.get(path, 0) + count
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'started': self._started,
+                'wall_seconds': time.time() - self._started,
+                'stages': dict(self.stages),
+                'counters': dict(self.counters),
+                'latency': {name: h.to_dict() for name, h in self.histograms.items()},
+                'bytes_written': dict(self.bytes_written),
+                'total_bytes_written': sum(self.bytes_written.values()),
+            }
+
+    def write(self, path=None):
+        """Write the collected metrics as JSON"""
+        path = path or self.metrics_path
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+
+METRICS = Metrics()
+
+
+def add_arguments(parser):
+    """Add the --metrics and --profile options to a script's parser"""
+    parser.add_argument('--metrics', default=DEFAULT_METRICS_PATH,
+                        help=f"where to write run metrics (default: {DEFAULT_METRICS_PATH})")
+    parser.add_argument('--profile', action='append', default=[], metavar='STAGE',
+                        help="run STAGE under cProfile ('all' for every stage); may be repeated")
+
+
+def configure(args):
+    """Apply the --metrics and --profile options to METRICS"""
+    METRICS.reset()
+    METRICS.metrics_path = args.metrics
+    METRICS.profile = set(args.profile)
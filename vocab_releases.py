@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Numbered dataset versions with delta patches between them.
+
+Every build that changes vocab_data.json makes a new version. Alongside it,
+vocab_releases/ keeps one patch from each of the last HISTORY versions
+straight to the latest, so a client on version N fetches a single file:
+
+    vocab_releases/index.json      {"version": 7, "patches": {"5": "5-to-7.json", ...}, ...}
+    vocab_releases/5-to-7.json     {"from": 5, "to": 7, "added": {...},
+                                    "changed": {...}, "removed": [...]}
+
+Patches are keyed by entry number: "added" and "changed" map numbers to
+[word, meaning], and "removed" lists numbers. A new version is made from the
+entries the VocabStore saw change since it was loaded, and each retained
+patch is extended by composing that step onto it, so the work is linear in
+the size of the change, never in the size of the dataset.
+
+index.json records a hash of the vocab_data.json it describes. If the file
+was edited by hand since, the store's changes no longer bridge
+the two versions; the version still goes up but the history starts over,
+and older clients reload the whole dataset instead of patching.
+
+    python vocab_releases.py                  # show the versions kept
+    python vocab_releases.py --patch 5        # print the patch from version 5
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from build_manifest import file_hash
+from vocab_journal import DEFAULT_VOCAB_PATH, write_json_atomic
+from vocab_metrics import METRICS
+
+DEFAULT_RELEASES_DIRECTORY = 'vocab_releases'
+INDEX_NAME = 'index.json'
+
+# How many older versions can still patch straight to the latest
+HISTORY = 20
+
+
+def load_index(directory=DEFAULT_RELEASES_DIRECTORY):
+    """The release index, or None before the first version"""
+    try:
+        with open(os.path.join(directory, INDEX_NAME), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def load_patch(base, index, directory=DEFAULT_RELEASES_DIRECTORY):
+    """The patch from version `base` to the latest, or None if it is not kept"""
+    name = index['patches'].get(str(base))
+    if name is None:
+        return None
+    with open(os.path.join(directory, name), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def store_changes(store):
+    """The store's (added, changed) entries since loading, as {number: [word, meaning]}"""
+    numbers, words, meanings = store.numbers, store.words, store.meanings
+    added, changed = store.changes()
+    return ({str(numbers[i]): [words[i], meanings[i]] for i in added},
+            {str(numbers[i]): [words[i], meanings[i]] for i in changed})
+
+
+def compose(first, second):
+    """One patch with the effect of applying `first` and then `second`"""
+    added = dict(first['added'])
+    changed = dict(first['changed'])
+    removed = set(first['removed'])
+
+    for number, entry in second['added'].items():
+        # Removed and added back is a change to whoever had the entry
+        if number in removed:
+            removed.discard(number)
+            changed[number] = entry
+        else:
+            added[number] = entry
+    for number, entry in second['changed'].items():
+        if number in added:
+            added[number] = entry
+        else:
+            changed[number] = entry
+    for number in second['removed']:
+        # Added and removed again never reaches the client at all
+        if added.pop(number, None) is None:
+            changed.pop(number, None)
+            removed.add(number)
+
+    return {'from': first['from'], 'to': second['to'], 'added': added,
+            'changed': changed, 'removed': sorted(removed, key=int)}
+
+
+def apply_patch(records, patch):
+    """vocab_data.json-style `records` with `patch` applied; added entries go last"""
+    removed = set(patch['removed'])
+    changed = patch['changed']
+    result = []
+    for record in records:
+        number = record['number']
+        if number in removed:
+            continue
+        if number in changed:
+            word, meaning = changed[number]
+            record = {'number': number, 'word': word, 'meaning': meaning}
+        result.append(record)
+    result.extend({'number': number, 'word': word, 'meaning': meaning}
+                  for number, (word, meaning) in patch['added'].items())
+    return result
+
+
+def patch_size(patch):
+    return len(patch['added']) + len(patch['changed']) + len(patch['removed'])
+
+
+def record_version(store, path=DEFAULT_VOCAB_PATH, directory=DEFAULT_RELEASES_DIRECTORY,
+                   history=HISTORY):
+    """Make a new version from the store's changes, once they are saved to `path`
+
+    Returns the current version. Without changes the version stays the same.
+    """
+    added, changed = store_changes(store)
+    version = record_changes(store.source, added, changed, len(store), path, directory, history)
+    store.clear_changes()
+    store.source = load_index(directory)['source']
+    return version
+
+
+def record_changes(loaded, added, changed, count, path=DEFAULT_VOCAB_PATH,
+                   directory=DEFAULT_RELEASES_DIRECTORY, history=HISTORY):
+    """record_version for data that is not in a VocabStore
+
+    `loaded` is the file_hash of the file the changes were made to, `added`
+    and `changed` map entry numbers to [word, meaning] and `count` is the
+    number of entries now in `path`.
+    """
+    index = load_index(directory)
+    source = file_hash(path)
+
+    if index is not None and source == index['source']:
+        return index['version']
+
+    os.makedirs(directory, exist_ok=True)
+    patches = {}
+    if index is None:
+        version = 1
+    elif loaded != index['source']:
+        version = index['version'] + 1
+        print(f"⚠️  {path} changed outside the build since version {index['version']}; "
+              f"older clients will reload the full data")
+    else:
+        version = index['version'] + 1
+        with METRICS.stage('patches'):
+            step = {'from': index['version'], 'to': version, 'added': added, 'changed': changed,
+                    'removed': []}
+            patches[index['version']] = step
+            # The newest bases that still fit in the history
+            kept = sorted(map(int, index['patches']))[-(history - 1):] if history > 1 else []
+            for base in kept:
+                patches[base] = compose(load_patch(base, index, directory), step)
+
+    with METRICS.stage('patches'):
+        names = {}
+        for base, patch in patches.items():
+            names[str(base)] = f'{base}-to-{version}.json'
+            write_json_atomic(os.path.join(directory, names[str(base)]), patch, indent=None)
+
+        index = {'version': version, 'source': source, 'count': count,
+                 'patches': dict(sorted(names.items(), key=lambda item: int(item[0])))}
+        write_json_atomic(os.path.join(directory, INDEX_NAME), index)
+
+        # Patches to an older latest version are never asked for again
+        keep = set(names.values()) | {INDEX_NAME}
+        for name in os.listdir(directory):
+            if name.endswith('.json') and name not in keep:
+                os.remove(os.path.join(directory, name))
+
+    if patches:
+        step = patches[version - 1]
+        print(f"🏷️  Dataset version {version}: {len(step['added'])} added, "
+              f"{len(step['changed'])} changed, {len(step['removed'])} removed; "
+              f"patches from {len(patches)} earlier version(s)")
+    else:
+        print(f"🏷️  Dataset version {version} (no patches to it)")
+    return version
+
+
+def current_version(directory=DEFAULT_RELEASES_DIRECTORY):
+    """The latest version, or 0 before the first one"""
+    index = load_index(directory)
+    return index['version'] if index else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show dataset versions and their patches")
+    parser.add_argument('--directory', default=DEFAULT_RELEASES_DIRECTORY)
+    parser.add_argument('--patch', type=int, metavar='VERSION',
+                        help="print the patch from VERSION to the latest version")
+    args = parser.parse_args(argv)
+
+    index = load_index(args.directory)
+    if index is None:
+        print(f"No versions in {args.directory}/ yet; run `python vocab.py build`")
+        return 1
+
+    if args.patch is not None:
+        patch = load_patch(args.patch, index, args.directory)
+        if patch is None:
+            print(f"No patch from version {args.patch} to {index['version']}; reload the full data",
+                  file=sys.stderr)
+            return 1
+        json.dump(patch, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+        return 0
+
+    print(f"Version {index['version']}: {index['count']} entries")
+    for base, name in index['patches'].items():
+        size = os.path.getsize(os.path.join(args.directory, name))
+        patch = load_patch(base, index, args.directory)
+        print(f"  from {base:>4}: {patch_size(patch):5} entries, {size / 1024:7.1f} KB  {name}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
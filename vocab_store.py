@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Compact columnar storage for the vocabulary list.
+
+VocabStore keeps numbers, words and meanings in parallel columns instead of a
+list of dicts: numbers are integers in an array, words are interned strings.
+It converts losslessly to and from the vocab_data.json format, and can also
+be saved in a binary format that loads by memory-mapping the file.
+
+The store remembers which entries were appended or given a new meaning since
+it was loaded, so dataset versions (vocab_releases.py) can be made from the
+change alone.
+
+Convert between formats with:
+
+    python vocab_store.py vocab_data.json vocab_data.vocab
+"""
+
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+
+from build_manifest import file_hash
+from json_stream import iter_file
+from vocab_journal import write_json_atomic
+from vocab_metrics import METRICS
+
+BINARY_MAGIC = b'VOCB'
+BINARY_VERSION = 1
+BINARY_EXTENSION = '.vocab'
+
+# magic, version, entry count
+_HEADER = struct.Struct('<4sIQ')
+
+
+def parse_number(number):
+    """The int value of an entry number, which must be its canonical text ("42", "-7")"""
+    try:
+        value = int(number)
+    except (TypeError, ValueError):
+        value = None
+    if value is None or str(value) != number:
+        raise ValueError(f"Entry number {number!r} is not a canonical integer")
+    return value
+
+
+class StringColumn:
+    """Read-only sequence of strings stored as UTF-8 blob + offsets"""
+
+    __slots__ = ('_offsets', '_blob')
+
+    def __init__(self, offsets, blob):
+        self._offsets = offsets
+        self._blob = blob
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        return str(self._blob[self._offsets[i]:self._offsets[i + 1]], 'utf-8')
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+def _pack_strings(strings):
+    """Encode strings into (offsets array, blob bytes)"""
+    offsets = array('Q', [0])
+    chunks = []
+    total = 0
+    for s in strings:
+        data = s.encode('utf-8')
+        chunks.append(data)
+        total += len(data)
+        offsets.append(total)
+    return offsets, b''.join(chunks)
+
+
+class VocabStore:
+    """Vocabulary entries held as parallel number/word/meaning columns"""
+
+    __slots__ = ('numbers', 'words', 'meanings', 'source', '_positions', '_mmap', '_base_size',
+                 '_changed')
+
+    def __init__(self, numbers=None, words=None, meanings=None):
+        self.numbers = numbers if numbers is not None else array('q')
+        self.words = words if words is not None else []
+        self.meanings = meanings if meanings is not None else []
+        # content_hash of the file the store was loaded from, if any
+        self.source = None
+        self._positions = None
+        self._mmap = None
+        self._base_size = len(self.numbers)
+        self._changed = set()
+
+    @classmethod
+    def from_records(cls, records):
+        """Build a store from vocab_data.json style dicts"""
+        intern = sys.intern
+        numbers = array('q')
+        words = []
+        meanings = []
+        for record in records:
+            numbers.append(parse_number(record['number']))
+            words.append(intern(record['word']))
+            meanings.append(record.get('meaning', ''))
+        return cls(numbers, words, meanings)
+
+    @classmethod
+    def load(cls, path):
+        """Load a .vocab binary file or a JSON file, based on the extension"""
+        source = file_hash(path)
+        store = cls.load_binary(path) if path.endswith(BINARY_EXTENSION) else cls.load_json(path)
+        store.source = source
+        return store
+
+    @classmethod
+    def load_json(cls, path):
+        """Load vocab_data.json, decoding one entry at a time"""
+        return cls.from_records(iter_file(path))
+
+    @classmethod
+    def load_binary(cls, path, use_mmap=True):
+        """Load a binary store; with use_mmap the file is mapped, not read"""
+        with open(path, 'rb') as f:
+            if use_mmap:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                buf = f.read()
+
+        magic, version, count = _HEADER.unpack_from(buf, 0)
+        if magic != BINARY_MAGIC or version != BINARY_VERSION:
+            raise ValueError(f"{path} is not a version {BINARY_VERSION} vocabulary store")
+
+        view = memoryview(buf)
+        pos = _HEADER.size
+        numbers = view[pos:pos + 8 * count].cast('q')
+        pos += 8 * count
+        word_offsets = view[pos:pos + 8 * (count + 1)].cast('Q')
+        pos += 8 * (count + 1)
+        meaning_offsets = view[pos:pos + 8 * (count + 1)].cast('Q')
+        pos += 8 * (count + 1)
+        words = StringColumn(word_offsets, view[pos:pos + word_offsets[count]])
+        pos += word_offsets[count]
+        meanings = StringColumn(meaning_offsets, view[pos:pos + meaning_offsets[count]])
+
+        store = cls(numbers, words, meanings)
+        if use_mmap:
+            store._mmap = buf
+        return store
+
+    def __len__(self):
+        return len(self.numbers)
+
+    def __iter__(self):
+        """Yield (number, word, meaning) tuples in list order"""
+        return zip(self.numbers, self.words, self.meanings)
+
+    def append(self, number, word, meaning=''):
+        value = parse_number(str(number))
+        if not isinstance(self.words, list):
+            self._make_writable()
+        self.numbers.append(value)
+        self.words.append(sys.intern(word))
+        self.meanings.append(meaning)
+        self._positions = None
+
+    def set_meaning(self, i, meaning):
+        if not isinstance(self.meanings, list):
+            self._make_writable()
+        if self.meanings[i] != meaning:
+            self.meanings[i] = meaning
+            self._changed.add(i)
+
+    def changes(self):
+        """(appended, changed): sorted positions of the entries added or changed since loading"""
+        appended = list(range(self._base_size, len(self)))
+        return appended, sorted(i for i in self._changed if i < self._base_size)
+
+    def clear_changes(self):
+        """Start tracking changes afresh, as if the store had just been loaded"""
+        self._base_size = len(self)
+        self._changed.clear()
+
+    def _make_writable(self):
+        """Copy memory-mapped columns into regular Python containers"""
+        self.numbers = array('q', self.numbers)
+        self.words = [sys.intern(word) for word in self.words]
+        self.meanings = list(self.meanings)
+        self.close()
+
+    def position(self, number):
+        """Index of the entry with the given number, or None"""
+        if self._positions is None:
+            self._positions = {n: i for i, n in enumerate(self.numbers)}
+        return self._positions.get(int(number))
+
+    def record(self, i):
+        """Entry i as a vocab_data.json style dict"""
+        return {'word': self.words[i], 'meaning': self.meanings[i], 'number': str(self.numbers[i])}
+
+    def to_records(self):
+        return [self.record(i) for i in range(len(self))]
+
+    def save_json(self, path):
+        write_json_atomic(path, self.to_records())
+
+    def save_binary(self, path):
+        """Write the binary format atomically"""
+        word_offsets, word_blob = _pack_strings(self.words)
+        meaning_offsets, meaning_blob = _pack_strings(self.meanings)
+
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, len(self)))
+                f.write(array('q', self.numbers).tobytes())
+                f.write(word_offsets.tobytes())
+                f.write(meaning_offsets.tobytes())
+                f.write(word_blob)
+                f.write(meaning_blob)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        METRICS.add_bytes(path, os.path.getsize(path))
+
+    def close(self):
+        """Release the memory map, if any"""
+        if self._mmap is not None:
+            mm, self._mmap = self._mmap, None
+            try:
+                mm.close()
+            except BufferError:
+                # Views into the map are still alive; it closes when they go
+                pass
+
+
+def main():
+    if len(sys.argv) != 3:
+        print(f"Usage: {sys.argv[0]} SOURCE DEST  (.json or {BINARY_EXTENSION})")
+        sys.exit(1)
+
+    source, dest = sys.argv[1:]
+    store = VocabStore.load(source)
+    if dest.endswith(BINARY_EXTENSION):
+        store.save_binary(dest)
+    else:
+        store.save_json(dest)
+    print(f"✓ Converted {len(store)} entries from {source} to {dest}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Passes over vocab_data.json as a chain of generators, in constant memory.
+
+Entries are read one at a time with json_stream and flow through the stages
+as (number, word, meaning) tuples, the same shape a VocabStore iterates as.
+Each stage passes an entry on as soon as it is done with it, and the last
+one pulls the whole chain through:
+
+    stats = PassStats()
+    entries = read_entries('vocab_data.json')
+    entries = fill_meanings(entries, meanings, stats)      # populate_meanings
+    entries = fix_review(entries, stats)                   # fix_review_words
+    entries = tee_shards(entries, ShardWriter())           # sharding, vocab_by_letter/
+    entries = tee_js(entries, 'vocab_array.js')            # JS array
+    save_entries(entries, 'vocab_data.json', stats, loaded)
+
+populate_meanings.py and fix_review_words.py run their stages this way, and
+the VocabStore build in vocab.py runs the very same stages over the store.
+Memory stays flat however many entries there are; only what a stage must
+remember (the entries it changed, the meanings to fill in) grows, and that
+grows with the change, not with the data. The one exception is populate's
+first pass, which keeps one meaning per distinct word (see
+populate_meanings.find_missing_meanings). What needs every entry at once
+(duplicates, the search index, the pages) stays with the VocabStore build.
+
+Every output goes to a temp file that replaces the real one when the pass
+finishes, so an interrupted pass changes nothing. The one thing worth
+keeping from an interrupted pass is populate's lookups, so those go to the
+ProgressJournal as they arrive and apply_updates picks them up again.
+
+    python vocab_stream.py                                   # count entries and empty meanings
+    python vocab_stream.py --split range:100 --js vocab_array.js
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+
+from build_manifest import BuildManifest, file_hash, write_stream_atomic
+from json_stream import iter_file
+from sharding import ShardWriter, shard_key_argument, tee_shards
+from vocab_emit import js_record, write_json_entries
+from vocab_journal import DEFAULT_VOCAB_PATH
+from vocab_metrics import METRICS, add_arguments, configure
+from vocab_releases import record_changes
+from vocab_store import parse_number
+
+
+class PassStats:
+    """What the stages of one pass counted, plus the entries they changed"""
+
+    # Words kept as examples for each count
+    EXAMPLES = 10
+
+    def __init__(self):
+        self.counts = Counter()
+        self.examples = defaultdict(list)
+        # {number: [word, meaning]} of every entry given a new meaning
+        self.changed = {}
+
+    def note(self, name, word=None, keep=EXAMPLES):
+        """Count one `name`, keeping `word` among the first `keep` examples (None: all)"""
+        self.counts[name] += 1
+        if word is not None and (keep is None or len(self.examples[name]) < keep):
+            self.examples[name].append(word)
+
+    def change(self, number, word, meaning):
+        self.changed[str(number)] = [word, meaning]
+
+
+def read_entries(path=DEFAULT_VOCAB_PATH):
+    """Yield (number, word, meaning) for each entry of a vocab_data.json file"""
+    for record in iter_file(path):
+        yield parse_number(record['number']), record['word'], record.get('meaning', '')
+
+
+def apply_updates(entries, updates, stats):
+    """Stage: apply ProgressJournal.updates() left behind by an interrupted build"""
+    for number, word, meaning in entries:
+        update = updates.get((str(number), word))
+        if update is not None and update != meaning:
+            meaning = update
+            stats.note('replayed')
+            stats.change(number, word, meaning)
+        yield number, word, meaning
+
+
+def count_empty(entries, stats):
+    """Stage: count the entries, and those without a meaning"""
+    for entry in entries:
+        stats.counts['entries'] += 1
+        if not entry[2].strip():
+            stats.note('empty', entry[1])
+        yield entry
+
+
+def tee_js(entries, path, compact=False):
+    """Stage: write the entries to `path` as a `const vocabData = [...]` script"""
+    tmp_path = f'{path}.tmp'
+    separator = ',' if compact else ',\n'
+    first = True
+    try:
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+            f.write("const vocabData = [\n")
+            for number, word, meaning in entries:
+                f.write(('' if first else separator) + js_record(number, word, meaning, compact))
+                first = False
+                yield number, word, meaning
+            f.write(("" if first else "\n") + "];\n")
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+    METRICS.add_bytes(path, os.path.getsize(path))
+
+
+def write_entries(entries, path=DEFAULT_VOCAB_PATH, compact=False):
+    """Sink: write the entries to `path` in the vocab_data.json layout, atomically"""
+    write_stream_atomic(path, lambda f: write_json_entries(entries, f, compact))
+
+
+def save_entries(entries, path=DEFAULT_VOCAB_PATH, stats=None, loaded=None):
+    """Sink: write_entries, then give the changes in `stats` a dataset version
+
+    `loaded` is the file_hash of the vocab_data.json the pass read. Only
+    vocab_data.json itself is versioned; other paths are just written.
+    """
+    count = 0
+
+    def counted(entries):
+        nonlocal count
+        for entry in entries:
+            count += 1
+            yield entry
+
+    write_entries(counted(entries), path)
+    if stats is not None and os.path.abspath(path) == os.path.abspath(DEFAULT_VOCAB_PATH):
+        record_changes(loaded, {}, stats.changed, count, path)
+
+
+def drain(entries):
+    """Sink: run the stages without writing the entries anywhere"""
+    for _ in entries:
+        pass
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Process vocab_data.json in one constant-memory pass")
+    parser.add_argument('--input', default=DEFAULT_VOCAB_PATH,
+                        help=f"vocabulary to read (default: {DEFAULT_VOCAB_PATH})")
+    parser.add_argument('--output', metavar='PATH', help="write the vocabulary here too")
+    parser.add_argument('--split', type=shard_key_argument, metavar='KEY',
+                        help="write shards by KEY: letter, range:SIZE or hash:COUNT")
+    parser.add_argument('--js', metavar='PATH', help="write a `const vocabData` script too")
+    parser.add_argument('--compact', action='store_true',
+                        help="write the shards and script without whitespace")
+    add_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    configure(args)
+    start = time.perf_counter()
+
+    stats = PassStats()
+    manifest = BuildManifest()
+    loaded = file_hash(args.input)
+    writer = None
+
+    entries = count_empty(read_entries(args.input), stats)
+    if args.split:
+        writer = ShardWriter(args.split, manifest, compact=args.compact)
+        entries = tee_shards(entries, writer)
+    if args.js:
+        entries = tee_js(entries, args.js, compact=args.compact)
+
+    with METRICS.stage('stream'):
+        if args.output:
+            save_entries(entries, args.output, stats, loaded)
+        else:
+            drain(entries)
+    manifest.save()
+
+    print(f"\n📊 {stats.counts['entries']} entries in one pass ({time.perf_counter() - start:.1f}s)")
+    if stats.counts['empty']:
+        print(f"  ⚠️  {stats.counts['empty']} still have empty meanings, "
+              f"e.g. {', '.join(stats.examples['empty'])}")
+    if writer is not None:
+        print(f"  ✓ {len(writer.index['shards'])} shards in {writer.index['base']} are up to date")
+    print(f"\n📈 Metrics written to {METRICS.write()}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())